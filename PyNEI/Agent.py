@@ -4,11 +4,29 @@
 """
 
 import random  # 用于babble
+from time import monotonic  # 用于目标提醒的计时
+from enum import Enum  # 枚举目标提醒策略
 
 from PyNEI.Program import NARSType, NARSProgram  # 同路径相对导入使用「.文件名」
+from PyNEI.Pool import NARSProgramPool
+from PyNEI.Profile import CINProfile
 from PyNEI.Elements import *
 
 
+class GoalReminderPolicy(Enum):
+    """「目标提醒」的策略
+    决定NARSAgent.update何时重新置入总目标
+    """
+
+    ALWAYS: str = 'always'
+    '每个tick都提醒（原行为）'
+    EVERY_N_TICKS: str = 'every_n_ticks'
+    '每隔N个tick提醒一次'
+    EVERY_T_SECONDS: str = 'every_t_seconds'
+    '每隔T秒提醒一次'
+    ON_FEEDBACK: str = 'on_feedback'
+    '仅在奖励/惩罚之后提醒'
+
 
 class NARSAgent:
     """关于NARS功能的接口：抽象于「游戏本体」到「纳思本体」的「中间接口」
@@ -25,24 +43,50 @@ class NARSAgent:
     """
 
     # nars_type: 'opennars' or 'ONA'
-    def __init__(self, nars_type: NARSType = None, rootPath: str = '.', mainGoal: str = None, mainGoal_negative: str = None):
+    def __init__(self, nars_type: NARSType = None, rootPath: str = '.', mainGoal: str = None, mainGoal_negative: str = None, perception_delta: bool = False, perception_keep_alive: int = 0, goal_reminder_policy: GoalReminderPolicy = GoalReminderPolicy.ALWAYS, goal_reminder_interval: float = 1, pool: NARSProgramPool = None, profile: CINProfile = None, seed: int = None):
         "构造方法"
         # 使用字典记录操作，并在后面重载「__getitem__」方法实现快捷读写操作
         # 空字典：获取这个操作「被程序发送了多少次」
         self._operation_container: dict[NARSOperation:int] = dict()
         # 使用列表处理感知器
         self._sensors: list[NARSSensor] = []  # 空列表
+        # 感知增量编码：只发送「相比上一tick新增」的感知
+        self.perception_delta: bool = perception_delta
+        "是否启用感知增量编码"
+        self.perception_keep_alive: int = perception_keep_alive
+        "增量编码下，每隔多少tick重发一次完整感知（≤0：从不重发）"
+        self._last_perceptions: dict[NARSSensor:set[NARSPerception]] = {}  # 感知器→上一tick的感知集合
+        self._perception_ages: dict[NARSSensor:int] = {}  # 感知器→距上次完整发送的tick数
         # 使用「对象复合」的形式，把「具体程序启动」的部分交给「NARSProgram」处理
         self.brain: NARSProgram = None
         self.enable_brain_control: bool = True  # 决定是否「接收NARS操作」
         self.enable_brain_sense: bool = True  # 决定是否「接收外界感知」
+        self.brain_pool: NARSProgramPool = pool
+        "程序池：若有，则从中租借/向其归还大脑，而非每次都启动/终止CIN"
+        self.brain_profile: CINProfile = profile
+        "大脑的资源配置（None⇔使用程序类的默认配置；从程序池租借时使用池的配置）"
+        self.random: random.Random = random.Random(seed)
+        "babble所用的随机数生成器（指定种子⇔babble可复现）"
         nars_type and self.equip_brain(
             nars_type, rootPath)  # 若未输入nars_type，也可以后续再初始化
         # 定义自身的「总目标」
         self.mainGoal: str = mainGoal
         self.mainGoal_negative: str = mainGoal_negative
+        # 目标提醒相关
+        self.goal_reminder_policy: GoalReminderPolicy = goal_reminder_policy
+        "目标提醒策略"
+        self.goal_reminder_interval: float = goal_reminder_interval
+        "目标提醒间隔（EVERY_N_TICKS：tick数；EVERY_T_SECONDS：秒数）"
+        self.clock = monotonic
+        "目标提醒所用的时钟（可替换为游戏内时钟）"
+        self._ticks_since_goal_reminder: int = 0
+        self._last_goal_reminder_time: float = None  # None⇔从未提醒
+        self._goal_feedback_pending: bool = True  # 首个tick总是提醒
+        self._total_goal_reminders: int = 0  # 实际发送的目标提醒数
+        self._total_goal_reminders_suppressed: int = 0  # 因策略而省略的目标提醒数
         # 感知相关
         self._total_sense_inputs: int = 0  # 从外界获得的感知输入量
+        self._total_sense_suppressed: int = 0  # 因增量编码而未发送的感知量
         # 操作相关
         self._total_initiative_operates: int = 0  # 从NARS程序接收的操作总数
 
@@ -63,29 +107,96 @@ class NARSAgent:
         self.type: NARSType = nars_type
         if self.brain:  # 已经「装备」则报错
             raise "Already equipped a program!"
-        self.brain: NARSProgram = NARSProgram.fromType(
-            type=nars_type,
-            rootPath=rootPath,
-        )
+        if self.brain_pool is not None:  # 从程序池租借：已启动、已重置
+            self.brain: NARSProgram = self.brain_pool.acquire(nars_type)
+        else:
+            self.brain: NARSProgram = NARSProgram.fromType(
+                type=nars_type,
+                rootPath=rootPath,
+                profile=self.brain_profile,
+            )
         # 遇到「截获的操作」：交给专门函数处理
         self.brain.out_hook = self._handle_out_line
-        # 启动大脑
-        self.brain.launch()
+        # 智能体只关心操作行：其余输出行无需解码、无需调用钩子（除非程序需要查看所有行，如NARS-Python的「拒绝」信息）
+        self.brain.out_filter_operations = not self.brain.INSPECTS_ALL_LINES
+        # 能直接给出操作的程序（如进程内ONA）：跳过输出行解析
+        self.brain.operation_hook = self.handle_program_operation
+        # 新大脑没有「上一tick」：重置增量编码状态
+        self.reset_perception_delta()
+        # 启动大脑（租借来的大脑已经启动）
+        self.brain_pool is None and self.brain.launch()
 
     def disconnect_brain(self):
-        "与游戏「解耦」，类似「断开连接」的作用"
-        self.brain and self.brain.terminate()  # 终止程序运行
+        "与游戏「解耦」，类似「断开连接」的作用：有程序池则归还大脑，否则终止程序"
+        if self.brain:
+            if self.brain_pool is not None:
+                self.brain_pool.release(self.brain)  # 重置后放回池中
+            else:
+                self.brain.terminate()  # 终止程序运行
         self.brain = None  # 空置，以便下一次定义
 
     # update sensors (object positions), remind goals, and make inference
     def update(self, *sense_args: tuple, **sense_targets: dict):
-        "NARS在环境中的行动：感知更新→目标提醒→推理步进"
-        self.update_sensors(*sense_args, **sense_targets)
-        # 原「remind_goal」：时刻提醒智能体要做的事情
-        self.mainGoal and self.put_goal(self.mainGoal)
-        self.mainGoal_negative and self.put_goal(
-            self.mainGoal_negative, True)  # 时刻提醒智能体*不要做*的事情
-        self._inference_step()
+        "NARS在环境中的行动：感知更新→目标提醒→推理步进（作为一帧整体提交）"
+        with self.frame():
+            self.update_sensors(*sense_args, **sense_targets)
+            self.remind_goals()
+            self._inference_step()
+
+    # 目标提醒相关 #
+
+    def remind_goals(self) -> None:
+        "原「remind_goal」：按提醒策略，提醒智能体要做/不要做的事情"
+        goals: list[tuple[str, bool]] = [
+            (goal, is_negative)
+            for goal, is_negative in (
+                (self.mainGoal, False),  # 要做的事情
+                (self.mainGoal_negative, True),  # *不要做*的事情
+            )
+            if goal
+        ]
+        if self._should_remind_goals():
+            for goal, is_negative in goals:
+                self.put_goal(goal, is_negative)
+            self._total_goal_reminders += len(goals)
+            self._ticks_since_goal_reminder = 0
+            self._last_goal_reminder_time = self.clock()
+            self._goal_feedback_pending = False
+        else:
+            self._total_goal_reminders_suppressed += len(goals)
+
+    def _should_remind_goals(self) -> bool:
+        "根据提醒策略，判断本tick是否需要提醒目标"
+        self._ticks_since_goal_reminder += 1
+        match self.goal_reminder_policy:
+            case GoalReminderPolicy.EVERY_N_TICKS:
+                return (
+                    self._last_goal_reminder_time is None
+                    or self._ticks_since_goal_reminder >= self.goal_reminder_interval
+                )
+            case GoalReminderPolicy.EVERY_T_SECONDS:
+                return (
+                    self._last_goal_reminder_time is None
+                    or self.clock() - self._last_goal_reminder_time >= self.goal_reminder_interval
+                )
+            case GoalReminderPolicy.ON_FEEDBACK:
+                return self._goal_feedback_pending
+            case _:  # ALWAYS
+                return True
+
+    @property
+    def total_goal_reminders(self) -> int:
+        "获取实际发送的目标提醒次数"
+        return self._total_goal_reminders
+
+    @property
+    def total_goal_reminders_suppressed(self) -> int:
+        "获取因提醒策略而省略的目标提醒次数"
+        return self._total_goal_reminders_suppressed
+
+    def frame(self):
+        "（with语句）把一个tick内的感知、目标、推理步进收集为一帧，退出时一并提交给「大脑」"
+        return self.brain.frame()
 
     # 语句相关 #
 
@@ -99,10 +210,35 @@ class NARSAgent:
         # 遍历所有感知器，从感知器统一获得感知
         for sensor in self._sensors:
             if sensor.enabled:  # 仅当感知器启用时遍历
+                perceptions = sensor(*sense_args, **sense_targets)
+                if self.perception_delta:  # 增量编码：过滤掉上一tick已发送的感知
+                    perceptions = self._delta_perceptions(sensor, perceptions)
                 # 遍历获得的所有「感知」
-                for perception in sensor(*sense_args, **sense_targets):
+                for perception in perceptions:
                     self.add_perception(perception)
 
+    def _delta_perceptions(self, sensor: NARSSensor, perceptions) -> list[NARSPerception]:
+        "感知增量编码：返回相比上一tick新增的感知（到达保活间隔时返回全部）"
+        perceptions: list[NARSPerception] = list(perceptions)  # 感知钩子可能返回生成器：只能遍历一次
+        current: set[NARSPerception] = set(perceptions)
+        age: int = self._perception_ages.get(sensor, 0) + 1
+        if sensor not in self._last_perceptions or (
+                0 < self.perception_keep_alive <= age):  # 首次感知/保活重发
+            result = perceptions
+            age = 0
+        else:
+            last: set[NARSPerception] = self._last_perceptions[sensor]
+            result = [p for p in perceptions if p not in last]
+        self._total_sense_suppressed += len(perceptions) - len(result)
+        self._last_perceptions[sensor] = current
+        self._perception_ages[sensor] = age
+        return result
+
+    def reset_perception_delta(self) -> None:
+        "清除增量编码的历史：下一tick将发送完整感知"
+        self._last_perceptions.clear()
+        self._perception_ages.clear()
+
     def add_perception(self, perception: NARSPerception) -> None:
         "统一添加感知：传递给「大脑」+计数"
         if self.enable_brain_sense:  # 需要启用「大脑感知」
@@ -116,12 +252,24 @@ class NARSAgent:
     def del_sensor(self, sensor: NARSSensor):
         "移除感知器"
         self._sensors.remove(sensor)
+        self._last_perceptions.pop(sensor, None)
+        self._perception_ages.pop(sensor, None)
 
     @property
     def total_senses(self) -> int:
         "获取从外界获得的感知次数"
         return self._total_sense_inputs
 
+    @property
+    def total_senses_suppressed(self) -> int:
+        "获取因增量编码而未发送的感知次数"
+        return self._total_sense_suppressed
+
+    @property
+    def cycles_per_tick(self) -> int:
+        "获取「大脑」最近一次tick步进的推理周期数"
+        return self.brain.cycles_per_tick
+
     @property
     def num_cached_cmds(self) -> int:
         return self.brain.num_cached_inputs
@@ -136,11 +284,13 @@ class NARSAgent:
         return self.brain.put_goal(goalName=goalName, is_negative=is_negative)
 
     def praise_goal(self, goalName: str):
-        "（现仅负责传递至brain）让智能体感到「目标被实现」，亦即「奖励」"
+        "（传递至brain）让智能体感到「目标被实现」，亦即「奖励」"
+        self._goal_feedback_pending = True  # 供「仅在反馈后提醒」策略使用
         return self.brain.praise_goal(goalName=goalName)
 
     def punish_goal(self, goalName: str):
-        "（现仅负责传递至brain）让智能体感到「目标未实现」，亦即「惩罚」"
+        "（传递至brain）让智能体感到「目标未实现」，亦即「惩罚」"
+        self._goal_feedback_pending = True  # 供「仅在反馈后提醒」策略使用
         return self.brain.punish_goal(goalName=goalName)
 
     # 操作相关 #
@@ -157,11 +307,11 @@ class NARSAgent:
         return self._operation_container.__contains__(operation.name)
 
     def __iter__(self):
-        "枚举自身的「所有操作」"
-        return {  # 保证遍历出来的是操作
-            name: NARSOperation(name)
+        "枚举自身的「所有操作」（操作已驻留，不会产生新对象）"
+        return (  # 保证遍历出来的是操作
+            NARSOperation(name)
             for name in self._operation_container
-        }.__iter__()  # 返回字典的迭代器
+        )
 
     def reset_stored_operations(self, value: int = 0):
         "重置已存储的操作"
@@ -178,7 +328,7 @@ class NARSAgent:
         ]
 
     def _handle_out_line(self, line: str):  # get operations
-        # 从一行语句中获得操作
+        # 从一行语句中获得操作：经由catch_operation_name，以便子类重写
         if self.brain and self.brain.out_hook and (operation_name := self.brain.catch_operation_name(line)):
             self.handle_program_operation(
                 NARSOperation(operation_name)  # 从字符串到操作（打包）
@@ -186,6 +336,8 @@ class NARSAgent:
 
     def handle_program_operation(self, operation: NARSOperation):
         "对接命令行与游戏：根据NARS程序返回的操作字符串，存储相应操作"
+        if self.brain and (tracer := self.brain.tracer):
+            tracer.on_operation(operation.name)
         if self.enable_brain_control:  # 需要启用「大脑操作」
             self.store_operation(operation)  # 存储操作
             self._total_initiative_operates += 1  # 增加接收的操作次数
@@ -197,9 +349,9 @@ class NARSAgent:
 
     def babble(self, probability: int = 1, operations=[], force_operation: bool = True):
         "随机行为，就像婴儿的牙牙学语（有概率）"  # 🆕为实现「与具体实现程序形式」的分离，直接提升至Agent层次
-        if not probability or random.randint(1, probability) == 1:  # 几率触发
+        if not probability or self.random.randint(1, probability) == 1:  # 几率触发
             self.force_unconscious_operation(
-                random.choice(operations),  # 随机取一个NARS操作
+                self.random.choice(operations),  # 随机取一个NARS操作
                 force_operation  # 一定要做出操作吗？
             )  # 相当于「强制无意识操作」
 
@@ -212,6 +364,11 @@ class NARSAgent:
         "存储对应操作，更新自身状态"
         self[operation] += 1  # 直接设置对应「要执行的操作」为真
 
+    def mark_operations_consumed(self) -> None:
+        "（对接环境）已存储的操作已被环境取用：记录端到端延迟追踪的最后一个阶段"
+        if self.brain and (tracer := self.brain.tracer):
+            tracer.on_consumed()
+
     @property
     def stored_operation_dict(self) -> dict[NARSOperation:int]:
         "获取自己存储的操作字典（复制新对象）"
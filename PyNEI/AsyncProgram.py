@@ -0,0 +1,364 @@
+"""基于asyncio的CIN通信
+
+与`Program`中基于线程的`Cmdline`家族功能对应，但：
+- 使用`asyncio.create_subprocess_exec`直接启动CIN，读写均在事件循环中完成
+- 不为每个实例开读/写线程：一个事件循环即可驱动多个CIN
+- 输入API均可等待（await），操作以异步迭代器的形式给出
+
+类の概览
+- AsyncCmdline: 抽象一个基于asyncio子进程的CIN通信接口
+- AsyncOpenNARS / AsyncONA / AsyncPython: 对应的具体实现
+"""
+
+import asyncio  # 用于异步子进程
+import locale  # 用于确定管道编码
+from time import monotonic  # 用于统计启动耗时
+from contextlib import asynccontextmanager  # 用于「帧」的异步上下文管理
+
+from PyNEI.Elements import *
+from PyNEI.Program import NARSType, NARSProgram, Cmdline, OpenNARS, ONA, Python, TYPE_CIN_DICT
+from PyNEI.Buffer import OverflowPolicy
+from PyNEI.Parser import LineClassifier
+
+
+class AsyncCmdline(NARSProgram):
+    """抽象类：所有用asyncio子进程实现的CIN
+    - 语法（各语句模板、输出行分类器、推理循环频率、默认配置）与启动参数均借用对应的同步类`SYNC_CLASS`
+    - 写入：命令先进入命令队列（或当前帧），在`flush`时一次write+drain写入
+    - 读取：一个读任务逐行读取输出，先按字节前缀排除非操作行，再解析出操作
+    """
+
+    SYNC_CLASS: type = Cmdline
+    "（子类实现）对应的同步类：从中借用语法与启动参数"
+
+    _BORROWED_ATTRIBUTES: tuple[str, ...] = (
+        'SENSE_TEMPLATE',
+        'BABBLE_TEMPLATE',
+        'GOAL_TEMPLATE',
+        'GOAL_TEMPLATE_NEGATIVE',
+        'PRAISE_TEMPLATE',
+        'PUNISH_TEMPLATE',
+        'OPERATION_REGISTER_TEMPLATE',
+        'LINE_CLASSIFIER',
+        'DEFAULT_INFERENCE_CYCLE_FREQUENCY',
+        'DEFAULT_PROFILE',
+        'RESET_COMMANDS',
+        'INSPECTS_ALL_LINES',
+    )
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        "子类定义时，从其同步类中复制语法相关的类属性（子类自身定义的除外）"
+        super().__init_subclass__(**kwargs)
+        for name in AsyncCmdline._BORROWED_ATTRIBUTES:
+            if name not in cls.__dict__:
+                setattr(cls, name, getattr(cls.SYNC_CLASS, name))
+
+    LINE_CLASSIFIER: LineClassifier = None
+    "输出行分类器（借用自同步类）"
+
+    OPERATION_QUEUE_CAPACITY: int = 0x100
+    "待取出的操作的最大数量：满时丢弃最早的操作"
+
+    READ_LIMIT: int = 0x100000
+    "单行输出的最大字节数（asyncio流读取的缓冲上限）"
+
+    def __init__(self, out_hook=None, operation_queue_capacity: int = None, **kwargs):
+        super().__init__(out_hook, **kwargs)
+        # 事件循环中不能阻塞：有界队列必须使用非阻塞的溢出策略
+        if self._cached_inputs.capacity > 0 and self._cached_inputs.policy == OverflowPolicy.BLOCK:
+            raise ValueError(
+                'AsyncCmdline cannot block the event loop: use a non-blocking overflow policy for a bounded queue')
+        "输出行分类器（可按实例替换）"
+        self.line_classifier: LineClassifier = self.__class__.LINE_CLASSIFIER
+        "是否只把（可能的）操作行传给out_hook：其余行既不解码，也不调用钩子"
+        self.out_filter_operations: bool = False
+        "管道编码"
+        self.encoding: str = locale.getpreferredencoding(False)
+        self.process: asyncio.subprocess.Process = None
+        self._read_task: asyncio.Task = None
+        self._operations: asyncio.Queue = asyncio.Queue(
+            self.__class__.OPERATION_QUEUE_CAPACITY
+            if operation_queue_capacity is None
+            else operation_queue_capacity
+        )
+        # 统计 #
+        self.num_lines_read: int = 0  # 从CIN读取的输出行数
+        self.num_operations_dropped: int = 0  # 因无人取出而被丢弃的操作数
+        self.num_write_batches: int = 0  # 批量写入的次数（即drain次数）
+        self.num_batched_inputs: int = 0  # 批量写入的命令总数
+        self.num_inputs_written: int = 0  # 写入CIN的命令总数（供推理周期控制器测量写出速率）
+
+    @property
+    def type(self) -> NARSType:
+        "获取自身所属的NARS类型（经fromType构造的，即构造时的类型；否则与同步类一致）"
+        return self._nars_type or TYPE_CIN_DICT.get(self.__class__.SYNC_CLASS, None)
+
+    @property
+    def launch_args(self) -> list[str]:
+        "启动CIN所用的命令行参数列表（借用自同步类）"
+        return self.__class__.SYNC_CLASS.launch_args.fget(self)
+
+    # 进程相关 #
+
+    async def launch(self) -> None:
+        "启动NARS程序：创建子进程与读任务，并发送配置中的启动命令（如关闭CIN的冗余输出）"
+        self.report_profile()
+        self.launch_time = monotonic()
+        self.first_operation_time = None
+        self.process = await asyncio.create_subprocess_exec(
+            *self.launch_args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=self.__class__.READ_LIMIT,
+        )
+        self._read_task = asyncio.create_task(self._read_lines())
+        for cmd in self.profile.commands():
+            await self.add_input(cmd)
+
+    @property
+    def isAlive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def terminate(self) -> None:
+        "终止程序（终止后就不使用了）"
+        try:
+            if self.isAlive:
+                self.process.kill()
+            if self._read_task is not None:
+                self._read_task.cancel()
+            self._read_task = None
+        except BaseException as e:
+            print(f'Failed to terminate process: {e}')
+        super().terminate()
+
+    async def aclose(self) -> None:
+        "终止程序，并等待子进程退出"
+        process: asyncio.subprocess.Process = self.process
+        self.terminate()
+        if process is not None:
+            await process.wait()
+        self.process = None
+
+    async def __aenter__(self):
+        await self.launch()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.aclose()
+
+    # 语句相关 #
+
+    def write_line(self, cmd: str) -> None:
+        "缓存命令：帧内暂存于帧，否则存入命令队列，待flush时写入"
+        if self._frame_inputs is not None:
+            self._frame_inputs.append(cmd)
+        else:
+            self._enqueue(cmd)
+
+    async def flush(self) -> None:
+        "把命令队列中的所有命令以换行拼接，一次write+drain写入CIN"
+        queue = self._cached_inputs
+        if queue is None or not self.isAlive:
+            return
+        if not (cmds := queue.get_batch(len(queue), timeout=0)):
+            return
+        if tracer := self.tracer:
+            tracer.on_write(cmds)
+        self.process.stdin.write(('\n'.join(cmds) + '\n').encode(self.encoding))
+        await self.process.stdin.drain()
+        if tracer:
+            tracer.on_flush()
+        self.num_write_batches += 1
+        self.num_batched_inputs += len(cmds)
+        self.num_inputs_written += len(cmds)
+
+    async def _write(self, cmd: str) -> None:
+        "（内部）缓存一条命令；不在帧内时立即写入"
+        self.write_line(cmd)
+        if self._frame_inputs is None:
+            await self.flush()
+
+    async def add_input(self, sentence: str) -> None:
+        "以字符串形式注入NAL语句"
+        await self._write(sentence)
+
+    async def add_inference_cycles(self, num: int) -> None:
+        "推理循环步进（不会被溢出策略合并或丢弃）"
+        self._enqueue_cycles(num)
+        if self._frame_inputs is None:
+            await self.flush()
+
+    async def update_inference_cycles(self) -> None:
+        "更新自身推理循环"
+        (num := self.next_inference_cycles()) and await self.add_inference_cycles(num)
+
+    async def add_perception(self, perception: NARSPerception) -> None:
+        "添加感知"
+        await self._write(self.render_sentence(
+            self.__class__.SENSE_TEMPLATE,
+            perception.subject,
+            perception.adjective
+        ))
+
+    async def put_goal(self, goalName: str, is_negative: bool = False) -> None:
+        "向智能体置入目标（以NAL语句的形式）"
+        await self._write(self.render_sentence(
+            self.__class__.GOAL_TEMPLATE_NEGATIVE
+            if is_negative
+            else self.__class__.GOAL_TEMPLATE,
+            goalName
+        ))
+
+    async def praise_goal(self, goalName: str) -> None:
+        "让智能体感到「目标被实现」，亦即「奖励」"
+        await self._write(self.render_sentence(
+            self.__class__.PRAISE_TEMPLATE, goalName))
+
+    async def punish_goal(self, goalName: str) -> None:
+        "让智能体感到「目标未实现」，亦即「惩罚」"
+        await self._write(self.render_sentence(
+            self.__class__.PUNISH_TEMPLATE, goalName))
+
+    async def put_unconscious_operation(self, operation: NARSOperation) -> None:
+        "强制「无意识操作」：告诉NARS程序「我执行了这个操作」"
+        if self.__class__.BABBLE_TEMPLATE:
+            await self._write(self.render_sentence(
+                self.__class__.BABBLE_TEMPLATE, operation.name))
+
+    async def register_basic_operation(self, operation: NARSOperation) -> None:
+        "注册「基础操作」：告诉NARS程序「我可以执行这个操作」"
+        if self.__class__.OPERATION_REGISTER_TEMPLATE:
+            await self._write(self.render_sentence(
+                self.__class__.OPERATION_REGISTER_TEMPLATE, operation.name))
+
+    @asynccontextmanager
+    async def async_frame(self):
+        "（语法糖）以async with语句包裹一帧：正常退出时提交并写入，出错时放弃"
+        self.begin_frame()
+        try:
+            yield self
+        except BaseException:
+            self.abort_frame()
+            raise
+        self.commit_frame()
+        if self._frame_inputs is None:  # 最外层帧：立即写入
+            await self.flush()
+
+    # 输出相关 #
+
+    def catch_operation(self, line: str) -> tuple[str, tuple[str, ...]] | None:
+        "从输出的一行（语句）中获取信息，返回截取到的(操作名, 参数元组)，非操作行返回None"
+        return self.line_classifier and self.line_classifier.classify(line)
+
+    def catch_operation_name(self, line: str) -> str | None:
+        "从输出的一行（语句）中获取信息，并返回截取到的「操作字符串」（同`Cmdline.catch_operation_name`：不提取参数）"
+        return self.line_classifier and self.line_classifier.operation_name(line)
+
+    async def _read_lines(self) -> None:
+        "（内部）读任务：逐行读取输出；非操作行在字节层面即被排除，无需解码"
+        stdout: asyncio.StreamReader = self.process.stdout
+        operations: asyncio.Queue = self._operations
+        encoding: str = self.encoding
+        inspects_all_lines: bool = self.__class__.INSPECTS_ALL_LINES
+        try:
+            async for raw in stdout:
+                self.num_lines_read += 1
+                if tracer := self.tracer:
+                    tracer.on_output_line()
+                raw = raw.strip()
+                classifier: LineClassifier = self.line_classifier
+                is_operation: bool = classifier is not None and classifier.is_candidate_bytes(raw)
+                out_hook = self.out_hook
+                if not is_operation and not inspects_all_lines and (out_hook is None or self.out_filter_operations):
+                    continue
+                line: str = raw.decode(encoding, errors='replace')
+                if out_hook and (is_operation or not self.out_filter_operations):
+                    out_hook(line)
+                if (is_operation or inspects_all_lines) and (operation_name := self.catch_operation_name(line)):
+                    if self.first_operation_time is None:  # 记录启动耗时
+                        self.first_operation_time = monotonic()
+                    if tracer:
+                        tracer.on_operation(operation_name)
+                    if operations.full():  # 丢弃最早的操作，为新操作腾出空位
+                        operations.get_nowait()
+                        self.num_operations_dropped += 1
+                    operations.put_nowait(NARSOperation(operation_name))
+        finally:
+            # 输出结束（进程退出或任务被取消）：通知所有迭代者
+            if operations.full():
+                operations.get_nowait()
+            operations.put_nowait(None)
+
+    async def operations(self):
+        "异步迭代器：依次给出CIN输出的操作，直到CIN退出"
+        while (operation := await self._operations.get()) is not None:
+            if tracer := self.tracer:
+                tracer.on_consumed()
+            yield operation
+        self._operations.put_nowait(None)  # 让其它迭代者也能结束
+
+    def __aiter__(self):
+        return self.operations()
+
+    # 程序构造入口 #
+
+    @staticmethod
+    def fromType(type: NARSType, rootPath: str = '.', out_hook=None, **kwargs):
+        "从NARSType中自动构造异步CIN对象（参数同`NARSProgram.fromType`）"
+        cls, app_name = ASYNC_TYPE_CIN_DICT[type]
+        program: AsyncCmdline = cls(NARSProgram.resolve_path(rootPath, app_name), out_hook=out_hook, **kwargs)
+        program._nars_type = type
+        return program
+
+
+class AsyncOpenNARS(AsyncCmdline):
+    """Java版实现：OpenNARS（asyncio版）
+    """
+
+    SYNC_CLASS: type = OpenNARS
+
+    def __init__(self, jar_path: str = f'./{OpenNARS.DEFAULT_JAR_NAME}', out_hook=None, **kwargs):
+        self.jar_path = jar_path
+        super().__init__(out_hook=out_hook, **kwargs)
+
+
+class AsyncONA(AsyncCmdline):
+    """C实现：OpenNARS for Application（asyncio版）
+    """
+
+    SYNC_CLASS: type = ONA
+
+    def __init__(self, exe_path: str = f'./{ONA.DEFAULT_EXE_NAME}', out_hook=None, **kwargs):
+        self.exe_path = exe_path
+        super().__init__(out_hook=out_hook, **kwargs)
+
+
+class AsyncPython(AsyncCmdline):
+    """Python实现：NARS Python（asyncio版）
+    """
+
+    SYNC_CLASS: type = Python
+
+    def __init__(self, exe_path: str = f'./{Python.DEFAULT_EXE_NAME}', out_hook=None, **kwargs):
+        self.exe_path = exe_path
+        super().__init__(out_hook=out_hook, **kwargs)
+
+    def catch_operation(self, line: str) -> tuple[str, tuple[str, ...]] | None:
+        # 识别「拒绝」信息（同`Python.catch_operation`）
+        if not (operation := super().catch_operation(line)):
+            Python.report_reject(line)
+        return operation
+
+    def catch_operation_name(self, line: str) -> str | None:
+        # 识别「拒绝」信息（同`Python.catch_operation_name`）
+        if not (operation_name := super().catch_operation_name(line)):
+            Python.report_reject(line)
+        return operation_name
+
+
+ASYNC_TYPE_CIN_DICT: dict[NARSType:tuple[type, str]] = {
+    NARSType.OPENNARS: (AsyncOpenNARS, OpenNARS.DEFAULT_JAR_NAME),
+    NARSType.ONA: (AsyncONA, ONA.DEFAULT_EXE_NAME),
+    NARSType.ONA_OLD: (AsyncONA, ONA.DEFAULT_EXE_NAME_OLD),
+    NARSType.PYTHON: (AsyncPython, Python.DEFAULT_EXE_NAME),
+}
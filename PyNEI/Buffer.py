@@ -0,0 +1,303 @@
+"""NARS程序的输入/输出缓冲区
+
+- 输入：用于「主线程写入→写线程读出」的命令传递，取代原先的「列表+忙等轮询」
+- 输出：用于「读线程→钩子分发线程」的输出行传递，防止慢速钩子阻塞管道
+
+类の概览
+- OverflowPolicy: 缓冲区满时的溢出策略
+- CommandQueue: 有界、阻塞的先进先出命令队列
+- OutputDropPolicy: 输出队列的丢弃策略
+- OutputQueue: 读线程与钩子分发之间的有界输出队列
+"""
+
+import threading  # 用于线程同步
+from time import monotonic  # 用于批量等待的计时
+from collections import deque, Counter  # 双端队列：O(1)出队；计数器：去重时查重
+from enum import Enum  # 枚举溢出策略
+
+
+class OverflowPolicy(Enum):
+    """命令队列的「溢出策略」
+    决定「队列已满时新命令如何处理」
+    """
+
+    BLOCK: str = 'block'
+    '阻塞写入方，直到队列有空位'
+    DROP_OLDEST: str = 'drop_oldest'
+    '丢弃最早的命令，为新命令腾出空位'
+    DROP_NEWEST: str = 'drop_newest'
+    '丢弃新命令，保留已有命令'
+    COALESCE: str = 'coalesce'
+    '合并重复：与队列中已有命令相同的新命令直接忽略；满时退化为「丢弃最早」'
+
+    @staticmethod
+    def from_str(policy_str: str):
+        "从字符串获取策略（大小写不敏感）"
+        return OverflowPolicy(policy_str.lower())
+
+
+class _EssentialCommand(str):
+    "（内部）关键命令的标记（如推理步进）：不参与合并，也不会被溢出策略丢弃"
+    __slots__ = ()
+
+
+class CommandQueue:
+    """有界阻塞命令队列
+    - 基于`deque`实现O(1)的入队/出队
+    - 基于`threading.Condition`实现「无命令时休眠」而非忙等
+    - 容量为0（或负数）时视作「无界」
+    - 关键命令（put时essential=True）不计入容量、不被合并或丢弃，也不阻塞写入方（同OutputQueue中的操作行）
+    """
+
+    def __init__(self, capacity: int = 0, policy: OverflowPolicy = OverflowPolicy.BLOCK) -> None:
+        self.capacity: int = capacity
+        "队列容量（≤0：无界）"
+        self.policy: OverflowPolicy = policy
+        "溢出策略"
+        self._queue: deque[str] = deque()
+        self._pending: Counter[str] = Counter()  # 仅在「合并」策略下使用，用于O(1)查重
+        self._num_essential: int = 0  # 队列中的关键命令数
+        self._condition: threading.Condition = threading.Condition()
+        self._closed: bool = False
+        # 统计 #
+        self.num_dropped: int = 0
+        "因溢出而丢弃（含合并）的命令数"
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
+
+    @property
+    def is_full(self) -> bool:
+        "队列是否已满（无界队列永不满；关键命令不计入）"
+        return 0 < self.capacity <= len(self._queue) - self._num_essential
+
+    @property
+    def closed(self) -> bool:
+        "队列是否已关闭（关闭后不再接受命令，并唤醒所有等待者）"
+        return self._closed
+
+    def put(self, cmd: str, essential: bool = False) -> bool:
+        "置入一条命令（返回：命令是否被接收；关键命令只在队列关闭后才会被拒绝）"
+        with self._condition:
+            if self._closed:
+                return False
+            if essential:  # 关键命令：直接入队
+                self._queue.append(_EssentialCommand(cmd))
+                self._num_essential += 1
+                self._condition.notify_all()
+                return True
+            # 合并重复：已有相同命令待写入，则无需再次写入
+            if self.policy == OverflowPolicy.COALESCE and self._pending[cmd] > 0:
+                self.num_dropped += 1
+                return False
+            # 处理溢出
+            if self.is_full:
+                match self.policy:
+                    case OverflowPolicy.BLOCK:
+                        while self.is_full and not self._closed:
+                            self._condition.wait()
+                        if self._closed:
+                            return False
+                    case OverflowPolicy.DROP_NEWEST:
+                        self.num_dropped += 1
+                        return False
+                    case OverflowPolicy.DROP_OLDEST | OverflowPolicy.COALESCE:
+                        self._forget(self._pop_oldest_droppable())
+                        self.num_dropped += 1
+            # 入队
+            self._queue.append(cmd)
+            if self.policy == OverflowPolicy.COALESCE:
+                self._pending[cmd] += 1
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout: float = None) -> str | None:
+        "取出最早的命令；无命令时休眠等待（返回None：超时或已关闭）"
+        with self._condition:
+            while not self._queue:
+                if self._closed or not self._condition.wait(timeout):
+                    return None
+            cmd: str = self._queue.popleft()
+            self._forget(cmd)
+            self._condition.notify_all()  # 唤醒可能被阻塞的写入方
+            return cmd
+
+    def get_batch(self, max_size: int, linger: float = 0, timeout: float = None) -> list[str]:
+        """批量取出命令
+        - 先休眠等待首条命令（返回空列表：超时或已关闭）
+        - 再取出至多max_size条；不足时最多再等待linger秒以凑满一批
+        """
+        with self._condition:
+            while not self._queue:
+                if self._closed or not self._condition.wait(timeout):
+                    return []
+            if linger > 0 and len(self._queue) < max_size:
+                deadline: float = monotonic() + linger
+                while (
+                    len(self._queue) < max_size
+                    and not self._closed
+                    and (remaining := deadline - monotonic()) > 0
+                ):
+                    self._condition.wait(remaining)
+            batch: list[str] = [
+                self._queue.popleft()
+                for _ in range(min(max_size, len(self._queue)))
+            ]
+            for cmd in batch:
+                self._forget(cmd)
+            self._condition.notify_all()  # 唤醒可能被阻塞的写入方
+            return batch
+
+    def wait_for_length(self, max_length: int, timeout: float = None) -> bool:
+        "在队列上休眠，直到其中的命令数不超过max_length（或队列被关闭）；返回：是否未超时"
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: len(self._queue) <= max_length or self._closed, timeout)
+
+    def clear(self) -> None:
+        "清空队列"
+        with self._condition:
+            self._queue.clear()
+            self._pending.clear()
+            self._num_essential = 0
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        "关闭队列：唤醒所有等待中的读写方，使其得以退出"
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _pop_oldest_droppable(self) -> str:
+        "（内部）取出最早的非关键命令（队列已满时调用，故必然存在）"
+        if not self._num_essential or not isinstance(self._queue[0], _EssentialCommand):
+            return self._queue.popleft()
+        for i, cmd in enumerate(self._queue):
+            if not isinstance(cmd, _EssentialCommand):
+                del self._queue[i]
+                return cmd
+
+    def _forget(self, cmd: str) -> None:
+        "（内部）命令出队后，更新关键命令数与查重计数"
+        if isinstance(cmd, _EssentialCommand):
+            self._num_essential -= 1
+        elif self.policy == OverflowPolicy.COALESCE:
+            if (n := self._pending[cmd]) > 1:
+                self._pending[cmd] = n - 1
+            else:
+                del self._pending[cmd]
+
+
+class OutputDropPolicy(Enum):
+    """输出队列的「丢弃策略」
+    决定「CIN输出过快、钩子处理不及时」时丢弃哪些输出行
+    - 操作行永不丢弃
+    """
+
+    OPERATIONS_ONLY: str = 'operations_only'
+    '队列满时只接收操作行，新的非操作行直接丢弃'
+    DROP_OLDEST: str = 'drop_oldest'
+    '队列满时丢弃最早的非操作行，为新行腾出空位'
+    SAMPLE: str = 'sample'
+    '队列过半后对非操作行抽样（每sample_interval行保留一行），满时丢弃新的非操作行'
+
+    @staticmethod
+    def from_str(policy_str: str):
+        "从字符串获取策略（大小写不敏感）"
+        return OutputDropPolicy(policy_str.lower())
+
+
+class OutputQueue:
+    """读线程与钩子分发之间的有界输出队列
+    - 操作行与非操作行分两个deque存放，按序号合并出队，使「丢弃最早的非操作行」为O(1)
+    - 操作行不计入容量限制，保证不会因背压丢失操作
+    - 队列元素：(序号, 输出行, 入队时间)
+    """
+
+    def __init__(self, capacity: int, policy: OutputDropPolicy = OutputDropPolicy.DROP_OLDEST, sample_interval: int = 10) -> None:
+        self.capacity: int = capacity
+        "非操作行的容量"
+        self.policy: OutputDropPolicy = policy
+        "丢弃策略"
+        self.sample_interval: int = sample_interval
+        "抽样策略下，每多少行非操作行保留一行"
+        self._operations: deque[tuple[int, str, float]] = deque()
+        self._others: deque[tuple[int, str, float]] = deque()
+        self._condition: threading.Condition = threading.Condition()
+        self._closed: bool = False
+        self._seq: int = 0  # 入队序号，用于合并两个deque
+        self._sample_counter: int = 0
+        # 统计 #
+        self.num_put: int = 0
+        "入队的行数"
+        self.num_dropped: int = 0
+        "因背压而丢弃的行数"
+
+    def __len__(self) -> int:
+        return len(self._operations) + len(self._others)
+
+    def put(self, line: str, is_operation: bool) -> bool:
+        "置入一行输出（返回：是否被接收）"
+        with self._condition:
+            if self._closed:
+                return False
+            if is_operation:  # 操作行：始终接收
+                self._operations.append((self._seq, line, monotonic()))
+            else:
+                if not self._accept_other():
+                    self.num_dropped += 1
+                    return False
+                self._others.append((self._seq, line, monotonic()))
+            self._seq += 1
+            self.num_put += 1
+            self._condition.notify()
+            return True
+
+    def _accept_other(self) -> bool:
+        "（内部）根据丢弃策略，判断能否接收一行新的非操作行（可能丢弃旧行）"
+        n_others: int = len(self._others)
+        match self.policy:
+            case OutputDropPolicy.OPERATIONS_ONLY:
+                return n_others < self.capacity
+            case OutputDropPolicy.DROP_OLDEST:
+                if n_others >= self.capacity:
+                    if not self._others:  # 容量为零
+                        return False
+                    self._others.popleft()
+                    self.num_dropped += 1
+                return True
+            case OutputDropPolicy.SAMPLE:
+                if n_others >= self.capacity:
+                    return False
+                if n_others * 2 >= self.capacity:  # 过半：开始抽样
+                    self._sample_counter += 1
+                    return self._sample_counter % self.sample_interval == 0
+                return True
+
+    def get(self, timeout: float = None) -> tuple[str, float] | None:
+        "按入队顺序取出一行：返回(输出行, 入队时间)；无输出时休眠等待（返回None：超时或已关闭）"
+        with self._condition:
+            while not (self._operations or self._others):
+                if self._closed or not self._condition.wait(timeout):
+                    return None
+            if self._others and (
+                    not self._operations or self._others[0][0] < self._operations[0][0]):
+                _, line, time = self._others.popleft()
+            else:
+                _, line, time = self._operations.popleft()
+            return line, time
+
+    def clear(self) -> None:
+        "清空队列"
+        with self._condition:
+            self._operations.clear()
+            self._others.clear()
+
+    def close(self) -> None:
+        "关闭队列：唤醒等待中的分发方，使其得以退出"
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
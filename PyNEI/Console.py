@@ -32,7 +32,7 @@ class NARSConsole():
         # 启动CIN
         self.program.launch()
 
-        # 注：在此处才开始连接钩子，阻止cmd启动的输出，例如：「(c) Microsoft Corporation。保留所有权利。」
+        # 注：在此处才开始连接钩子，阻止CIN启动时的输出
         self.program.out_hook = self._out_hook
 
         # 进入命令行模式
@@ -43,7 +43,7 @@ class NARSConsole():
         # self.program.add_to_cmd('\n'*4) # 直接添加进命令行
         # self.program.add_to_cmd('\n') # 直接添加进命令行
         # self.program.add_to_cmd('\n') # 直接添加进命令行
-        self._clear_out_buffer()  # 清除cmd启动时、CIN启动前的输出
+        self._clear_out_buffer()  # 清除CIN启动时的输出
         while True:
             try:
                 # 遍历处理输出（同步）
@@ -54,7 +54,7 @@ class NARSConsole():
                 # 处理输入
                 if inp := input(self.input_prompt):
                     # 注：无需对数字「推理步骤」进行特殊识别，其效果与直接在命令行输入等价
-                    self.program.add_input(inp + '\n')  # 直接添加进命令行，附加换行后缀
+                    self.program.add_input(inp)  # 直接写入CIN（add_input会附加换行）
             except KeyboardInterrupt:  # Ctrl+C退出
                 self.program.terminate()
                 break
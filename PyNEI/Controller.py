@@ -0,0 +1,131 @@
+"""推理循环的自适应控制
+
+固定的`inference_cycle_frequency`要么太小（NARS「想」得太少），要么太大（CIN处理不过来，命令在队列中积压、延迟越来越大）
+此处根据实测的「写队列深度」「写出速率」「CIN输出速率」与目标延迟，逐tick调整推理周期数
+
+类の概览
+- InferenceCycleController: 基于「加性增、乘性减」（AIMD）的推理周期控制器
+"""
+
+from time import monotonic  # 用于测量速率
+
+
+class InferenceCycleController:
+    """推理周期控制器（AIMD）
+    - 估计延迟：待写命令数（含正在写入的）÷ 写出速率（Little定律）
+        - CIN处理不及时，管道写满后写入会阻塞：写出速率下降、待写命令增加，估计延迟随之上升
+    - 延迟超出预算：周期数乘性减少
+    - 延迟低于预算的一定比例：周期数加性增加
+    - 增加后若CIN的输出速率明显下降（CIN已饱和），则撤回这次增加
+    - 速率均为指数移动平均，以平滑单个tick的抖动；以首个实测样本为初值（而非0，否则起初的延迟会被高估）
+    - 测得首个时间间隔之前不做调整（此时尚无速率可言）
+    """
+
+    def __init__(
+        self,
+        latency_budget: float = 0.2,
+        initial_cycles: int = 1,
+        min_cycles: int = 1,
+        max_cycles: int = 100,
+        increase_step: int = 1,
+        decrease_factor: float = 0.5,
+        headroom: float = 0.5,
+        output_drop_tolerance: float = 0.5,
+        smoothing: float = 0.3,
+        clock=monotonic,
+    ) -> None:
+        self.latency_budget: float = latency_budget
+        "目标延迟（秒）：命令从入队到写入CIN的期望上限"
+        self.min_cycles: int = min_cycles
+        "每tick推理周期数的下限"
+        self.max_cycles: int = max_cycles
+        "每tick推理周期数的上限"
+        self.increase_step: int = increase_step
+        "加性增加的步长"
+        self.decrease_factor: float = decrease_factor
+        "乘性减少的系数"
+        self.headroom: float = headroom
+        "估计延迟低于「预算×此比例」时才增加周期数"
+        self.output_drop_tolerance: float = output_drop_tolerance
+        "增加周期数后，输出速率下降超过此比例即视作CIN饱和"
+        self.smoothing: float = smoothing
+        "指数移动平均中新样本的权重"
+        self.clock = clock
+        "测量速率所用的时钟"
+        self.cycles_per_tick: int = max(min_cycles, min(max_cycles, initial_cycles))
+        "当前每tick的推理周期数（指标）"
+        # 测量状态
+        self._last_time: float = None
+        self._last_written: int = 0
+        self._last_read: int = 0
+        self._rate_before_increase: float = None  # 上次增加前的输出速率（None⇔上次未增加）
+        self._num_samples: int = 0  # 已测得的速率样本数（每个时间间隔一个）
+        # 指标 #
+        self.drain_rate: float = 0
+        "写出速率（条/秒，平滑后）"
+        self.output_rate: float = 0
+        "CIN输出速率（行/秒，平滑后）"
+        self.estimated_latency: float = 0
+        "估计延迟（秒）"
+        self.num_increases: int = 0
+        "增加周期数的次数"
+        self.num_decreases: int = 0
+        "减少周期数的次数"
+
+    def _smooth(self, old: float, new: float) -> float:
+        "（内部）指数移动平均"
+        return old + self.smoothing * (new - old)
+
+    @property
+    def has_measured(self) -> bool:
+        "是否已测得至少一个时间间隔的速率"
+        return self._num_samples > 0
+
+    def measure(self, queue_depth: int, num_written: int, num_read: int) -> None:
+        "根据累计的写出条数、读取行数，更新速率与延迟估计"
+        now: float = self.clock()
+        if self._last_time is not None and (elapsed := now - self._last_time) > 0:
+            drain_rate: float = (num_written - self._last_written) / elapsed
+            output_rate: float = (num_read - self._last_read) / elapsed
+            if self._num_samples:
+                drain_rate = self._smooth(self.drain_rate, drain_rate)
+                output_rate = self._smooth(self.output_rate, output_rate)
+            self.drain_rate, self.output_rate = drain_rate, output_rate
+            self._num_samples += 1
+        self._last_time = now
+        self._last_written = num_written
+        self._last_read = num_read
+        self.estimated_latency = (
+            0 if queue_depth <= 0 or not self._num_samples  # 尚无速率：不做估计
+            else queue_depth / self.drain_rate if self.drain_rate > 0
+            else float('inf')  # 有积压却没有写出
+        )
+
+    def decide(self) -> int:
+        "根据最新的测量结果调整并返回每tick的推理周期数"
+        rate_before_increase, self._rate_before_increase = self._rate_before_increase, None
+        if self.estimated_latency > self.latency_budget or (
+            rate_before_increase  # 上次增加后输出速率明显下降：CIN已饱和
+            and self.output_rate < rate_before_increase * (1 - self.output_drop_tolerance)
+        ):
+            cycles: int = max(self.min_cycles, int(self.cycles_per_tick * self.decrease_factor))
+            if cycles < self.cycles_per_tick:
+                self.num_decreases += 1
+        elif self.estimated_latency <= self.latency_budget * self.headroom:
+            cycles: int = min(self.max_cycles, self.cycles_per_tick + self.increase_step)
+            if cycles > self.cycles_per_tick:
+                self.num_increases += 1
+                self._rate_before_increase = self.output_rate
+        else:
+            cycles: int = self.cycles_per_tick
+        self.cycles_per_tick = cycles
+        return cycles
+
+    def next_cycles(self, program) -> int:
+        "测量NARS程序的状态，返回本tick应步进的推理周期数"
+        self.measure(
+            program.num_pending_inputs,
+            getattr(program, 'num_inputs_written', 0),
+            getattr(program, 'num_lines_read', 0),
+        )
+        return self.decide() if self.has_measured else self.cycles_per_tick
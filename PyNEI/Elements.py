@@ -7,23 +7,60 @@
 - Sensor 感知器
 """
 
+import threading  # 驻留表可能被多个线程（如读线程与主线程）同时访问
+
+MAX_INTERNED: int = 0x10000
+"每个驻留表的最大条目数：满后新值不再驻留（仍可正常使用，只是不与同值对象共享）"
+
 
 class NARSOperation():  # 现在不需要枚举类
     """抽象出一个「纳思操作」
 
     主要功能：记录其名字，并方便语法嵌入
 
+    - 不可变、可哈希，且按名字「驻留」：同名操作通常是同一个对象
+        - 输出解析时反复构造操作，只是一次字典查找
+        - 驻留表满（MAX_INTERNED）后不再驻留：比较请用`==`（同一对象时即刻返回），而非`is`
+
     TODO 后续可扩展：操作参数
 
     """
 
-    def __init__(self, name: str = '') -> None:
+    __slots__ = ('name',)
+
+    _INTERNED: dict[str:'NARSOperation'] = {}
+    "驻留表：名字→操作（词汇表有限，故不做淘汰；至多MAX_INTERNED项）"
+
+    _INTERN_LOCK: threading.Lock = threading.Lock()
+    "驻留表的锁：保证同名操作不会被两个线程各构造一个"
+
+    def __new__(cls, name: str = ''):
+        "构造（或取回已驻留的）操作"
+        if (operation := cls._INTERNED.get(name)) is not None:  # 快速路径：无需加锁
+            return operation
         # 警惕「忘去除前缀」的现象
-        if name[0] == '^':
-            self.name = name[1:]  # 去头
+        if name[0:1] == '^':
+            operation = cls(name[1:])  # 去头（与无前缀的同名操作共享对象）
             print(f'Warning: mutiple "^" in name of operation {name}')
         else:  # 否则默认设置
-            self.name = name
+            operation = super().__new__(cls)
+            object.__setattr__(operation, 'name', name)
+        with cls._INTERN_LOCK:  # 加锁后再查一次：其它线程可能已抢先驻留
+            if (interned := cls._INTERNED.get(name)) is not None:
+                return interned
+            if len(cls._INTERNED) < MAX_INTERNED:
+                cls._INTERNED[name] = operation
+        return operation
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f'{self!r} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{self!r} is immutable')
+
+    def __reduce__(self):
+        "序列化：反序列化时重新驻留"
+        return (self.__class__, (self.name,))
 
     @property
     def value(self) -> any:
@@ -31,8 +68,14 @@ class NARSOperation():  # 现在不需要枚举类
         return f'^{self.name}'
 
     def __eq__(self, other: object) -> bool:
-        "相等⇔名称相等"
-        return self.name == other.name
+        "相等⇔名称相等（驻留后通常直接是同一对象）"
+        return self is other or (
+            isinstance(other, NARSOperation)
+            and self.name == other.name
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.name)
 
     def __repr__(self) -> str:
         return f"<NARS Operation {self.value}>"
@@ -48,13 +91,20 @@ class NARSPerception():  # 现在不需要枚举类
     主要功能：作为NARS感知的处理对象
 
     - 记录其「主语」「表语」，且由参数**唯一确定**
-
-    TODO：类似「字符串」的静态方法（减少对象开销）
+    - 不可变、可哈希，且按(主语, 表语)「驻留」：相等的感知通常是同一个对象（同NARSOperation：比较请用`==`）
     """
 
+    __slots__ = ('subject', 'adjective')
+
     OBJECT_SELF: str = 'SELF'
     "内置常量：NARS内置对象名「自我」"
 
+    _INTERNED: dict[tuple[str, str]:'NARSPerception'] = {}
+    "驻留表：(主语, 表语)→感知（至多MAX_INTERNED项）"
+
+    _INTERN_LOCK: threading.Lock = threading.Lock()
+    "驻留表的锁"
+
     @staticmethod
     def new(subject: str, adjective: str):
         "构造感知（与构造函数一致）"
@@ -65,18 +115,41 @@ class NARSPerception():  # 现在不需要枚举类
         "（快捷方式）构造「自身感知」（调用）"
         return NARSPerception(NARSPerception.OBJECT_SELF, adjective)
 
-    def __init__(self, subject: str, adjective: str) -> None:
-        "构造一个「NARS感知」"
-        self.subject: str = subject
-        self.adjective: str = adjective
+    def __new__(cls, subject: str, adjective: str):
+        "构造（或取回已驻留的）一个「NARS感知」"
+        key: tuple[str, str] = (subject, adjective)
+        if (perception := cls._INTERNED.get(key)) is not None:  # 快速路径：无需加锁
+            return perception
+        with cls._INTERN_LOCK:
+            if (perception := cls._INTERNED.get(key)) is None:
+                perception = super().__new__(cls)
+                object.__setattr__(perception, 'subject', subject)
+                object.__setattr__(perception, 'adjective', adjective)
+                if len(cls._INTERNED) < MAX_INTERNED:
+                    cls._INTERNED[key] = perception
+        return perception
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f'{self!r} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{self!r} is immutable')
+
+    def __reduce__(self):
+        "序列化：反序列化时重新驻留"
+        return (self.__class__, (self.subject, self.adjective))
 
     def __eq__(self, other) -> bool:
-        "相等⇔名称相等"
-        return (
-            self.subject == other.subject
+        "相等⇔名称相等（驻留后通常直接是同一对象）"
+        return self is other or (
+            isinstance(other, NARSPerception)
+            and self.subject == other.subject
             and self.adjective == other.adjective
         )
 
+    def __hash__(self) -> int:
+        return hash((self.subject, self.adjective))
+
     def __repr__(self) -> str:
         return "<NARS Perception: {%s} --> [%s] >" % (self.subject, self.adjective)
 
@@ -0,0 +1,204 @@
+"""模拟CIN：不依赖真实的opennars.jar/NAR.exe，在本地进程中模仿各CIN的命令行协议
+
+用途：基准测试与调试（真实CIN只能在Windows下经`cmd`运行，且输出速度不可控）
+- 按协议（opennars/ona/python）回显输入、输出「推理结果」行，格式与真实CIN一致，可被各自的`LINE_CLASSIFIER`解析
+- 输出量可配置：每行输入附带volume行推理输出（0⇔只输出操作，相当于真实CIN的`*volume=0`）
+- 操作按脚本给出：每收到op_every个目标，按顺序输出scripted操作中的下一个（如ONA的`^left executed with args ({SELF})`）
+- 特殊命令`*mock_burst=N`：一次输出N行（每BURST_OPERATION_INTERVAL行中有一行操作），末行是操作`^done`，供测量读取吞吐量
+- 本文件只依赖标准库，可直接作为脚本运行：`python PyNEI/MockCIN.py --protocol=ona --volume=3`
+
+类の概览
+- MockProtocol: 一种CIN的输出格式
+- MockCIN: 按协议与脚本，对每行输入给出输出行
+"""
+
+import os
+import sys
+from time import sleep
+
+BURST_COMMAND: str = '*mock_burst='
+"特殊命令：一次输出指定行数"
+
+BURST_OPERATION_INTERVAL: int = 10
+"突发输出中，每隔多少行出现一行操作"
+
+BURST_END_OPERATION: str = 'done'
+"突发输出末行的操作名（读到它即说明整批已读完）"
+
+
+class MockProtocol:
+    "一种CIN的输出格式：各模板以str.format填充"
+
+    def __init__(self, name: str, input_template: str, derived_template: str, operation_template: str) -> None:
+        self.name: str = name
+        "协议名"
+        self.input_template: str = input_template
+        "回显输入（参数：line, time）"
+        self.derived_template: str = derived_template
+        "推理输出（参数：i, time）"
+        self.operation_template: str = operation_template
+        "操作输出（参数：name）"
+
+
+PROTOCOLS: dict[str:MockProtocol] = {
+    # 操作文本：「EXE: $0.26;0.17;0.94$ ^right([{SELF}])=null」
+    'opennars': MockProtocol(
+        'opennars',
+        input_template='IN: {line} %1.00;0.90% {{{time} : (0,{time})}}',
+        derived_template='OUT: <{{enemy}} --> [x{i}]>. :|: %1.00;0.45% {{{time} : (0,{i})}}',
+        operation_template='EXE: $0.26;0.17;0.94$ ^{name}([{{SELF}}])=null',
+    ),
+    # 操作文本：「^right executed with args ({SELF})」
+    'ona': MockProtocol(
+        'ona',
+        input_template='Input: {line} occurrenceTime={time} Priority=1.000000 Truth: frequency=1.000000, confidence=0.900000',
+        derived_template='Derived: <{{enemy}} --> [x{i}]>. Priority=0.245320 Truth: frequency=1.000000, confidence=0.213010',
+        operation_template='^{name} executed with args ({{SELF}})',
+    ),
+    # 操作文本：「EXE: ^left based on desirability: 0.9」
+    'python': MockProtocol(
+        'python',
+        input_template='INPUT TASK: {line}',
+        derived_template='Derived: ({{enemy}} --> [x{i}]). %1.00;0.31%',
+        operation_template='EXE: ^{name} based on desirability: 0.9',
+    ),
+}
+"已支持的协议"
+
+
+class MockCIN:
+    """按协议与脚本，对每行输入给出输出行
+    - 目标（含「!」的语句）计数：每op_every个目标输出一个操作
+    - 纯数字的行视作推理周期：每个周期都附带volume行推理输出
+    - `*volume=`等其它命令被忽略（输出量只由启动参数决定，以保证基准测试的条件一致）；`*reset`使操作脚本从头开始
+    """
+
+    def __init__(self, protocol: str = 'ona', volume: int = 0, operations: tuple[str, ...] = ('left', 'right'), op_every: int = 1, delay_s: float = 0) -> None:
+        if protocol not in PROTOCOLS:
+            raise ValueError(f'Unknown protocol {protocol!r}, expected one of {tuple(PROTOCOLS)}')
+        self.protocol: MockProtocol = PROTOCOLS[protocol]
+        "输出格式"
+        self.volume: int = volume
+        "每行输入（或每个推理周期）附带的推理输出行数"
+        self.operations: tuple[str, ...] = tuple(operations)
+        "按顺序循环输出的操作名（空⇔从不输出操作）"
+        self.op_every: int = max(1, op_every)
+        "每收到多少个目标输出一个操作"
+        self.delay_s: float = delay_s
+        "输出操作前的模拟推理耗时（秒）"
+        self.time: int = 0  # 模拟的时间戳（每行输入加一）
+        self.num_goals: int = 0  # 已收到的目标数
+        self.num_operations: int = 0  # 已输出的操作数
+        self._num_derived: int = 0
+
+    def operation_line(self, name: str) -> str:
+        "一行操作输出"
+        return self.protocol.operation_template.format(name=name)
+
+    def derived_lines(self, n: int) -> list[str]:
+        "n行推理输出"
+        start, self._num_derived = self._num_derived, self._num_derived + n
+        template: str = self.protocol.derived_template
+        return [template.format(i=i, time=self.time) for i in range(start, start + n)]
+
+    def burst(self, n: int) -> list[str]:
+        "一次突发输出n行：每BURST_OPERATION_INTERVAL行中有一行操作，末行是结束操作"
+        lines: list[str] = self.derived_lines(max(0, n - 1))
+        if self.operations:
+            for i in range(BURST_OPERATION_INTERVAL - 1, len(lines), BURST_OPERATION_INTERVAL):
+                lines[i] = self.operation_line(self.operations[i % len(self.operations)])
+        if n > 0:
+            lines.append(self.operation_line(BURST_END_OPERATION))
+        return lines
+
+    def respond(self, line: str) -> list[str]:
+        "对一行输入给出输出行"
+        self.time += 1
+        if line.startswith(BURST_COMMAND):
+            return self.burst(int(line[len(BURST_COMMAND):]))
+        if line == '*reset':
+            self.num_goals = self.num_operations = 0
+            return []
+        if line.startswith('*'):  # 其它命令（如`*volume=0`）
+            return []
+        if line.isdigit():  # 推理周期
+            return self.derived_lines(self.volume * int(line)) if self.volume else []
+        output: list[str] = []
+        if self.volume:
+            output.append(self.protocol.input_template.format(line=line, time=self.time))
+            output.extend(self.derived_lines(self.volume))
+        if '!' in line:  # 目标
+            self.num_goals += 1
+            if self.operations and self.num_goals % self.op_every == 0:
+                self.delay_s and sleep(self.delay_s)
+                output.append(self.operation_line(
+                    self.operations[self.num_operations % len(self.operations)]))
+                self.num_operations += 1
+        return output
+
+    def run(self, stdin=None, stdout=None) -> None:
+        "主循环：逐行读取输入并输出（每行输入的输出写完后刷新一次），直到输入结束"
+        stdin = stdin or sys.stdin.buffer
+        stdout = stdout or sys.stdout.buffer
+        for raw in stdin:
+            if not (line := raw.decode('utf-8', 'replace').strip()):
+                continue
+            if output := self.respond(line):
+                stdout.write(('\n'.join(output) + '\n').encode('utf-8'))
+                stdout.flush()
+
+
+def mock_args(protocol: str = 'ona', volume: int = 0, operations: tuple[str, ...] = ('left', 'right'), op_every: int = 1, delay_s: float = 0) -> list[str]:
+    "启动模拟CIN所用的命令行参数列表（以当前的Python解释器运行本文件）"
+    return [
+        sys.executable, os.path.abspath(__file__),
+        f'--protocol={protocol}',
+        f'--volume={volume}',
+        f'--operations={",".join(operations)}',
+        f'--op-every={op_every}',
+        f'--delay-ms={delay_s * 1000:g}',
+    ]
+
+
+def mock_class(cls: type, **options) -> type:
+    """构造CIN类（Cmdline/AsyncCmdline的子类）的模拟版本：语法、解析与真实CIN完全相同，只是启动的是MockCIN
+    - 协议按（同步）类推断：OpenNARS→opennars，ONA→ona，Python→python
+    - options原样传给mock_args
+    - 构造时仍需给出（不会被使用的）可执行文件路径
+    """
+    from PyNEI.Program import OpenNARS, ONA, Python, TYPE_CIN_DICT  # 延迟导入：作为脚本运行时无需PyNEI
+    sync_class: type = getattr(cls, 'SYNC_CLASS', cls)
+    protocol: str = next((
+        name
+        for base, name in ((OpenNARS, 'opennars'), (ONA, 'ona'), (Python, 'python'))
+        if issubclass(sync_class, base)
+    ), None)
+    if protocol is None:
+        raise TypeError(f'{cls.__name__} does not speak any protocol supported by MockCIN')
+    args: list[str] = mock_args(protocol, **options)
+    nars_type = TYPE_CIN_DICT.get(sync_class)
+    return type(f'Mock{cls.__name__}', (cls,), {
+        '__doc__': f'以MockCIN模拟的{cls.__name__}（协议：{protocol}）',
+        'launch_args': property(lambda self: list(args)),
+        'type': property(lambda self: nars_type),  # 与被模拟的类一致
+    })
+
+
+def main(argv: list[str]) -> None:
+    "解析「--name=value」形式的参数并运行"
+    options: dict[str:str] = dict(
+        arg[2:].split('=', 1)
+        for arg in argv
+        if arg.startswith('--') and '=' in arg
+    )
+    MockCIN(
+        protocol=options.get('protocol', 'ona'),
+        volume=int(options.get('volume', 0)),
+        operations=tuple(filter(None, options.get('operations', 'left,right').split(','))),
+        op_every=int(options.get('op-every', 1)),
+        delay_s=float(options.get('delay-ms', 0)) / 1000,
+    ).run()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
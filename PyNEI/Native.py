@@ -0,0 +1,207 @@
+"""进程内的CIN：以共享库形式加载的ONA
+
+`ONA`需要启动一个`NAR shell`子进程，经文本管道写入语句，再逐行解析输出来获取操作；
+高频的具身循环中，进程、管道与字符串解析的开销都很可观
+
+此处经ctypes加载「ONA+shim」编译出的共享库（见`native/ona_shim.c`与`native/Makefile`）：
+- 输入：直接函数调用（与shell相同的文本协议，但不经管道）
+- 输出：操作被执行时由C回调Python，直接得到操作名，无需解析输出行
+
+⚠ONA的状态是进程全局的：同一进程中同时只能启动一个ONALibrary
+
+类の概览
+- ONALibrary: 进程内ONA（NARSType.ONA_LIB）
+"""
+
+import os  # 用于处理共享库路径
+import ctypes  # 用于加载共享库
+from time import monotonic  # 用于统计启动耗时
+
+from PyNEI.Elements import *
+from PyNEI.Program import NARSType, NARSProgram, ONA
+from PyNEI.Profile import CINProfile
+
+# C回调的类型：void (*)(const char *name, const char *args)
+OPERATION_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.c_char_p, ctypes.c_char_p)
+
+
+class ONALibrary(NARSProgram):
+    """进程内ONA：经ctypes调用共享库
+    - 语法与`ONA`一致
+    - 无读写线程：输入在调用方线程中同步执行（含ONA随之进行的推理），操作经回调同步交给`operation_hook`
+    - `out_hook`不会收到操作行（ONA自身的打印直接写到本进程的标准输出）
+    """
+
+    DEFAULT_LIB_NAME: str = 'pynei_ona.dll' if os.name == 'nt' else 'libpynei_ona.so'
+    "共享库文件名"
+
+    # 特有语法区（同ONA） #
+
+    BABBLE_TEMPLATE: str = ONA.BABBLE_TEMPLATE
+    PUNISH_TEMPLATE: str = ONA.PUNISH_TEMPLATE
+    OPERATION_REGISTER_TEMPLATE: str = ONA.OPERATION_REGISTER_TEMPLATE
+    RESET_COMMANDS: tuple[str, ...] = ONA.RESET_COMMANDS
+
+    DEFAULT_INFERENCE_CYCLE_FREQUENCY: int = ONA.DEFAULT_INFERENCE_CYCLE_FREQUENCY
+
+    DEFAULT_PROFILE: CINProfile = CINProfile(name='ONA_lib').over(NARSProgram.DEFAULT_PROFILE)
+
+    _active: 'ONALibrary' = None  # 当前启动中的实例（ONA状态为进程全局）
+    _libraries: dict[str:ctypes.CDLL] = {}  # 已加载的共享库（无法卸载，故复用）
+
+    def __init__(self, lib_path: str = os.path.join('.', DEFAULT_LIB_NAME), out_hook=None, **kwargs):
+        self.lib_path: str = lib_path
+        super().__init__(out_hook=out_hook, **kwargs)
+        self._nars_type = NARSType.ONA_LIB  # 只对应这一种类型（不登记到TYPE_CIN_DICT）
+        self.lib: ctypes.CDLL = None
+        # 须保留对回调对象的引用，否则会被回收，C侧调用时崩溃
+        self._callback = OPERATION_CALLBACK(self._on_operation)
+        self.num_inputs_written: int = 0  # 输入ONA的命令总数
+        self.num_operations: int = 0  # 经回调收到的操作数
+
+    @property
+    def launch_args(self) -> list[str]:
+        "（无子进程）仅用于启动报告"
+        return [self.profile.resolve_executable(self.lib_path)]
+
+    @staticmethod
+    def load_library(path: str) -> ctypes.CDLL:
+        "加载共享库并声明函数签名（同一路径只加载一次）"
+        path = os.path.abspath(path)
+        if (lib := ONALibrary._libraries.get(path)) is None:
+            lib = ctypes.CDLL(path)
+            lib.pynei_ona_init.argtypes = []
+            lib.pynei_ona_init.restype = None
+            lib.pynei_ona_set_callback.argtypes = [OPERATION_CALLBACK]
+            lib.pynei_ona_set_callback.restype = None
+            lib.pynei_ona_input.argtypes = [ctypes.c_char_p]
+            lib.pynei_ona_input.restype = ctypes.c_int
+            lib.pynei_ona_cycles.argtypes = [ctypes.c_int]
+            lib.pynei_ona_cycles.restype = None
+            ONALibrary._libraries[path] = lib
+        return lib
+
+    # 进程相关 #
+
+    def launch(self) -> None:
+        "加载共享库、初始化ONA，并输入配置中的启动命令"
+        active: ONALibrary = ONALibrary._active
+        if active is not None and active is not self and active.isAlive:
+            raise RuntimeError('Only one ONALibrary can be alive in a process: ONA keeps global state')
+        self.report_profile()
+        self.launch_time = monotonic()
+        self.first_operation_time = None
+        self.lib = ONALibrary.load_library(self.launch_args[0])
+        self.lib.pynei_ona_init()
+        self.lib.pynei_ona_set_callback(self._callback)
+        ONALibrary._active = self
+        for cmd in self.profile.commands():
+            self.add_input(cmd)
+
+    @property
+    def isAlive(self) -> bool:
+        return self.lib is not None and ONALibrary._active is self
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.isAlive
+
+    def terminate(self) -> None:
+        "终止：断开回调（共享库无法卸载，ONA状态留待下次初始化时清空）"
+        if self.isAlive:
+            self.lib.pynei_ona_set_callback(OPERATION_CALLBACK())  # 空回调
+            ONALibrary._active = None
+        self.lib = None
+        self.operation_hook = None
+        super().terminate()
+
+    # 语句相关 #
+
+    def add_input(self, sentence: str) -> None:
+        "直接输入ONA（可含多行）"
+        for line in sentence.split('\n'):
+            self.lib.pynei_ona_input(line.encode())
+            self.num_inputs_written += 1
+
+    def add_inference_cycles(self, num: int) -> None:
+        "推理循环步进：直接调用"
+        self.lib.pynei_ona_cycles(num)
+
+    def write_line(self, cmd: str) -> None:
+        "帧内暂存，否则立即输入"
+        if self._frame_inputs is not None:
+            self._frame_inputs.append(cmd)
+        elif (tracer := self.tracer) is None:
+            self.add_input(cmd)
+        else:
+            tracer.on_enqueue(cmd)
+            self._traced_input((cmd,))
+
+    def commit_frame(self) -> None:
+        "提交一帧：整帧立即输入ONA"
+        super().commit_frame()
+        if self._frame_inputs is None:  # 最外层帧已提交入队：取出并输入
+            self.flush()
+
+    def flush(self) -> None:
+        "把命令缓冲区中的所有命令输入ONA"
+        queue = self._cached_inputs
+        if queue is None or not self.isAlive:
+            return
+        cmds: list[str] = queue.get_batch(len(queue), timeout=0)
+        if self.tracer is not None:
+            self._traced_input(cmds)
+            return
+        for cmd in cmds:
+            self.add_input(cmd)
+
+    def _traced_input(self, cmds: list[str]) -> None:
+        "（内部）输入并追踪：无管道，调用时ONA即可读到，故写入与刷新同时打点（回调会在输入过程中同步发生）"
+        self.tracer.on_write(cmds)
+        self.tracer.on_flush()
+        for cmd in cmds:
+            self.add_input(cmd)
+
+    def add_perception(self, perception: NARSPerception) -> None:
+        self.write_line(self.render_sentence(
+            self.__class__.SENSE_TEMPLATE, perception.subject, perception.adjective))
+
+    def put_goal(self, goalName: str, is_negative: bool = False):
+        self.write_line(self.render_sentence(
+            self.__class__.GOAL_TEMPLATE_NEGATIVE
+            if is_negative
+            else self.__class__.GOAL_TEMPLATE,
+            goalName
+        ))
+
+    def praise_goal(self, goalName: str):
+        self.write_line(self.render_sentence(
+            self.__class__.PRAISE_TEMPLATE, goalName))
+
+    def punish_goal(self, goalName: str):
+        self.write_line(self.render_sentence(
+            self.__class__.PUNISH_TEMPLATE, goalName))
+
+    def put_unconscious_operation(self, operation: NARSOperation):
+        self.__class__.BABBLE_TEMPLATE and self.write_line(self.render_sentence(
+            self.__class__.BABBLE_TEMPLATE, operation.name))
+
+    def register_basic_operation(self, operation: NARSOperation):
+        self.__class__.OPERATION_REGISTER_TEMPLATE and self.write_line(self.render_sentence(
+            self.__class__.OPERATION_REGISTER_TEMPLATE, operation.name))
+
+    # 输出相关 #
+
+    def _on_operation(self, name: bytes, args: bytes) -> None:
+        "（C回调）操作被执行：直接交给operation_hook，无需解析输出行"
+        self.num_operations += 1
+        if self.first_operation_time is None:  # 记录启动耗时
+            self.first_operation_time = monotonic()
+        if tracer := self.tracer:  # 回调即是输出
+            tracer.on_output_line()
+        if operation_hook := self.operation_hook:
+            operation_hook(NARSOperation(name.decode().lstrip('^')))
+
+    def catch_operation(self, line: str) -> tuple[str, tuple[str, ...]] | None:
+        "兼容文本输出：按ONA的格式解析（正常情况下操作经回调给出，不会走到这里）"
+        return ONA.LINE_CLASSIFIER.classify(line)
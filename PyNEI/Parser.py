@@ -0,0 +1,185 @@
+"""CIN输出行的解析
+
+CIN（尤其是OpenNARS）会输出大量「派生任务」等与操作无关的行，
+读线程需要以尽可能低的开销排除它们，并从「操作行」中提取操作名与参数
+
+类の概览
+- LineClassifier: 预编译的「操作行」分类器（先比对前缀，再用正则提取）
+- PartitionLineClassifier: 基于字符串查找的分类器（格式固定时比正则更快）
+
+热路径（读线程对每行输出的调用）是`operation_name`：只比对前缀、取出操作名；参数仅在`classify`中按需提取
+"""
+
+import re  # 预编译正则
+from functools import lru_cache  # 缓存参数切分结果
+
+
+class LineClassifier:
+    """预编译的「操作行」分类器
+    - 先以一次前缀比较排除绝大多数非操作行（不做任何切分）
+    - 对通过前缀检查的行，用预编译正则提取「操作名」，按需提取「参数」
+        - 正则须提供命名分组`name`，可选提供命名分组`args`
+    """
+
+    def __init__(self, prefix: str, pattern: str) -> None:
+        self.prefix: str = prefix
+        "操作行的前缀"
+        self.prefix_bytes: bytes = prefix.encode()
+        "操作行的前缀（字节形式，供二进制读取时免解码比对）"
+        self.pattern: re.Pattern = re.compile(pattern)
+        "从操作行中提取操作名、参数的正则"
+        # 热路径：把分类函数编译为闭包，省去每行的属性查找
+        self.operation_name = self._compile_operation_name()
+        self.classify = self._compile_classify()
+
+    def is_candidate(self, line: str) -> bool:
+        "是否（可能）为操作行：仅检查前缀"
+        return line.startswith(self.prefix)
+
+    def is_candidate_bytes(self, line: bytes) -> bool:
+        "是否（可能）为操作行：仅检查前缀（字节形式）"
+        return line.startswith(self.prefix_bytes)
+
+    def operation_name(self, line: str) -> str | None:
+        "若为操作行，返回操作名，否则返回None（不提取参数；实例上会被闭包版本覆盖）"
+        return self._compile_operation_name()(line)
+
+    def classify(self, line: str) -> tuple[str, tuple[str, ...]] | None:
+        "对一行输出分类：若为操作行，返回(操作名, 参数元组)，否则返回None（实例上会被闭包版本覆盖）"
+        return self._compile_classify()(line)
+
+    def _compile_operation_name(self):
+        "生成取操作名函数的闭包：前缀、正则均以默认参数绑定为局部变量"
+
+        def operation_name(line: str, prefix: str = self.prefix, n_prefix: int = len(self.prefix), match=self.pattern.match) -> str | None:
+            if line[:n_prefix] != prefix:  # 切片比较：比startswith少一次方法调用
+                return None
+            return None if (matched := match(line)) is None else matched['name']
+
+        return operation_name
+
+    def _compile_classify(self):
+        "生成分类函数的闭包：前缀、正则、参数切分均绑定为局部变量"
+        prefix: str = self.prefix
+        match = self.pattern.match
+        has_args: bool = 'args' in self.pattern.groupindex
+
+        def classify(line: str) -> tuple[str, tuple[str, ...]] | None:
+            if not line.startswith(prefix):
+                return None
+            if (matched := match(line)) is None:
+                return None
+            return matched['name'], split_args(matched['args']) if has_args else ()
+
+        return classify
+
+    def __call__(self, line: str) -> tuple[str, tuple[str, ...]] | None:
+        "（语法糖）直接调用即分类"
+        return self.classify(line)
+
+
+class PartitionLineClassifier(LineClassifier):
+    """基于字符串查找的「操作行」分类器
+    - 前缀检查同`LineClassifier`
+    - 之后以`str.find`定位「操作名」（前缀以name_marker结尾时无需查找），按需以`str.partition`切出「参数」，全程不经过正则引擎
+        - name_marker: 操作名之前的标记（如「^」）
+        - name_end: 操作名之后的分隔符（如「(」或空格）
+        - args_marker: 参数之前的标记（None⇔无参数；空串⇔紧跟操作名）
+        - args_end: 参数之后的标记（从右侧切分；None⇔直到行尾）
+    """
+
+    def __init__(self, prefix: str, name_marker: str, name_end: str, args_marker: str = None, args_end: str = None) -> None:
+        self.name_marker: str = name_marker
+        self.name_end: str = name_end
+        self.args_marker: str = args_marker
+        self.args_end: str = args_end
+        # 用一个等价的正则作为`pattern`，仅供查看与兼容
+        super().__init__(prefix, '%s.*?%s(?P<name>[^%s]+)' % (
+            re.escape(prefix), re.escape(name_marker), re.escape(name_end)))
+
+    def _compile_operation_name(self):
+        """生成取操作名函数的闭包：所有分隔符均以默认参数绑定为局部变量
+        - 前缀比较先比首字符：单字符切片不分配新字符串，绝大多数非操作行就此排除
+        """
+        first: str = self.prefix[:1]
+        if self.prefix.endswith(self.name_marker):  # 操作名紧跟在前缀之后（如ONA的「^」）
+            def operation_name(line: str, first: str = first, prefix: str = self.prefix, start: int = len(self.prefix), name_end: str = self.name_end) -> str | None:
+                if line[:1] != first or line[:start] != prefix:
+                    return None
+                end: int = line.find(name_end, start)
+                return (line[start:end] if end >= 0 else line[start:]) or None
+        else:
+            def operation_name(line: str, first: str = first, prefix: str = self.prefix, n_prefix: int = len(self.prefix), name_marker: str = self.name_marker, n_marker: int = len(self.name_marker), name_end: str = self.name_end) -> str | None:
+                if line[:1] != first or line[:n_prefix] != prefix:
+                    return None
+                if (start := line.find(name_marker, n_prefix)) < 0:
+                    return None
+                start += n_marker
+                end: int = line.find(name_end, start)
+                return (line[start:end] if end >= 0 else line[start:]) or None
+        return operation_name
+
+    def _compile_classify(self):
+        "生成分类函数的闭包：先取操作名（同operation_name），再按需切出参数"
+        operation_name = self.operation_name
+        name_end: str = self.name_end
+        args_marker: str = self.args_marker
+        args_end: str = self.args_end
+
+        def classify(line: str) -> tuple[str, tuple[str, ...]] | None:
+            if (name := operation_name(line)) is None:
+                return None
+            if args_marker is None:
+                return name, ()
+            rest: str = line.partition(name + name_end)[2]
+            if args_marker:
+                _, found, rest = rest.partition(args_marker)
+                if not found:
+                    return name, ()
+            if args_end:
+                rest = rest.rpartition(args_end)[0]
+            return name, split_args(rest)
+
+        return classify
+
+
+_BRACKET_PAIRS: dict[str:str] = {'(': ')', '[': ']', '{': '}'}
+_CLOSING_BRACKETS: str = ')]}'  # 不含「>」：避免与系词「-->」混淆
+
+
+@lru_cache(maxsize=0x100)  # 参数词汇表很小（多为「{SELF}」）
+def split_args(args: str | None) -> tuple[str, ...]:
+    """把参数文本切分成参数元组
+    - 去除最外层成对的括号（如OpenNARS的「[{SELF}]」）
+    - 仅在「括号深度为零」的逗号处切分，不拆开「{a,b}」之类的复合词项
+    """
+    if not args or not (args := args.strip()):
+        return ()
+    if _BRACKET_PAIRS.get(args[0]) == args[-1] and _closing_index(args) == len(args) - 1:
+        args = args[1:-1]
+    result: list[str] = []
+    depth: int = 0
+    start: int = 0
+    for i, char in enumerate(args):
+        if char in _BRACKET_PAIRS:
+            depth += 1
+        elif char in _CLOSING_BRACKETS:
+            depth -= 1
+        elif char == ',' and depth == 0:
+            result.append(args[start:i].strip())
+            start = i + 1
+    result.append(args[start:].strip())
+    return tuple(arg for arg in result if arg)
+
+
+def _closing_index(text: str) -> int:
+    "找到与首个开括号配对的闭括号位置（未配对则返回-1）"
+    depth: int = 0
+    for i, char in enumerate(text):
+        if char in _BRACKET_PAIRS:
+            depth += 1
+        elif char in _CLOSING_BRACKETS:
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
@@ -0,0 +1,135 @@
+"""预启动的NARS程序池
+
+CIN的启动开销很大（OpenNARS还要启动一个JVM），
+而游戏（如井字棋的「重新装载AI」「预训练」）会频繁地装载、卸载智能体的「大脑」
+
+类の概览
+- NARSProgramPool: 按NARSType保存若干个已启动、已重置的NARS程序，供智能体租借与归还
+"""
+
+import threading  # 用于线程同步
+from collections import deque  # 空闲程序队列
+
+from PyNEI.Program import NARSType, NARSProgram
+
+
+class NARSProgramPool:
+    """预启动的NARS程序池
+    - 每种NARSType至多保留size个空闲（已启动、处于干净状态）的程序
+    - 预热（warm）：启动若干程序放入池中，待其完成启动（如JVM）后即可直接使用
+    - 租借（acquire）：优先取出通过健康检查的空闲程序，没有则当场启动一个
+    - 归还（release）：能重置且健康的程序重置后放回池中（池满则终止），下次租借即可复用
+    """
+
+    def __init__(self, rootPath: str = '.', size: int = 1, types: tuple[NARSType, ...] = (), **program_kwargs) -> None:
+        self.rootPath: str = rootPath
+        "CIN可执行文件的根路径"
+        self.size: int = size
+        "每种NARSType保留的空闲程序数"
+        self.program_kwargs: dict = program_kwargs
+        "构造程序时的其它关键字参数（如队列容量）"
+        self._idle: dict[NARSType:deque[NARSProgram]] = {}
+        self._leased: dict[int:NARSType] = {}  # id(程序)→租借时的NARSType（多个NARSType可能共用一个程序类）
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+        # 统计 #
+        self.num_hits: int = 0
+        "租借时直接取得空闲程序的次数"
+        self.num_misses: int = 0
+        "租借时需要当场启动程序的次数"
+        self.num_resets: int = 0
+        "归还时重置并放回池中的次数"
+        self.num_discarded: int = 0
+        "因不健康或无法重置而被终止的程序数"
+        # 预热
+        for nars_type in types:
+            self.warm(nars_type)
+
+    def __len__(self) -> int:
+        "空闲程序的总数"
+        return sum(len(idle) for idle in self._idle.values())
+
+    def num_idle(self, nars_type: NARSType) -> int:
+        "某种NARSType的空闲程序数"
+        return len(self._idle.get(nars_type, ()))
+
+    def _launch(self, nars_type: NARSType) -> NARSProgram:
+        "（内部）构造并启动一个新程序"
+        program: NARSProgram = NARSProgram.fromType(
+            type=nars_type,
+            rootPath=self.rootPath,
+            **self.program_kwargs
+        )
+        program.launch()
+        return program
+
+    def warm(self, nars_type: NARSType) -> None:
+        "预热：把某种NARSType的空闲程序补满到size个"
+        while not self._closed and self.num_idle(nars_type) < self.size:
+            program: NARSProgram = self._launch(nars_type)
+            with self._lock:
+                self._idle.setdefault(nars_type, deque()).append(program)
+
+    def acquire(self, nars_type: NARSType) -> NARSProgram:
+        "租借一个已启动、处于干净状态的程序（用完后须release）"
+        if self._closed:
+            raise RuntimeError('The pool has been closed!')
+        program: NARSProgram = None
+        with self._lock:
+            idle: deque[NARSProgram] = self._idle.setdefault(nars_type, deque())
+            while idle:
+                candidate: NARSProgram = idle.popleft()
+                if candidate.is_healthy:  # 健康检查：跳过已退出的程序
+                    program = candidate
+                    break
+                candidate.terminate()
+                self.num_discarded += 1
+            if program is not None:
+                self.num_hits += 1
+                self._leased[id(program)] = nars_type
+                return program
+            self.num_misses += 1
+        program = self._launch(nars_type)  # 启动较慢：不持锁
+        with self._lock:
+            self._leased[id(program)] = nars_type
+        return program
+
+    def release(self, program: NARSProgram) -> None:
+        "归还程序：重置后放回池中；池已满、不健康或不支持重置时直接终止"
+        with self._lock:
+            nars_type: NARSType = self._leased.pop(id(program), program.type)
+        if (
+            not self._closed
+            and nars_type is not None
+            and program.is_healthy
+            and self.num_idle(nars_type) < self.size
+            and program.reset()  # 重置较慢：不持锁
+        ):
+            with self._lock:
+                idle: deque[NARSProgram] = self._idle.setdefault(nars_type, deque())
+                if not self._closed and len(idle) < self.size:  # 重置期间可能已被关闭或补满
+                    idle.append(program)
+                    self.num_resets += 1
+                    return
+        program.terminate()
+        with self._lock:
+            self.num_discarded += 1
+
+    def close(self) -> None:
+        "关闭池：终止所有空闲程序（已租出的程序在归还时终止）"
+        with self._lock:
+            self._closed = True
+            idle_programs: list[NARSProgram] = [
+                program
+                for idle in self._idle.values()
+                for program in idle
+            ]
+            self._idle.clear()
+        for program in idle_programs:
+            program.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -0,0 +1,205 @@
+"""CIN的资源配置（profile）
+
+把原先写死在各CIN类中的启动参数（JVM堆大小、推理循环频率、音量等）集中为可配置、可从文件加载的对象，
+使得同一台机器上可以按需调整「每个智能体的资源占用」与「延迟/学习速度」
+
+配置文件为JSON，既可以是单个配置：
+    {"name": "small", "heap_size": "256m", "gc": "serial"}
+也可以是「名称→配置」的字典：
+    {"small": {"heap_size": "256m"}, "fast": {"inference_cycle_frequency": 1}}
+
+类の概览
+- CINProfile: 一份CIN资源配置
+"""
+
+import os  # 用于拼接可执行文件路径
+import json  # 用于读写配置文件
+
+
+def platform_executable(path: str) -> str:
+    "非Windows系统下，若「xxx.exe」不存在而同名的「xxx」存在，则使用后者（如Linux下编译的ONA）"
+    if os.name != 'nt' and not os.path.exists(path):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() == '.exe' and os.path.exists(stem):
+            return stem
+    return path
+
+
+class CINProfile:
+    """一份CIN资源配置
+    - JVM相关（仅OpenNARS）：堆大小、初始堆大小、垃圾回收器、JIT参数、其它JVM参数
+    - CIN相关：音量、推理循环频率（及其自适应控制的延迟预算）、构建变体（如以不同编译期参数编译出的ONA）、额外的命令行参数与启动命令
+    - 各项默认均为None（或空），即「未指定」：使用程序类的默认配置（`DEFAULT_PROFILE`）中的值，见over
+        - 具体的默认值（如音量0、推理周期数上限100）只在各程序类的默认配置中给出
+    """
+
+    GC_FLAGS: dict[str:tuple[str, ...]] = {
+        'serial': ('-XX:+UseSerialGC',),
+        'parallel': ('-XX:+UseParallelGC',),
+        'g1': ('-XX:+UseG1GC',),
+        'z': ('-XX:+UseZGC',),
+        'shenandoah': ('-XX:+UseShenandoahGC',),
+        'epsilon': ('-XX:+UnlockExperimentalVMOptions', '-XX:+UseEpsilonGC'),
+    }
+    "垃圾回收器名称→JVM参数"
+
+    FIELDS: tuple[str, ...] = (
+        'name',
+        'heap_size',
+        'heap_initial',
+        'gc',
+        'jit_flags',
+        'jvm_options',
+        'volume',
+        'inference_cycle_frequency',
+        'latency_budget',
+        'max_inference_cycle_frequency',
+        'build_variant',
+        'extra_args',
+        'startup_commands',
+    )
+    "可配置的字段（亦即配置文件中可用的键）"
+
+    def __init__(
+        self,
+        name: str = 'default',
+        heap_size: str = None,
+        heap_initial: str = None,
+        gc: str = None,
+        jit_flags: list[str] = (),
+        jvm_options: list[str] = (),
+        volume: int = None,
+        inference_cycle_frequency: int = None,
+        latency_budget: float = None,
+        max_inference_cycle_frequency: int = None,
+        build_variant: str = None,
+        extra_args: list[str] = (),
+        startup_commands: list[str] = (),
+    ) -> None:
+        if gc is not None and gc.lower() not in CINProfile.GC_FLAGS:
+            raise ValueError(f'Unknown GC {gc!r}, expected one of {list(CINProfile.GC_FLAGS)}')
+        self.name: str = name
+        "配置名（用于启动时的报告）"
+        self.heap_size: str = heap_size
+        "JVM最大堆大小（如'1024m'，对应-Xmx）"
+        self.heap_initial: str = heap_initial
+        "JVM初始堆大小（如'256m'，对应-Xms）"
+        self.gc: str = gc
+        "JVM垃圾回收器（见GC_FLAGS）"
+        self.jit_flags: tuple[str, ...] = tuple(jit_flags)
+        "JIT相关的JVM参数（如'-XX:TieredStopAtLevel=1'以加快启动）"
+        self.jvm_options: tuple[str, ...] = tuple(jvm_options)
+        "其它JVM参数"
+        self.volume: int = volume
+        "CIN的输出音量（None⇔未指定；程序类的默认配置中为None⇔不发送「*volume」命令）"
+        self.inference_cycle_frequency: int = inference_cycle_frequency
+        "每次更新时步进的推理周期数（启用自适应控制时为初始值）"
+        self.latency_budget: float = latency_budget
+        "目标延迟（秒）：指定后按队列深度与输出速率自适应调整推理周期数（None⇔固定）"
+        self.max_inference_cycle_frequency: int = max_inference_cycle_frequency
+        "自适应控制时，每次更新步进的推理周期数上限（None⇔未指定）"
+        self.build_variant: str = build_variant
+        "构建变体：与默认可执行文件位于同一目录的另一可执行文件（如以不同编译期参数编译的ONA）"
+        self.extra_args: tuple[str, ...] = tuple(extra_args)
+        "附加在CIN命令行之后的参数"
+        self.startup_commands: tuple[str, ...] = tuple(startup_commands)
+        "启动（及重置）后依次输入CIN的命令"
+
+    def __repr__(self) -> str:
+        return f'CINProfile({self.describe()})'
+
+    # 参数生成 #
+
+    @property
+    def jvm_args(self) -> list[str]:
+        "生成JVM参数（位于「-jar」之前）"
+        args: list[str] = []
+        if self.heap_initial:
+            args.append(f'-Xms{self.heap_initial}')
+        if self.heap_size:
+            args.append(f'-Xmx{self.heap_size}')
+        if self.gc:
+            args.extend(CINProfile.GC_FLAGS[self.gc.lower()])
+        args.extend(self.jit_flags)
+        args.extend(self.jvm_options)
+        return args
+
+    def resolve_executable(self, path: str) -> str:
+        "根据构建变体确定实际的可执行文件路径（无变体则原样返回）"
+        if not self.build_variant:
+            return path
+        return platform_executable(os.path.join(os.path.dirname(path), self.build_variant))
+
+    def over(self, base: 'CINProfile') -> 'CINProfile':
+        "以base（如程序类的默认配置）补全自身：取值为None或空的项取base中的值（返回新配置，名称不变）"
+        return CINProfile(**{
+            field: (
+                getattr(base, field)
+                if field != 'name' and getattr(self, field) in (None, ())
+                else getattr(self, field)
+            )
+            for field in CINProfile.FIELDS
+        })
+
+    def commands(self) -> list[str]:
+        "启动（及重置）后需要输入CIN的命令"
+        return (
+            ([] if self.volume is None else [f'*volume={self.volume}'])
+            + list(self.startup_commands)
+        )
+
+    def describe(self) -> str:
+        "一行文字描述：只列出非默认的项"
+        default: CINProfile = CINProfile()
+        return ', '.join([repr(self.name)] + [
+            f'{field}={value!r}'
+            for field in CINProfile.FIELDS[1:]  # 跳过name
+            if (value := getattr(self, field)) != getattr(default, field)
+        ])
+
+    # 读写 #
+
+    def to_dict(self) -> dict:
+        "转换为可JSON序列化的字典"
+        return {
+            field: list(value) if isinstance(value, tuple) else value
+            for field in CINProfile.FIELDS
+            if (value := getattr(self, field)) is not None
+        }
+
+    @staticmethod
+    def from_dict(data: dict, name: str = None):
+        "从字典构造（未知的键会报错，以免拼写错误被静默忽略）"
+        if unknown := set(data) - set(CINProfile.FIELDS):
+            raise ValueError(f'Unknown profile fields: {sorted(unknown)}')
+        if name is not None and 'name' not in data:
+            data = {**data, 'name': name}
+        return CINProfile(**data)
+
+    @staticmethod
+    def load_all(path: str) -> dict:
+        "从JSON文件加载所有配置：返回「名称→配置」的字典"
+        with open(path, encoding='utf-8') as file:
+            data: dict = json.load(file)
+        if all(isinstance(value, dict) for value in data.values()):  # 「名称→配置」的字典
+            return {
+                name: CINProfile.from_dict(profile_data, name)
+                for name, profile_data in data.items()
+            }
+        profile: CINProfile = CINProfile.from_dict(data)
+        return {profile.name: profile}
+
+    @staticmethod
+    def load(path: str, name: str = None):
+        "从JSON文件加载一个配置（文件含多个配置时须指定名称）"
+        profiles: dict[str:CINProfile] = CINProfile.load_all(path)
+        if name is None:
+            if len(profiles) != 1:
+                raise ValueError(f'{path} contains several profiles, please choose one of {list(profiles)}')
+            return next(iter(profiles.values()))
+        return profiles[name]
+
+    def save(self, path: str) -> None:
+        "保存为JSON文件"
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=4, ensure_ascii=False)
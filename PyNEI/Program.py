@@ -7,13 +7,23 @@
 - NARSProgram：抽象一个CIN通信接口
 """
 
+import io  # 用于包装二进制管道
+import os  # 用于处理可执行文件路径
+import locale  # 用于确定管道编码
 import threading  # 用于打开线程
 import subprocess  # 用于打开进程
+from time import monotonic  # 用于统计钩子延迟
+from contextlib import contextmanager  # 用于「帧」的上下文管理
 
 from enum import Enum  # 枚举NARS类型
 
 # ⚠使用「包.路径」导入，是默认Python包的做法
 from PyNEI.Elements import *  # 📌注：模块下使用相对路径「.」导入当前路径下的模块（VSCode调试下）
+from PyNEI.Buffer import CommandQueue, OverflowPolicy, OutputQueue, OutputDropPolicy
+from PyNEI.Profile import CINProfile, platform_executable
+from PyNEI.Controller import InferenceCycleController
+from PyNEI.Parser import LineClassifier, PartitionLineClassifier
+from PyNEI.Tracing import LatencyTracer, TraceLog, Trace
 
 DEBUG: bool = False
 
@@ -27,6 +37,7 @@ class NARSType(Enum):
     ONA: str = 'ONA'
     ONA_OLD: str = 'ONA_old'
     PYTHON: str = 'python'
+    ONA_LIB: str = 'ONA_lib'  # 进程内ONA（共享库）
 
     @staticmethod
     def from_str(type_str):
@@ -40,6 +51,8 @@ class NARSType(Enum):
                 return NARSType.ONA_OLD
             case 'python':
                 return NARSType.PYTHON
+            case 'ona_lib':
+                return NARSType.ONA_LIB
 
     @staticmethod
     @property
@@ -81,49 +94,181 @@ class NARSProgram:
     OPERATION_REGISTER_TEMPLATE: str = BABBLE_TEMPLATE  # 暂时使用Babble的模板
     '指示「自我有一个可用的（基本）操作」（操作注册）'
 
+    def render_sentence(self, template: str, *args: str) -> str:
+        "套模板：直接以「%」格式化（比查缓存更快，故不缓存）"
+        return template % args
+
     # 程序构造入口 #
 
     @staticmethod
-    def fromType(type: NARSType, rootPath: str = '.', out_hook=None):
+    def fromType(type: NARSType, rootPath: str = '.', out_hook=None, **kwargs):
         """从NARSType中自动构造CIN对象
         - 可配置根目录，exe名字使用默认值以简化工作
         - 其调用格式要求下属NARSType必须有特定参数格式：
             - 首个位置参数为「可执行文件路径」
             - 可选参数out_hook
+            - 其它关键字参数（如队列容量）原样传递给构造函数
         """
-        cls, app_name = TYPE_CIN_DICT[type]  # 从字典获取
+        if type == NARSType.ONA_LIB:  # 进程内ONA：用到时才导入（其模块依赖本模块，顶层导入会循环）
+            from PyNEI.Native import ONALibrary
+            cls, app_name = ONALibrary, ONALibrary.DEFAULT_LIB_NAME
+        else:
+            cls, app_name = TYPE_CIN_DICT[type]  # 从字典获取
         # 用类构造函数（确保第一个参数是可执行文件路径）
-        return cls(f'{rootPath}\\%s' % app_name, out_hook=out_hook)
-        # Windows路径使用反斜杠
+        program: NARSProgram = cls(NARSProgram.resolve_path(rootPath, app_name), out_hook=out_hook, **kwargs)
+        program._nars_type = type  # 同一个类可对应多个类型（如ONA/ONA_OLD）：记住构造时的类型
+        return program
+
+    @staticmethod
+    def resolve_path(rootPath: str, app_name: str) -> str:
+        """拼接CIN可执行文件的路径（使用当前系统的路径分隔符）
+        - 非Windows系统下，若「xxx.exe」不存在而同名的「xxx」存在，则使用后者（如Linux下编译的ONA）
+        """
+        return platform_executable(os.path.join(rootPath, app_name))
 
     # 程序/进程相关 #
 
-    def __init__(self, out_hook=None):
+    DEFAULT_QUEUE_CAPACITY: int = 0
+    "默认的命令队列容量（≤0：无界）"
+    DEFAULT_OVERFLOW_POLICY: OverflowPolicy = OverflowPolicy.BLOCK
+    "默认的命令队列溢出策略"
+
+    DEFAULT_INFERENCE_CYCLE_FREQUENCY: int = 1
+    "默认的推理循环频率（每次更新时步进的周期数）"
+
+    DEFAULT_PROFILE: CINProfile = CINProfile(volume=0, max_inference_cycle_frequency=100)
+    "默认的资源配置（子类的默认配置应以over补全，使各项都有具体的值）"
+
+    INSPECTS_ALL_LINES: bool = False
+    "catch_operation是否需要查看所有输出行（而不只是操作行，如识别诊断信息）：为真时不应只读取操作行"
+
+    def __init__(self, out_hook=None, queue_capacity: int = None, overflow_policy: OverflowPolicy = None, profile: CINProfile = None):
         "初始化NARS程序：启动命令行、连接「NARS计算机实现」、启动线程"
+        "资源配置（启动参数、推理循环频率等）"
+        self.profile: CINProfile = (
+            profile.over(self.__class__.DEFAULT_PROFILE)  # 未指定的项沿用程序类的默认配置（如OpenNARS的堆大小）
+            if profile
+            else self.__class__.DEFAULT_PROFILE)
         "推理循环频率"
         # set too large will get delayed and slow down the game
-        self.inference_cycle_frequency: int = 1
+        self.inference_cycle_frequency: int = self.base_inference_cycle_frequency
+        "推理周期控制器（None⇔每tick固定步进inference_cycle_frequency个周期）"
+        self.cycle_controller: InferenceCycleController = self.make_cycle_controller()
+        self.cycles_per_tick: int = 0  # 最近一次tick步进的推理周期数（指标）
         "存储CIN直接输出的钩子：捕捉一切命令行输出"
         self.out_hook = out_hook
-        self._cached_inputs: list[str] = []  # 定义一个先进先出队列，存储待写入的指令
+        "直接接收操作（NARSOperation）的钩子：仅由能直接给出操作的程序（如进程内ONA）调用，跳过输出行解析"
+        self.operation_hook = None
+        # 定义一个有界的先进先出队列，存储待写入的指令
+        self._cached_inputs: CommandQueue = CommandQueue(
+            capacity=(
+                self.__class__.DEFAULT_QUEUE_CAPACITY
+                if queue_capacity is None
+                else queue_capacity
+            ),
+            policy=overflow_policy or self.__class__.DEFAULT_OVERFLOW_POLICY
+        )
+        # 帧（事务）：收集一个tick内的所有命令，提交时作为一个整体入队
+        self._frame_inputs: list[str] | None = None  # None⇔不在帧内
+        self._frame_depth: int = 0  # 支持嵌套：仅最外层帧会真正提交
+        self._frame_cycles: int = 0  # 帧内累计的推理步进：提交时在帧的语句之后单独入队
+        self.num_frames: int = 0  # 已提交的（非空）帧数
+        # 启动耗时统计
+        self.launch_time: float = None  # 启动时刻
+        self.first_operation_time: float = None  # 收到首个操作行的时刻
+        self._nars_type: NARSType = None  # 经fromType构造时的NARSType
+        "端到端延迟追踪器（None⇔不追踪）"
+        self.tracer: LatencyTracer = None
+
+    @property
+    def base_inference_cycle_frequency(self) -> int:
+        "基准推理循环频率：资源配置中指定的值，未指定则使用类的默认值"
+        return (
+            self.__class__.DEFAULT_INFERENCE_CYCLE_FREQUENCY
+            if self.profile.inference_cycle_frequency is None
+            else self.profile.inference_cycle_frequency
+        )
+
+    def make_cycle_controller(self) -> InferenceCycleController | None:
+        "根据资源配置创建推理周期控制器（配置未指定延迟预算时不创建）"
+        if self.profile.latency_budget is None:
+            return None
+        return InferenceCycleController(
+            latency_budget=self.profile.latency_budget,
+            initial_cycles=self.inference_cycle_frequency,
+            max_cycles=(
+                NARSProgram.DEFAULT_PROFILE.max_inference_cycle_frequency
+                if self.profile.max_inference_cycle_frequency is None
+                else self.profile.max_inference_cycle_frequency
+            ),
+        )
+
+    def report_profile(self) -> None:
+        "启动时报告所用的资源配置与启动参数"
+        print(f'{self.__class__.__name__} profile: {self.profile.describe()}',
+              f'> {subprocess.list2cmdline(self.launch_args)}', sep='\n')
+
+    @property
+    def launch_args(self) -> list[str]:
+        "（API）启动CIN所用的命令行参数列表（首项为可执行文件）"
+        return []
 
     @property
     def type(self) -> NARSType:
-        "获取自身（直接）所属的NARS类型"
-        return TYPE_CIN_DICT.get(self.__class__, None)
+        "获取自身所属的NARS类型（经fromType构造的，即构造时的类型）"
+        return self._nars_type or TYPE_CIN_DICT.get(self.__class__, None)
 
     def launch(self):
         "（API）功能分离：启动NARS程序"
         pass
 
+    @property
+    def time_to_first_operation(self) -> float | None:
+        "从启动到收到首个操作行所用的时间（秒；尚未收到则为None）"
+        return (
+            self.first_operation_time - self.launch_time
+            if self.first_operation_time is not None
+            else None
+        )
+
     @property
     def isAlive(self) -> bool:
         "（API）控制自身是否「活着」（在terminate后必须为False）"
         pass
 
+    @property
+    def is_healthy(self) -> bool:
+        "健康检查：程序是否仍可正常使用（默认等同于isAlive）"
+        return bool(self.isAlive)
+
+    # 重置相关 #
+
+    RESET_COMMANDS: tuple[str, ...] = ()
+    "（子类实现）把CIN重置为「干净状态」的命令；为空⇔不支持重置"
+
+    @property
+    def can_reset(self) -> bool:
+        "是否支持重置（从而可被程序池复用）"
+        return bool(self.__class__.RESET_COMMANDS)
+
+    def reset(self) -> bool:
+        "把程序重置为「干净状态」以便复用：放弃当前帧、清空待写命令，并发送重置命令与配置中的启动命令（返回：是否已重置）"
+        if not self.can_reset:
+            return False
+        self.operation_hook = None  # 断开上一个使用者的操作钩子（如进程内ONA的回调）
+        self.abort_frame()
+        self.clear_cached_inputs()
+        self.inference_cycle_frequency = self.base_inference_cycle_frequency
+        self.cycle_controller = self.make_cycle_controller()
+        for cmd in self.__class__.RESET_COMMANDS + tuple(self.profile.commands()):
+            self.write_line(cmd)
+        return True
+
     def terminate(self):
         """终止程序"""
         self.out_hook = None  # 空置而非del
+        if self._cached_inputs is not None:  # ⚠空队列的布尔值为假，故需判断None
+            self._cached_inputs.close()  # 唤醒并结束等待中的写线程
         self._cached_inputs = None
 
     # 用析构函数替代「process_kill」方法
@@ -143,20 +288,114 @@ class NARSProgram:
         "（API）推理循环步进"
         pass
 
+    def next_inference_cycles(self) -> int:
+        "本tick应步进的推理周期数：有控制器时由其根据队列深度与输出速率决定，否则为固定的推理循环频率"
+        self.cycles_per_tick = (
+            self.cycle_controller.next_cycles(self)
+            if self.cycle_controller is not None
+            else self.inference_cycle_frequency
+        )
+        return self.cycles_per_tick
+
     def update_inference_cycles(self) -> None:
         "更新自身推理循环"
-        self.inference_cycle_frequency and self.add_inference_cycles(
-            self.inference_cycle_frequency)
+        (num := self.next_inference_cycles()) and self.add_inference_cycles(num)
 
     @property
     def num_cached_inputs(self) -> int:
         "返回缓存（待输入进NARS）的命令数量"
         return len(self._cached_inputs)
 
+    @property
+    def num_pending_inputs(self) -> int:
+        "返回尚未写入CIN的命令数量（含缓冲区中的与正在写入的）"
+        return self.num_cached_inputs
+
+    def wait_for_cached_inputs(self, max_cached: int, timeout: float = None) -> bool:
+        "休眠等待缓冲区中的命令数降至max_cached以下（不计正在写入的命令；程序终止后立即返回）；返回：是否未超时"
+        queue: CommandQueue = self._cached_inputs
+        return queue is None or queue.wait_for_length(max_cached, timeout)
+
+    def enable_tracing(self, log: TraceLog = None) -> LatencyTracer:
+        "开启端到端延迟追踪（多个程序可共享同一个追踪记录，以便按NARSType比较）"
+        self.tracer = LatencyTracer(
+            self.type.value if self.type else self.__class__.__name__, log)
+        return self.tracer
+
+    def _enqueue(self, cmd: str, essential: bool = False) -> bool:
+        "（内部）把命令存入缓冲区（满时按溢出策略处理；关键命令不受其影响），并记录追踪"
+        if (tracer := self.tracer) is None:
+            return self._cached_inputs.put(cmd, essential)
+        trace: Trace = tracer.on_enqueue(cmd)  # 先于入队：写线程可能立即取走它
+        if not (accepted := self._cached_inputs.put(cmd, essential)):
+            tracer.on_rejected(trace)
+        return accepted
+
+    def _enqueue_cycles(self, num: int) -> None:
+        "（内部）缓存推理步进：帧内累计至提交时，否则作为关键命令入队（步进被合并或丢弃，推理就会悄然变少）"
+        if self._frame_inputs is not None:
+            self._frame_cycles += num
+        else:
+            self._enqueue(str(num), essential=True)
+
     def clear_cached_inputs(self) -> None:
         "强制清除命令缓存"
+        if self.tracer is not None:
+            self.tracer.on_cleared()
         return self._cached_inputs.clear()
 
+    @property
+    def num_dropped_inputs(self) -> int:
+        "返回因队列溢出而被丢弃的命令数量"
+        return self._cached_inputs.num_dropped
+
+    # 帧（事务）
+
+    @property
+    def in_frame(self) -> bool:
+        "当前是否处于「帧」中"
+        return self._frame_inputs is not None
+
+    def begin_frame(self) -> None:
+        "开始一帧：此后写入的命令先暂存于帧内，直到提交"
+        if self._frame_depth == 0:
+            self._frame_inputs = []
+        self._frame_depth += 1
+
+    def commit_frame(self) -> None:
+        """提交一帧：把帧内所有命令合并为一条多行命令入队，保证CIN一次性收到整个tick
+        - 帧内的推理步进紧随其后，作为关键命令入队：即便整帧被溢出策略合并或丢弃，推理也照常进行
+        """
+        if self._frame_depth <= 0:
+            return
+        self._frame_depth -= 1
+        if self._frame_depth == 0:
+            frame, self._frame_inputs = self._frame_inputs, None
+            cycles, self._frame_cycles = self._frame_cycles, 0
+            if frame:  # 空帧不入队
+                self._enqueue('\n'.join(frame))
+            if cycles:
+                self._enqueue(str(cycles), essential=True)
+            if frame or cycles:
+                self.num_frames += 1
+
+    def abort_frame(self) -> None:
+        "放弃当前帧（含所有嵌套层）：丢弃帧内所有命令"
+        self._frame_inputs = None
+        self._frame_depth = 0
+        self._frame_cycles = 0
+
+    @contextmanager
+    def frame(self):
+        "（语法糖）以with语句包裹一帧：正常退出时提交，出错时放弃"
+        self.begin_frame()
+        try:
+            yield self
+        except BaseException:
+            self.abort_frame()
+            raise
+        self.commit_frame()
+
     # 感知
     def add_perception(self, perception: NARSPerception) -> None:
         "（API）统一添加感知"
@@ -192,20 +431,93 @@ class NARSProgram:
 class Cmdline(NARSProgram):
     """抽象类：所有用命令行实现的CIN
     - 使用一个子进程，运行CIN主程序
-    - 现在使用asyncio库实现异步交互
-        - 从asyncio启动一个主进程
-        - 使用两个异步函数实现交互
+    - 使用后台线程实现异步交互（基于asyncio的版本见AsyncProgram.AsyncCmdline）
+        - 写线程：在命令队列上休眠，取出命令（批量模式下一次一批）写入CIN的stdin
+        - 读线程：逐行（或以二进制分块）读取CIN的stdout，交给钩子、识别操作
+        - 分发线程（可选，启用输出队列时）：从输出队列中取出行并调用钩子，避免慢速钩子阻塞读取
     """
 
-    def __init__(self, out_hook=None):
+    CACHED_INPUTS_WARNING_THRESHOLD: int = 0xff
+    "缓存命令数超过此值时发出警告"
+
+    DEFAULT_BATCH_SIZE: int = 0x40
+    "默认的批量写入大小（≤1：逐条写入并刷新）"
+    DEFAULT_BATCH_LINGER: float = 0
+    "默认的批量等待时间（秒）：首条命令到达后，最多再等待这么久以凑满一批"
+
+    LINE_CLASSIFIER: LineClassifier = None
+    "（子类实现）输出行分类器：识别操作行，并提取操作名与参数"
+
+    DEFAULT_BINARY_READ: bool = False
+    "默认是否以二进制、分块的方式读取CIN输出"
+    READ_CHUNK_SIZE: int = 0x10000
+    "二进制读取时，每次从管道读取的最大字节数"
+
+    DEFAULT_OUTPUT_QUEUE_CAPACITY: int = 0
+    "默认的输出队列容量（≤0：不使用输出队列，在读线程中同步调用钩子）"
+    DEFAULT_OUTPUT_DROP_POLICY: OutputDropPolicy = OutputDropPolicy.DROP_OLDEST
+    "默认的输出丢弃策略"
+
+    def __init__(self, out_hook=None, batch_size: int = None, batch_linger: float = None, binary_read: bool = None, output_queue_capacity: int = None, output_drop_policy: OutputDropPolicy = None, **kwargs):
         """初始化"""
-        super().__init__(out_hook)
+        super().__init__(out_hook, **kwargs)
+        "输出行分类器（可按实例替换）"
+        self.line_classifier: LineClassifier = self.__class__.LINE_CLASSIFIER
+        "是否以二进制、分块的方式读取输出（需在launch前设置）"
+        self.binary_read: bool = (
+            self.__class__.DEFAULT_BINARY_READ
+            if binary_read is None
+            else binary_read
+        )
+        "是否只把（可能的）操作行传给out_hook：其余行既不解码，也不调用钩子"
+        self.out_filter_operations: bool = False
+        "管道编码（与文本模式的默认编码一致）"
+        self.encoding: str = locale.getpreferredencoding(False)
+        self.num_lines_read: int = 0  # 从CIN读取的输出行数
+        # 输出背压：读线程与钩子分发之间的有界队列
+        if output_queue_capacity is None:
+            output_queue_capacity = self.__class__.DEFAULT_OUTPUT_QUEUE_CAPACITY
+        self._output_queue: OutputQueue | None = (
+            OutputQueue(
+                capacity=output_queue_capacity,
+                policy=output_drop_policy or self.__class__.DEFAULT_OUTPUT_DROP_POLICY
+            )
+            if output_queue_capacity > 0
+            else None
+        )
+        # 钩子统计（仅在启用输出队列时统计）
+        self.num_hook_calls: int = 0
+        self.hook_time_total: float = 0
+        self.hook_time_max: float = 0
+        self.output_delay_total: float = 0
+        "批量写入：一次write+flush写入多少条命令"
+        self.batch_size: int = (
+            self.__class__.DEFAULT_BATCH_SIZE
+            if batch_size is None
+            else batch_size
+        )
+        "批量写入：凑批时的最长等待时间（秒）"
+        self.batch_linger: float = (
+            self.__class__.DEFAULT_BATCH_LINGER
+            if batch_linger is None
+            else batch_linger
+        )
+        # 批量写入统计
+        self.num_write_batches: int = 0  # 批量写入的次数（即flush次数）
+        self.num_batched_inputs: int = 0  # 批量写入的命令总数
+        self.num_inputs_written: int = 0  # 从缓冲区写入CIN的命令总数（供推理周期控制器测量写出速率）
+        self.num_inputs_writing: int = 0  # 已从缓冲区取出、正在写入的命令数
 
     def launch(self):
         "功能分离：启动NARS程序"
+        self.report_profile()
+        self.launch_time = monotonic()
+        self.first_operation_time = None
         self._launch_CIN()
         self._launch_thread_read()
         self._launch_thread_write()
+        if self._output_queue is not None:
+            self._launch_thread_dispatch()
 
     def __del__(self):
         del self.process
@@ -219,6 +531,21 @@ class Cmdline(NARSProgram):
     def isAlive(self) -> bool:
         return hasattr(self, 'process') and self.process
 
+    @property
+    def is_healthy(self) -> bool:
+        "健康检查：子进程仍在运行（未自行退出）"
+        return bool(self.isAlive) and self.process.poll() is None
+
+    def reset(self) -> bool:
+        "重置：同时断开钩子、清空输出队列，防止旧输出流入下一个使用者"
+        if not self.can_reset:
+            return False
+        self.out_hook = None
+        self.out_filter_operations = False
+        if self._output_queue is not None:
+            self._output_queue.clear()
+        return super().reset()
+
     def terminate(self):
         """终止程序（终止后就不使用了）
         """
@@ -233,43 +560,45 @@ class Cmdline(NARSProgram):
             # self.write_line_thread.join()
             self.read_line_thread = None
             self.write_line_thread = None
+            # 唤醒并结束等待中的分发线程
+            if self._output_queue is not None:
+                self._output_queue.close()
         except BaseException as e:
             print(f'Failed to terminate process: {e}')
         super().terminate()
 
     def _launch_CIN(self):
         """并行启动CIN
-        使用cmd形式打开子进程，并根据NARS类型启动对应程序（适用于命令行打开的程序）
-        创建一个子进程来执行 ls -l 命令，并将标准输出和错误输出捕获到 output 和 error 变量中。
+        以参数列表直接启动CIN可执行文件（不经过cmd等shell），并关闭其冗余输出
             母进程可以继续执行其他任务，而不会被阻塞，直到需要获取子进程输出的时候再调用 process.communicate()
         """
         self.process = subprocess.Popen(
-            ["cmd"],  # 使用CMD打开
-            bufsize=1,
+            self.launch_args,  # 直接启动，无需shell转发
+            bufsize=-1 if self.binary_read else 1,
             stdin=subprocess.PIPE,  # 输入管道
             stdout=subprocess.PIPE,  # 输出管道
-            universal_newlines=True,  # convert bytes to text/string
+            universal_newlines=not self.binary_read,  # convert bytes to text/string
             shell=False
         )
-        self.launch_program()  # 「具体启动程序」交给剩下的子类实现
-        self.add_input('*volume=0')
-
-    def launch_program(self):
-        "直接启动程序"
-        pass
+        if self.binary_read:  # 二进制读取：输入端仍以文本写入
+            self.process.stdin = io.TextIOWrapper(
+                self.process.stdin, encoding=self.encoding, write_through=True)
+        for cmd in self.profile.commands():  # 如「*volume=0」
+            self.add_input(cmd)
 
     def _launch_thread(self, target, args) -> threading.Thread:
         "通用：开启线程（返回开启的线程）"
-        self.read_line_thread = threading.Thread(
+        thread = threading.Thread(
             target=target,
             args=args
         )
 
         # 将线程设置为守护线程，即在程序退出时自动终止线程
-        self.read_line_thread.daemon = True
+        thread.daemon = True
 
         # 启动线程
-        self.read_line_thread.start()
+        thread.start()
+        return thread
 
     def _launch_thread_read(self):
         "开启子线程，负责接收NARS程序的输出"
@@ -281,6 +610,13 @@ class Cmdline(NARSProgram):
             args=(self.process.stdout,)
         )
 
+    def _launch_thread_dispatch(self):
+        "开启子线程，负责从输出队列中取出输出行并调用钩子（防止慢速钩子阻塞读线程）"
+        self.dispatch_thread = self._launch_thread(
+            target=self.dispatch_out_lines,
+            args=()
+        )
+
     def _launch_thread_write(self):
         "解决「写入卡顿」的方案：开启子线程，负责NAL语句的异步写入"
         # 创建线程对象 self.write_line_thread
@@ -300,20 +636,34 @@ class Cmdline(NARSProgram):
         # print(f'write: {sentence}')
 
     def add_inference_cycles(self, num: int):
-        "推理循环步进"
-        self.process.stdin.write(f'{num}\n')
-        self.process.stdin.flush()
+        "推理循环步进（与语句一并进入缓冲区，保证在同一tick的语句之后写入；不会被溢出策略合并或丢弃）"
+        self._enqueue_cycles(num)
+
+    @property
+    def num_pending_inputs(self) -> int:
+        "返回尚未写入CIN的命令数量（含缓冲区中的与正在写入的）"
+        return self.num_cached_inputs + self.num_inputs_writing
+
+    @property
+    def average_batch_size(self) -> float:
+        "平均每次批量写入的命令数"
+        return (
+            self.num_batched_inputs / self.num_write_batches
+            if self.num_write_batches  # 避免除以零
+            else 0
+        )
 
     def update_inference_cycles(self) -> None:
         "更新自身推理循环"
-        if self.inference_cycle_frequency:  # 若大于零
-            self.add_inference_cycles(self.inference_cycle_frequency)
+        if num := self.next_inference_cycles():  # 若大于零
+            self.add_inference_cycles(num)
 
     # 感知
     def add_perception(self, perception: NARSPerception) -> None:
         "统一添加感知"
         self.write_line(
-            self.__class__.SENSE_TEMPLATE % (
+            self.render_sentence(
+                self.__class__.SENSE_TEMPLATE,
                 perception.subject, perception.adjective)  # 套模板
         )
 
@@ -321,20 +671,23 @@ class Cmdline(NARSProgram):
     def put_goal(self, goalName: str, is_negative: bool = False):
         "向智能体置入目标（以NAL语句的形式）"
         self.write_line(
-            (
+            self.render_sentence(
                 self.__class__.GOAL_TEMPLATE_NEGATIVE  # 根据不同类的常量决定模板
                 if is_negative
-                else self.__class__.GOAL_TEMPLATE
-            ) % goalName
+                else self.__class__.GOAL_TEMPLATE,
+                goalName
+            )
         )
 
     def praise_goal(self, goalName: str):
         "让智能体感到「目标被实现」，亦即「奖励」"
-        self.write_line(self.__class__.PRAISE_TEMPLATE % goalName)
+        self.write_line(self.render_sentence(
+            self.__class__.PRAISE_TEMPLATE, goalName))
 
     def punish_goal(self, goalName: str):
         "让智能体感到「目标未实现」，亦即「惩罚」"
-        self.write_line(self.__class__.PUNISH_TEMPLATE % goalName)
+        self.write_line(self.render_sentence(
+            self.__class__.PUNISH_TEMPLATE, goalName))
 
     @property
     def enable_babble(self) -> bool:
@@ -343,14 +696,16 @@ class Cmdline(NARSProgram):
     def put_unconscious_operation(self, operation: NARSOperation):
         "强制「无意识操作」：告诉NARS程序「我执行了这个操作」"
         if self.__class__.BABBLE_TEMPLATE and (
-            sentence := (self.__class__.BABBLE_TEMPLATE % operation.name)
+            sentence := self.render_sentence(
+                self.__class__.BABBLE_TEMPLATE, operation.name)
         ):
             self.write_line(sentence)  # 置入「自己在进行什么操作」
 
     def register_basic_operation(self, operation: NARSOperation):
         "注册「基础操作」：告诉NARS程序「我可以执行这个操作」"
         if self.__class__.OPERATION_REGISTER_TEMPLATE and (
-            sentence := (self.__class__.OPERATION_REGISTER_TEMPLATE % operation.name)
+            sentence := self.render_sentence(
+                self.__class__.OPERATION_REGISTER_TEMPLATE, operation.name)
         ):
             self.write_line(sentence)  # 置入「自己在进行什么操作」
 
@@ -358,35 +713,175 @@ class Cmdline(NARSProgram):
 
     def read_line(self, stdout):  # read line without blocking
         "读取程序的（命令行）输出"
-        for line in iter(stdout.readline, b'\n'):
+        if self.binary_read:
+            return self.read_chunks(stdout)
+        classifier: LineClassifier = self.line_classifier
+        for line in iter(stdout.readline, ''):  # 文本模式下，EOF时返回空字符串
             # 每次运行时检查自身「是否存活」，若程序已终止，则退出「结束后不断输出空字符」的死循环！
             if not self.isAlive:
                 break
+            self.num_lines_read += 1
+            if tracer := self.tracer:
+                tracer.on_output_line()
+            line = line.strip()
+            is_operation: bool = classifier is None or classifier.is_candidate(line)
+            # 只需要操作行时，非操作行直接跳过
+            if self.out_filter_operations and not is_operation:
+                continue
             # 传递单个输出行到指定外接钩子
-            self.out_hook and self.out_hook(line.strip())
+            self._emit_line(line, is_operation)
         stdout.close()  # 关闭输出流
 
-    def catch_operation_name(self, line: str):
-        "（API）从输出的一行（语句）中获取信息，并返回截取到的「操作字符串」"
-        pass
+    def read_chunks(self, stdout):
+        """以二进制、分块的方式读取程序输出
+        - 每次把管道中已有的数据（至多READ_CHUNK_SIZE字节）读入一块复用的缓冲区
+        - 自行按换行切分，不完整的末行留待下一块拼接
+        - 延迟解码：只需要操作行时，仅解码通过前缀检查的行
+        """
+        buffer: bytearray = bytearray(self.__class__.READ_CHUNK_SIZE)
+        view: memoryview = memoryview(buffer)
+        readinto = getattr(stdout, 'readinto1', None) or stdout.readinto
+        pending: bytes = b''  # 上一块末尾不完整的行
+        encoding: str = self.encoding
+        prefix: bytes = self.line_classifier and self.line_classifier.prefix_bytes
+        n_prefix: int = len(prefix) if prefix else 0
+        emit = self._emit_line
+        while self.isAlive:
+            if not (n := readinto(view)):
+                break  # EOF
+            lines: list[bytes] = (pending + view[:n]).split(b'\n')
+            pending = lines.pop()
+            self.num_lines_read += len(lines)
+            if lines and (tracer := self.tracer):  # 同一块中的行视作同时读到
+                tracer.on_output_line()
+            if prefix is None:  # 无分类器：全部视作操作行
+                for line in lines:
+                    emit(line.decode(encoding, 'replace').strip(), True)
+            elif self.out_filter_operations:
+                for line in lines:
+                    if line.lstrip()[:n_prefix] == prefix:  # 只解码通过前缀检查的行（同文本模式，忽略行首空白）
+                        emit(line.decode(encoding, 'replace').strip(), True)
+            else:
+                for line in lines:
+                    emit(line.decode(encoding, 'replace').strip(),
+                         line.lstrip()[:n_prefix] == prefix)
+        if pending and self.isAlive:
+            self.num_lines_read += 1
+            emit(pending.decode(encoding, 'replace').strip(),
+                 prefix is None or pending.lstrip()[:n_prefix] == prefix)
+        view.release()
+        stdout.close()  # 关闭输出流
+
+    def _emit_line(self, line: str, is_operation: bool) -> None:
+        "把一行输出交给钩子：启用输出队列时入队，由分发线程调用；否则在读线程中同步调用"
+        if is_operation and self.first_operation_time is None:  # 记录启动耗时
+            self.first_operation_time = monotonic()
+        if self._output_queue is not None:
+            self._output_queue.put(line, is_operation)
+        elif out_hook := self.out_hook:
+            out_hook(line)
+
+    def dispatch_out_lines(self):
+        "从输出队列中取出输出行，调用钩子，并统计钩子延迟"
+        queue: OutputQueue = self._output_queue  # 本地引用：terminate后属性会被置空
+        while self.isAlive:
+            if (item := queue.get()) is None:
+                break  # 队列已关闭
+            line, time_put = item
+            if not (out_hook := self.out_hook):
+                continue
+            time_start: float = monotonic()
+            out_hook(line)
+            time_end: float = monotonic()
+            # 统计
+            self.num_hook_calls += 1
+            self.hook_time_total += (hook_time := time_end - time_start)
+            self.hook_time_max = max(self.hook_time_max, hook_time)
+            self.output_delay_total += time_start - time_put
+
+    @property
+    def num_lines_dropped(self) -> int:
+        "因输出背压而丢弃的行数"
+        return 0 if self._output_queue is None else self._output_queue.num_dropped
+
+    @property
+    def average_hook_latency(self) -> float:
+        "（启用输出队列时）钩子的平均处理时间（秒）"
+        return (
+            self.hook_time_total / self.num_hook_calls
+            if self.num_hook_calls  # 避免除以零
+            else 0
+        )
+
+    @property
+    def average_output_delay(self) -> float:
+        "（启用输出队列时）输出行从读出到交给钩子的平均等待时间（秒）"
+        return (
+            self.output_delay_total / self.num_hook_calls
+            if self.num_hook_calls  # 避免除以零
+            else 0
+        )
+
+    def write_batch(self, cmds: list[str]) -> None:
+        "批量置入NAL语句：以换行拼接，只进行一次write与flush"
+        self.process.stdin.write('\n'.join(cmds) + '\n')
+        self.process.stdin.flush()
+        self.num_write_batches += 1
+        self.num_batched_inputs += len(cmds)
+
+    def catch_operation(self, line: str) -> tuple[str, tuple[str, ...]] | None:
+        "从输出的一行（语句）中获取信息，返回截取到的(操作名, 参数元组)，非操作行返回None"
+        return self.line_classifier and self.line_classifier.classify(line)
+
+    def catch_operation_name(self, line: str) -> str | None:
+        """从输出的一行（语句）中获取信息，并返回截取到的「操作字符串」
+        - 智能体经由此方法获取操作：子类可重写它以自定义操作的识别
+        - 热路径：只取操作名，不提取参数
+        """
+        return self.line_classifier and self.line_classifier.operation_name(line)
 
     def async_write_lines(self, stdin):
         "从自身指令缓冲区中读取输入，送入程序的stdin中"
-        while self.isAlive:  # 始终运行，读取缓冲区中的指令列表
-            if self._cached_inputs:
-                cmd: str = self._cached_inputs.pop(0)  # 取最开头（pop(0)代替shift）
+        queue: CommandQueue = self._cached_inputs  # 本地引用：terminate后属性会被置空
+        while self.isAlive:  # 始终运行，读取缓冲区中的指令
+            # 无命令时在队列上休眠，直到有新命令或队列被关闭
+            if self.batch_size > 1:  # 批量模式：取出一批，一次写入
+                if not (cmds := queue.get_batch(self.batch_size, self.batch_linger)):
+                    break  # 队列已关闭
+                self.num_inputs_writing = len(cmds)
+                if tracer := self.tracer:
+                    tracer.on_write(cmds)
+                self.write_batch(cmds)  # CIN处理不及时、管道已满时，会在此阻塞
+                if tracer:
+                    tracer.on_flush()
+                self.num_inputs_writing = 0
+                self.num_inputs_written += len(cmds)
+                cmd: str = cmds[-1]
+            else:  # 逐条模式
+                if (cmd := queue.get()) is None:
+                    break  # 队列已关闭
+                self.num_inputs_writing = 1
+                if tracer := self.tracer:
+                    tracer.on_write((cmd,))
                 self.add_input(cmd)  # 异步调用（不阻塞主进程）
-                if (n_cmds := self.num_cached_inputs) > 0xff:
-                    print(
-                        f"Warning: The number of cached commands has exceeded the limit with n={n_cmds}!",
-                        f'> Last cmd is: {cmd}', sep='\n'
-                    )
+                if tracer:
+                    tracer.on_flush()
+                self.num_inputs_writing = 0
+                self.num_inputs_written += 1
+            if (n_cmds := len(queue)) > self.__class__.CACHED_INPUTS_WARNING_THRESHOLD:
+                print(
+                    f"Warning: The number of cached commands has exceeded the limit with n={n_cmds}!",
+                    f'> Last cmd is: {cmd}', sep='\n'
+                )
 
     # @measure_time
     def write_line(self, cmd: str):
         "缓存命令到缓冲区中"
         DEBUG and print(f'add {cmd} to {self.num_cached_inputs}')
-        self._cached_inputs.append(cmd)  # 存入缓冲区
+        if self._frame_inputs is not None:  # 帧内：暂存，待提交时整体入队
+            self._frame_inputs.append(cmd)
+        else:
+            self._enqueue(cmd)  # 存入缓冲区（满时按溢出策略处理）
         return  # 代码删除后记：不适宜「对每个输入的语句都开一个新线程」，对系统占用的开销太大
 
 
@@ -402,22 +897,34 @@ class OpenNARS(Cmdline):
     # opennars' grammar（避免百分号歧义）
     PUNISH_TEMPLATE = f'<{NARSProgram._TERM_SELF} --> [%s]>. :|: %%0%%'
 
-    def launch_program(self):
-        super().launch_program()
-        # OpenNARS的实现
-        # self.add_input('java -Xmx2048m -jar opennars.jar')
-        self.add_input(f'java -Xmx1024m -jar {self.jar_path}')
+    # 清空记忆（之后会重新发送配置中的启动命令）
+    RESET_COMMANDS: tuple[str, ...] = ('*reset',)
+
+    DEFAULT_INFERENCE_CYCLE_FREQUENCY: int = 5
+
+    DEFAULT_PROFILE: CINProfile = CINProfile(name='opennars', heap_size='1024m').over(NARSProgram.DEFAULT_PROFILE)
 
-    def __init__(self, jar_path: str = f'./{DEFAULT_JAR_NAME}', out_hook=None):
+    @property
+    def launch_args(self) -> list[str]:
+        # OpenNARS的实现：java [JVM参数] -jar opennars.jar
+        return [
+            'java', *self.profile.jvm_args,
+            '-jar', self.profile.resolve_executable(self.jar_path),
+            *self.profile.extra_args
+        ]
+
+    def __init__(self, jar_path: str = f'./{DEFAULT_JAR_NAME}', out_hook=None, **kwargs):
         self.jar_path = jar_path
-        super().__init__(out_hook=out_hook)
-        self.inference_cycle_frequency = 5
+        super().__init__(out_hook=out_hook, **kwargs)
 
-    def catch_operation_name(self, line: str) -> str:
-        if line[0:3] == 'EXE':  # 若为操作前缀
-            subline = line.split(' ', 2)[2]  # 获取EXE后语句
-            # print(subline) # 操作文本：「EXE ^right([{SELF}])=null」
-            return subline.split('(', 1)[0][1:]  # 避免'^^opera'
+    # 操作文本：「EXE: $0.26;0.17;0.94$ ^right([{SELF}])=null」
+    LINE_CLASSIFIER: LineClassifier = PartitionLineClassifier(
+        prefix='EXE',
+        name_marker=' ^',  # 跳过「EXE」与预算值，避免'^^opera'
+        name_end='(',
+        args_marker='',  # 参数紧跟在「(」之后
+        args_end=')'
+    )
 
 
 class ONA(Cmdline):
@@ -440,20 +947,29 @@ class ONA(Cmdline):
     # 操作注册
     OPERATION_REGISTER_TEMPLATE: str = f'(*,{NARSProgram._TERM_SELF}, ^%s). :|:'
 
-    def __init__(self, exe_path: str = f'.\\{DEFAULT_EXE_NAME}', out_hook=None):
+    # 清空记忆（之后会重新发送配置中的启动命令）
+    RESET_COMMANDS: tuple[str, ...] = ('*reset',)
+
+    DEFAULT_INFERENCE_CYCLE_FREQUENCY: int = 0  # ONA会自主更新
+
+    DEFAULT_PROFILE: CINProfile = CINProfile(name='ONA').over(NARSProgram.DEFAULT_PROFILE)
+
+    def __init__(self, exe_path: str = os.path.join('.', DEFAULT_EXE_NAME), out_hook=None, **kwargs):
         self.exe_path = exe_path
-        super().__init__(out_hook=out_hook)
-        self.inference_cycle_frequency = 0  # ONA会自主更新
+        super().__init__(out_hook=out_hook, **kwargs)
 
-    def launch_program(self):
-        super().launch_program()
-        # ONA的实现
-        self.add_input(f'{self.exe_path} shell')
+    @property
+    def launch_args(self) -> list[str]:
+        # ONA的实现（构建变体：以不同编译期参数编译的可执行文件）
+        return [self.profile.resolve_executable(self.exe_path), 'shell', *self.profile.extra_args]
 
-    def catch_operation_name(self, line: str) -> str:
-        if (line[0:1] == '^'):  # 避免在退出游戏时出错
-            # print(line) # 操作文本：「EXE ^right executed with args」
-            return line.split(' ', 1)[0][1:]  # 避免'^^opera'
+    # 操作文本：「^right executed with args ({SELF})」
+    LINE_CLASSIFIER: LineClassifier = PartitionLineClassifier(
+        prefix='^',
+        name_marker='^',  # 避免'^^opera'
+        name_end=' ',
+        args_marker='executed with args'
+    )
 
 
 class Python(Cmdline):
@@ -488,22 +1004,49 @@ class Python(Cmdline):
 
     # 类实现 #
 
-    def __init__(self, exe_path: str = f'.\\{DEFAULT_EXE_NAME}', out_hook=None):
+    DEFAULT_INFERENCE_CYCLE_FREQUENCY: int = 0  # NARS-Python 不需要更新（暂时只能输入NAL语句）
+
+    # NARS-Python 不支持「*volume」命令：音量保持None（不以over补全）
+    DEFAULT_PROFILE: CINProfile = CINProfile(
+        name='python',
+        max_inference_cycle_frequency=NARSProgram.DEFAULT_PROFILE.max_inference_cycle_frequency)
+
+    def __init__(self, exe_path: str = os.path.join('.', DEFAULT_EXE_NAME), out_hook=None, **kwargs):
         self.exe_path = exe_path
-        super().__init__(out_hook=out_hook)
-        self.inference_cycle_frequency = 0  # NARS-Python 不需要更新（暂时只能输入NAL语句）
+        super().__init__(out_hook=out_hook, **kwargs)
 
-    def launch_program(self):
-        super().launch_program()
+    @property
+    def launch_args(self) -> list[str]:
         # NARS Python实现
-        self.add_input(f'{self.exe_path}')
+        return [self.profile.resolve_executable(self.exe_path), *self.profile.extra_args]
 
-    def catch_operation_name(self, line: str) -> str:
+    # 操作文本：「EXE: ^left based on desirability: 0.9」
+    LINE_CLASSIFIER: LineClassifier = PartitionLineClassifier(
+        prefix='EXE',
+        name_marker='^',
+        name_end=' '
+    )
+
+    # 「拒绝」信息不是操作行：需要查看所有输出行
+    INSPECTS_ALL_LINES: bool = True
+
+    @staticmethod
+    def report_reject(line: str) -> None:
+        "识别并打印「拒绝」信息（大小写不敏感）"
         if 'reject' in line.lower():
             print(f'Reject: {line}')
-        if 'EXE' in line:  # 若为操作前缀
-            # print(f'{line}') # 操作文本：「EXE: ^left based on desirability: 0.9」
-            return line.split(' ', 2)[1][1:]
+
+    def catch_operation(self, line: str) -> tuple[str, tuple[str, ...]] | None:
+        # 识别「拒绝」信息：操作行不可能是拒绝信息，只在非操作行中查找
+        if not (operation := super().catch_operation(line)):
+            Python.report_reject(line)
+        return operation
+
+    def catch_operation_name(self, line: str) -> str | None:
+        # 识别「拒绝」信息（同catch_operation）
+        if not (operation_name := super().catch_operation_name(line)):
+            Python.report_reject(line)
+        return operation_name
 
 
 TYPE_CIN_DICT: dict[NARSType:tuple[type, str]] = {
@@ -512,7 +1055,6 @@ TYPE_CIN_DICT: dict[NARSType:tuple[type, str]] = {
     NARSType.ONA_OLD: (ONA, ONA.DEFAULT_EXE_NAME_OLD),
     NARSType.PYTHON: (Python, Python.DEFAULT_EXE_NAME),
 }
-TYPE_CIN_DICT.update({
-    v[0]: k  # 添加「类→NARSType」的映射
-    for k, v in TYPE_CIN_DICT.items()
-})
+for nars_type, (cls, _) in list(TYPE_CIN_DICT.items()):
+    TYPE_CIN_DICT.setdefault(cls, nars_type)  # 添加「类→NARSType」的映射：同一个类取首个类型（如ONA→ONA，而非ONA_OLD）
+del nars_type, cls
@@ -0,0 +1,285 @@
+"""端到端延迟追踪：从「感知入队」到「操作被游戏执行」
+
+一条命令（或一帧）在PyNEI中依次经过以下阶段，每个阶段都打上时间戳：
+- enqueue: 进入命令队列（write_line/commit_frame）
+- write: 被写线程取出，开始写入CIN
+- flush: 写入并刷新完毕（CIN此时才能读到）
+- first_output: 此后CIN输出的第一行被读到
+- operation_parsed: 此后第一个操作被解析出来（交给智能体）
+- operation_consumed: 该操作被游戏取用（如NARSPlanePlayer.handle_operations）
+
+⚠CIN是黑箱：无法知道某个操作究竟是由哪条输入引起的
+此处的归因是「时间上的」：已刷新、尚未等到输出/操作的所有命令，都把下一行输出/下一个操作记作自己的
+——测得的是「输入到达CIN后，多久才能看到下一个反应」，而非严格的因果延迟
+
+类の概览
+- Trace: 一条命令的各阶段时间戳
+- TraceLog: （可跨程序共享的）追踪记录：按NARSType汇总延迟直方图、导出到文件
+- LatencyTracer: 挂在单个NARS程序上的追踪器：在各阶段被调用，维护尚未完成的追踪
+"""
+
+import csv  # 导出为CSV
+import json  # 导出为JSON Lines
+import threading  # 各阶段发生在不同线程
+from time import monotonic  # 时间戳
+from collections import deque, Counter  # 各阶段的等待队列
+
+STAGES: tuple[str, ...] = (
+    'enqueue',
+    'write',
+    'flush',
+    'first_output',
+    'operation_parsed',
+    'operation_consumed',
+)
+"追踪的阶段（按先后顺序）"
+
+LATENCY_BINS: tuple[float, ...] = (
+    0.0001, 0.0003, 0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1, 3, 10,
+)
+"延迟直方图的分桶上界（秒）：最后还有一个「超出」桶"
+
+
+class Trace:
+    "一条命令（或一帧）的各阶段时间戳（未到达的阶段为None）"
+
+    __slots__ = ('id', 'nars_type', 'command', 'operation', 'dropped') + STAGES
+
+    def __init__(self, id: int, nars_type: str, command: str, enqueue: float) -> None:
+        self.id: int = id
+        self.nars_type: str = nars_type
+        self.command: str = command
+        self.operation: str = None  # 归因到此命令的操作名
+        self.dropped: bool = False  # 是否因队列溢出而被丢弃
+        self.enqueue: float = enqueue
+        self.write: float = None
+        self.flush: float = None
+        self.first_output: float = None
+        self.operation_parsed: float = None
+        self.operation_consumed: float = None
+
+    def latency(self, to_stage: str, from_stage: str = 'enqueue') -> float | None:
+        "两个阶段之间的延迟（秒；任一阶段未到达则为None）"
+        end, start = getattr(self, to_stage), getattr(self, from_stage)
+        return None if end is None or start is None else end - start
+
+    def to_dict(self) -> dict:
+        "转换为字典（用于导出）"
+        return {name: getattr(self, name) for name in Trace.__slots__}
+
+
+class TraceLog:
+    """追踪记录：收集一个或多个程序的追踪
+    - 只保留最近max_traces条（更早的被丢弃）
+    - 按NARSType汇总各阶段（相对enqueue）的延迟：分位数与直方图
+    """
+
+    def __init__(self, max_traces: int = 100000) -> None:
+        self.traces: deque[Trace] = deque(maxlen=max_traces)
+        "追踪（按入队先后）"
+        self._next_id: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.traces)
+
+    def new_trace(self, nars_type: str, command: str, enqueue: float) -> Trace:
+        "新建并记录一条追踪"
+        with self._lock:
+            trace: Trace = Trace(self._next_id, nars_type, command, enqueue)
+            self._next_id += 1
+            self.traces.append(trace)
+        return trace
+
+    @property
+    def nars_types(self) -> list[str]:
+        "记录中出现过的NARSType"
+        return sorted({trace.nars_type for trace in list(self.traces)})
+
+    def latencies(self, nars_type: str, to_stage: str, from_stage: str = 'enqueue') -> list[float]:
+        "某NARSType在两个阶段之间的所有延迟（秒，已排序）"
+        return sorted(
+            latency
+            for trace in list(self.traces)
+            if trace.nars_type == nars_type
+            and (latency := trace.latency(to_stage, from_stage)) is not None
+        )
+
+    @staticmethod
+    def histogram(latencies: list[float], bins: tuple[float, ...] = LATENCY_BINS) -> list[int]:
+        "延迟直方图：各桶（≤上界）的计数，最后一项为超出所有上界的计数"
+        counts: list[int] = [0] * (len(bins) + 1)
+        i: int = 0
+        for latency in latencies:  # latencies已排序：桶的下标单调不减
+            while i < len(bins) and latency > bins[i]:
+                i += 1
+            counts[i] += 1
+        return counts
+
+    @staticmethod
+    def percentile(latencies: list[float], q: float) -> float:
+        "分位数（latencies已排序；为空则为NaN）"
+        if not latencies:
+            return float('nan')
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def report(self) -> str:
+        "文字报告：按NARSType、阶段列出样本数、分位数与直方图"
+        bin_names: list[str] = [f'<={_format_seconds(b)}' for b in LATENCY_BINS] + [f'>{_format_seconds(LATENCY_BINS[-1])}']
+        lines: list[str] = [f'histogram bins: {" ".join(bin_names)}']
+        for nars_type in self.nars_types:
+            num_dropped: int = sum(
+                1 for trace in list(self.traces)
+                if trace.nars_type == nars_type and trace.dropped)
+            lines.append(f'[{nars_type}] (dropped: {num_dropped})')
+            for stage in STAGES[1:]:
+                latencies: list[float] = self.latencies(nars_type, stage)
+                lines.append(
+                    f'  enqueue->{stage:<18} n={len(latencies):<7}'
+                    f' p50={_format_seconds(TraceLog.percentile(latencies, 0.5)):>7}'
+                    f' p90={_format_seconds(TraceLog.percentile(latencies, 0.9)):>7}'
+                    f' p99={_format_seconds(TraceLog.percentile(latencies, 0.99)):>7}'
+                    f'  {TraceLog.histogram(latencies)}'
+                )
+        return '\n'.join(lines)
+
+    def export(self, path: str) -> int:
+        "导出所有追踪（.csv为CSV，其它为JSON Lines），返回导出的条数"
+        traces: list[Trace] = list(self.traces)
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            if path.lower().endswith('.csv'):
+                writer = csv.writer(file)
+                writer.writerow(Trace.__slots__)
+                for trace in traces:
+                    writer.writerow(getattr(trace, name) for name in Trace.__slots__)
+            else:
+                for trace in traces:
+                    file.write(json.dumps(trace.to_dict(), ensure_ascii=False) + '\n')
+        return len(traces)
+
+
+def _format_seconds(seconds: float) -> str:
+    "（内部）以合适的单位显示时间"
+    if seconds != seconds:  # NaN
+        return '-'
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.0f}us'
+    if seconds < 1:
+        return f'{seconds * 1e3:.1f}ms'
+    return f'{seconds:.2f}s'
+
+
+class LatencyTracer:
+    """挂在单个NARS程序上的追踪器
+    - 各阶段的钩子由程序（及智能体）在相应的线程中调用，内部加锁
+    - 命令队列是先进先出的：写出时按顺序与入队的追踪比对，内容不符的即是被溢出策略丢弃的
+    - 等待输出/操作的追踪至多保留max_open个，以免CIN长期无输出时无限增长
+    """
+
+    def __init__(self, nars_type: str, log: TraceLog = None, max_open: int = 1024, clock=monotonic) -> None:
+        self.nars_type: str = nars_type
+        "所追踪程序的NARSType（字符串值）"
+        self.log: TraceLog = TraceLog() if log is None else log
+        "追踪记录（可在多个追踪器间共享）"
+        self.clock = clock
+        "时间戳所用的时钟"
+        self._lock: threading.Lock = threading.Lock()
+        self._queued: deque[Trace] = deque()  # 已入队、尚未写出
+        self._queued_commands: Counter[str] = Counter()  # _queued中（未被拒绝的）各命令的个数
+        self._writing: list[Trace] = []  # 正在写入
+        self._awaiting_output: deque[Trace] = deque(maxlen=max_open)  # 已刷新、等待首行输出
+        self._awaiting_operation: deque[Trace] = deque(maxlen=max_open)  # 已刷新、等待操作
+        self._awaiting_consumption: deque[Trace] = deque(maxlen=max_open)  # 已解析出操作、等待游戏取用
+
+    def on_enqueue(self, command: str) -> Trace:
+        "命令即将入队（须在入队之前调用：写线程可能立即取走它）"
+        trace: Trace = self.log.new_trace(self.nars_type, command, self.clock())
+        with self._lock:
+            self._queued.append(trace)
+            self._queued_commands[command] += 1
+        return trace
+
+    def on_rejected(self, trace: Trace) -> None:
+        "命令被溢出策略直接拒绝（未入队）"
+        with self._lock:
+            if not trace.dropped:
+                trace.dropped = True
+                self._queued_commands[trace.command] -= 1
+
+    def on_cleared(self) -> None:
+        "命令缓冲区被清空：所有尚未写出的命令均被丢弃"
+        with self._lock:
+            for trace in self._queued:
+                trace.dropped = True
+            self._queued.clear()
+            self._queued_commands.clear()
+
+    def on_write(self, commands: list[str]) -> None:
+        "命令被取出，开始写入"
+        now: float = self.clock()
+        with self._lock:
+            for command in commands:
+                if self._queued_commands[command] <= 0:
+                    continue  # 开始追踪之前就已入队的命令
+                while self._queued:
+                    trace: Trace = self._queued.popleft()
+                    if trace.dropped:  # 已被拒绝
+                        continue
+                    self._queued_commands[trace.command] -= 1
+                    if trace.command == command:
+                        trace.write = now
+                        self._writing.append(trace)
+                        break
+                    trace.dropped = True  # 队列中排在它之前、却没被写出：已被丢弃
+
+    def on_flush(self) -> None:
+        "写入并刷新完毕"
+        now: float = self.clock()
+        with self._lock:
+            for trace in self._writing:
+                trace.flush = now
+            self._awaiting_output.extend(self._writing)
+            self._awaiting_operation.extend(self._writing)
+            self._writing.clear()
+
+    def on_output_line(self) -> None:
+        "读到一行输出"
+        if not self._awaiting_output:  # 快速路径：无需加锁
+            return
+        now: float = self.clock()
+        with self._lock:
+            for trace in self._awaiting_output:
+                trace.first_output = now
+            self._awaiting_output.clear()
+
+    def on_operation(self, name: str) -> None:
+        "解析出一个操作"
+        if not self._awaiting_operation:
+            return
+        now: float = self.clock()
+        with self._lock:
+            for trace in self._awaiting_operation:
+                trace.operation_parsed = now
+                trace.operation = name
+            self._awaiting_consumption.extend(self._awaiting_operation)
+            self._awaiting_operation.clear()
+
+    def on_consumed(self) -> None:
+        "已解析的操作被游戏取用"
+        if not self._awaiting_consumption:
+            return
+        now: float = self.clock()
+        with self._lock:
+            for trace in self._awaiting_consumption:
+                trace.operation_consumed = now
+            self._awaiting_consumption.clear()
+
+    def reset(self) -> None:
+        "丢弃所有未完成的追踪（如：程序被重置）"
+        with self._lock:
+            self._queued.clear()
+            self._queued_commands.clear()
+            self._writing.clear()
+            self._awaiting_output.clear()
+            self._awaiting_operation.clear()
+            self._awaiting_consumption.clear()
@@ -0,0 +1,86 @@
+/*
+ * PyNEI进程内ONA的C接口（shim）
+ *
+ * 与ONA源码一同编译为共享库，供PyNEI.Native.ONALibrary经ctypes调用：
+ * - 输入与`NAR shell`完全一致（Narsese、推理周期数、「*volume」「*reset」等命令），但直接函数调用，无需管道
+ * - 操作被执行时，不再打印「^left executed with args ...」，而是直接回调Python
+ *
+ * 编译：见同目录下的Makefile（需要ONA源码，ONA_SRC指向其src目录）
+ * 适用于Action签名为`Feedback (*)(Term)`的ONA版本（v0.9.x）
+ */
+
+#include "NAR.h"
+#include "Shell.h"
+
+/* 回调：(操作名, 参数)；参数暂为空串 */
+typedef void (*pynei_operation_callback)(const char *name, const char *args);
+
+static pynei_operation_callback callback = NULL;
+
+/* 执行第i个操作：查出其当前名称（可能经「*setopname」改过），回调Python */
+static Feedback pynei_operation(int i, Term args)
+{
+    (void) args;
+    if(callback != NULL && operations[i].term.atoms[0])
+    {
+        callback(Narsese_atomNames[operations[i].term.atoms[0] - 1], "");
+    }
+    return (Feedback) {0};
+}
+
+/* C没有闭包：为每个操作槽位生成一个跳板函数 */
+#define PYNEI_TRAMPOLINE(i) static Feedback pynei_operation_##i(Term args) { return pynei_operation(i, args); }
+PYNEI_TRAMPOLINE(0)
+PYNEI_TRAMPOLINE(1)
+PYNEI_TRAMPOLINE(2)
+PYNEI_TRAMPOLINE(3)
+PYNEI_TRAMPOLINE(4)
+PYNEI_TRAMPOLINE(5)
+PYNEI_TRAMPOLINE(6)
+PYNEI_TRAMPOLINE(7)
+PYNEI_TRAMPOLINE(8)
+PYNEI_TRAMPOLINE(9)
+
+#if OPERATIONS_MAX > 10
+#error "ona_shim.c: add trampolines for OPERATIONS_MAX > 10"
+#endif
+
+static const Action trampolines[] = {
+    pynei_operation_0, pynei_operation_1, pynei_operation_2, pynei_operation_3, pynei_operation_4,
+    pynei_operation_5, pynei_operation_6, pynei_operation_7, pynei_operation_8, pynei_operation_9,
+};
+
+/* 初始化（或重置）NAR：与shell相同的默认操作，但动作替换为回调 */
+void pynei_ona_init(void)
+{
+    NAR_INIT();
+    Shell_NARInit();
+    for(int i = 0; i < OPERATIONS_MAX; i++)
+    {
+        if(operations[i].term.atoms[0])
+        {
+            operations[i].action = trampolines[i];
+        }
+    }
+}
+
+void pynei_ona_set_callback(pynei_operation_callback cb)
+{
+    callback = cb;
+}
+
+/* 输入一行（同shell）：返回值同Shell_ProcessInput；「*reset」时重新初始化 */
+int pynei_ona_input(char *line)
+{
+    int result = Shell_ProcessInput(line);
+    if(result == SHELL_RESET)
+    {
+        pynei_ona_init();
+    }
+    return result;
+}
+
+void pynei_ona_cycles(int cycles)
+{
+    NAR_Cycles(cycles);
+}
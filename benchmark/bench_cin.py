@@ -0,0 +1,343 @@
+"""基准：各后端的写入吞吐量、输出读取吞吐量与端到端操作延迟
+
+真实CIN（opennars.jar/NAR.exe）只能在Windows下运行、且输出不可控，故此处以`PyNEI.MockCIN`模拟各CIN的命令行协议：
+语法、管道、读写线程（或事件循环）与输出行解析都与真实后端相同，差别只在于「推理」本身
+
+对每个后端（OpenNARS/ONA/Python的线程版与asyncio版；进程内ONA仅在共享库存在时）测量
+- write: 逐条写入感知语句，直到全部写入管道，每秒的命令数
+- read: 让CIN一次输出N行（每10行一个操作），直到读到末行的结束操作，每秒解析的行数
+- latency: 逐个写入目标，直到游戏侧取到操作，各阶段（见`PyNEI.Tracing`）的延迟分位数
+
+结果写为JSON（键已排序、数值已取整），可在提交之间直接diff，或以`--compare`对比
+
+用法：python benchmark/bench_cin.py [--quick] [--volume=每行输入附带的输出行数] [--output=结果路径] [--compare=旧结果路径]
+"""
+
+import os
+import json
+import queue
+import asyncio
+import platform
+import subprocess
+import threading
+from os.path import dirname, join, abspath
+from sys import path as PATH, argv as ARGV
+from time import perf_counter, sleep
+
+ROOT_PATH: str = abspath(join(dirname(__file__), '..'))
+PATH.append(ROOT_PATH)  # 使Python可以跨文件夹访问库
+
+from PyNEI.Program import NARSProgram, OpenNARS, ONA, Python  # noqa: E402
+from PyNEI.AsyncProgram import AsyncCmdline, AsyncOpenNARS, AsyncONA, AsyncPython  # noqa: E402
+from PyNEI.Native import ONALibrary  # noqa: E402
+from PyNEI.MockCIN import mock_class, BURST_COMMAND, BURST_END_OPERATION  # noqa: E402
+from PyNEI.Tracing import TraceLog, STAGES  # noqa: E402
+
+RESULTS_PATH: str = join(dirname(__file__), 'results')
+"结果文件的默认目录"
+
+BACKENDS: list[tuple[str, type]] = [
+    ('opennars', OpenNARS),
+    ('ONA', ONA),
+    ('python', Python),
+    ('async-opennars', AsyncOpenNARS),
+    ('async-ONA', AsyncONA),
+    ('async-python', AsyncPython),
+]
+"经MockCIN模拟的后端：（名称, 类）"
+
+SIZES: dict[str:dict[str:int]] = {
+    'full': {'write': 20000, 'read': 100000, 'latency': 500, 'rounds': 3},
+    'quick': {'write': 2000, 'read': 10000, 'latency': 50, 'rounds': 1},
+}
+"各项测量的规模：写入命令数、读取行数、延迟样本数、轮数（吞吐量取各轮中最快的一轮）"
+
+TIMEOUT_S: float = 60
+"单项测量的超时（秒）"
+
+
+def sentence(program: NARSProgram, i: int) -> str:
+    "第i条测试用的感知语句（以该后端的语法）"
+    return program.render_sentence(program.SENSE_TEMPLATE, f'enemy{i % 100}', 'left')
+
+
+def wait_until(condition, timeout_s: float = TIMEOUT_S) -> None:
+    "（线程版）轮询等待条件成立"
+    deadline: float = perf_counter() + timeout_s
+    while not condition():
+        if perf_counter() > deadline:
+            raise TimeoutError('The backend did not respond in time')
+        sleep(0.0001)
+
+
+def latency_summary(log: TraceLog, nars_type: str) -> dict:
+    "各阶段（相对入队）的延迟分位数（毫秒）"
+    summary: dict = {}
+    for stage in STAGES[1:]:
+        latencies: list[float] = log.latencies(nars_type, stage)
+        summary[stage] = {
+            'n': len(latencies),
+            **{
+                f'p{q}_ms': round(TraceLog.percentile(latencies, q / 100) * 1e3, 3)
+                for q in (50, 90, 99)
+            },
+            'histogram': TraceLog.histogram(latencies),
+        }
+    return summary
+
+
+# 线程版（Cmdline） #
+
+def bench_sync(cls: type, sizes: dict, volume: int) -> dict:
+    "测量一个线程版后端"
+    return {
+        'write': best_of(sizes['rounds'], lambda: sync_write(cls, sizes['write'])),
+        'read': best_of(sizes['rounds'], lambda: sync_read(cls, sizes['read'])),
+        'latency': sync_latency(cls, sizes['latency'], volume),
+    }
+
+
+def launch_sync(cls: type, out_hook=None, **options) -> NARSProgram:
+    "启动模拟的线程版后端，并等待启动命令写完"
+    mock: type = mock_class(cls, **options)
+    mock.CACHED_INPUTS_WARNING_THRESHOLD = float('inf')  # 积压正是测量的一部分：不打印警告
+    program: NARSProgram = mock('mock', out_hook=out_hook)
+    program.launch()
+    wait_until(lambda: program.num_pending_inputs == 0)
+    return program
+
+
+def sync_write(cls: type, n: int) -> dict:
+    "写入吞吐量：n条命令全部写入管道所用的时间"
+    program: NARSProgram = launch_sync(cls)
+    sentences: list[str] = [sentence(program, i) for i in range(n)]
+    base: int = program.num_inputs_written
+    start: float = perf_counter()
+    for cmd in sentences:
+        program.write_line(cmd)
+    wait_until(lambda: program.num_inputs_written - base >= n)
+    elapsed: float = perf_counter() - start
+    program.terminate()
+    return {'commands': n, 'seconds': elapsed, 'commands_per_s': n / elapsed}
+
+
+def sync_read(cls: type, n: int) -> dict:
+    "读取吞吐量：读入并解析n行输出所用的时间"
+    done: threading.Event = threading.Event()
+    num_operations: list[int] = [0]
+
+    def out_hook(line: str) -> None:
+        if operation_name := program.catch_operation_name(line):
+            num_operations[0] += 1
+            if operation_name == BURST_END_OPERATION:
+                done.set()
+    program: NARSProgram = launch_sync(cls, out_hook=out_hook)
+    start: float = perf_counter()
+    program.write_line(f'{BURST_COMMAND}{n}')
+    if not done.wait(TIMEOUT_S):
+        raise TimeoutError('The backend did not respond in time')
+    elapsed: float = perf_counter() - start
+    program.terminate()
+    return {'lines': n, 'operations': num_operations[0], 'seconds': elapsed, 'lines_per_s': n / elapsed}
+
+
+def sync_latency(cls: type, n: int, volume: int) -> dict:
+    "端到端延迟：逐个写入目标，读线程解析出操作，主线程（游戏）取用"
+    operations: queue.Queue = queue.Queue()
+
+    def out_hook(line: str) -> None:  # 同NARSAgent：解析操作并记录
+        if operation_name := program.catch_operation_name(line):
+            program.tracer.on_operation(operation_name)
+            operations.put(operation_name)
+    program: NARSProgram = launch_sync(cls, out_hook=out_hook, volume=volume)
+    log: TraceLog = TraceLog()
+    program.enable_tracing(log)
+    for _ in range(n):
+        program.put_goal('good')
+        operations.get(timeout=TIMEOUT_S)
+        program.tracer.on_consumed()  # 同NARSPlanePlayer.handle_operations
+    program.terminate()
+    return latency_summary(log, program.tracer.nars_type)
+
+
+# asyncio版（AsyncCmdline） #
+
+def bench_async(cls: type, sizes: dict, volume: int) -> dict:
+    "测量一个asyncio版后端"
+    return {
+        'write': best_of(sizes['rounds'], lambda: asyncio.run(async_write(cls, sizes['write']))),
+        'read': best_of(sizes['rounds'], lambda: asyncio.run(async_read(cls, sizes['read']))),
+        'latency': asyncio.run(async_latency(cls, sizes['latency'], volume)),
+    }
+
+
+async def launch_async(cls: type, **options) -> AsyncCmdline:
+    "启动模拟的asyncio版后端"
+    program: AsyncCmdline = mock_class(cls, **options)('mock')
+    await program.launch()
+    return program
+
+
+async def async_write(cls: type, n: int) -> dict:
+    "写入吞吐量：逐条写入（每条一次write+drain）"
+    program: AsyncCmdline = await launch_async(cls)
+    sentences: list[str] = [sentence(program, i) for i in range(n)]
+    start: float = perf_counter()
+    for cmd in sentences:
+        await program.add_input(cmd)
+    elapsed: float = perf_counter() - start
+    await program.aclose()
+    return {'commands': n, 'seconds': elapsed, 'commands_per_s': n / elapsed}
+
+
+async def async_read(cls: type, n: int) -> dict:
+    "读取吞吐量：读入n行输出（非操作行在字节层面即被排除），直到取到结束操作"
+    program: AsyncCmdline = await launch_async(cls)
+    num_operations: int = 0
+    start: float = perf_counter()
+    await program.add_input(f'{BURST_COMMAND}{n}')
+
+    async def consume() -> None:
+        nonlocal num_operations
+        async for operation in program:
+            num_operations += 1
+            if operation.name == BURST_END_OPERATION:
+                break
+    await asyncio.wait_for(consume(), TIMEOUT_S)
+    elapsed: float = perf_counter() - start
+    await program.aclose()
+    return {'lines': n, 'operations': num_operations, 'seconds': elapsed, 'lines_per_s': n / elapsed}
+
+
+async def async_latency(cls: type, n: int, volume: int) -> dict:
+    "端到端延迟：逐个写入目标，等待操作迭代器给出操作"
+    program: AsyncCmdline = await launch_async(cls, volume=volume)
+    log: TraceLog = TraceLog()
+    program.enable_tracing(log)
+    operations = program.operations()
+    for _ in range(n):
+        await program.put_goal('good')
+        await asyncio.wait_for(anext(operations), TIMEOUT_S)
+    await operations.aclose()
+    await program.aclose()
+    return latency_summary(log, program.tracer.nars_type)
+
+
+# 进程内ONA（需事先编译共享库，见PyNEI/native） #
+
+def bench_ona_library(lib_path: str, sizes: dict) -> dict:
+    "测量进程内ONA的写入吞吐量（其输出与延迟取决于真实的推理，不在此比较）"
+    if not os.path.exists(lib_path):
+        return {'skipped': f'{os.path.basename(lib_path)} not built'}
+    program: ONALibrary = ONALibrary(lib_path)
+    program.launch()
+    n: int = sizes['write']
+    sentences: list[str] = [sentence(program, i) for i in range(n)]
+    start: float = perf_counter()
+    for cmd in sentences:
+        program.write_line(cmd)
+    elapsed: float = perf_counter() - start
+    program.terminate()
+    return {'write': {'commands': n, 'seconds': elapsed, 'commands_per_s': n / elapsed}}
+
+
+# 汇总与对比 #
+
+def best_of(rounds: int, measure) -> dict:
+    "多轮测量，取耗时最短的一轮（以减少噪声）"
+    return min((measure() for _ in range(rounds)), key=lambda result: result['seconds'])
+
+
+def rounded(value, digits: int = 4):
+    "把结果中的浮点数取为有效数字digits位（减少diff中的噪声）"
+    if isinstance(value, dict):
+        return {k: rounded(v, digits) for k, v in value.items()}
+    if isinstance(value, list):
+        return [rounded(v, digits) for v in value]
+    if isinstance(value, float):
+        return float(f'{value:.{digits}g}')
+    return value
+
+
+def git_commit() -> str | None:
+    "当前的git提交（不在git仓库中则为None）"
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_PATH,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict, prefix: str = '') -> dict[str:float]:
+    "把嵌套的结果展开为「a.b.c → 数值」（用于对比）"
+    flat: dict[str:float] = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def compare(old_path: str, new: dict) -> None:
+    "与旧结果对比：列出吞吐量与延迟分位数的变化"
+    with open(old_path, encoding='utf-8') as file:
+        old: dict = json.load(file)
+    print(f'Comparing with {old_path} (commit {old["meta"].get("commit")}):')
+    old_flat, new_flat = flatten(old['results']), flatten(new['results'])
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        if not (key.endswith('_per_s') or key.endswith('_ms')) or not old_flat[key]:
+            continue
+        print(f'  {key:<48} {old_flat[key]:>14,.3f} -> {new_flat[key]:>14,.3f}  ({new_flat[key] / old_flat[key]:.2f}x)')
+
+
+def main(options: dict[str:str]) -> None:
+    size_name: str = 'quick' if 'quick' in options else 'full'
+    sizes: dict = SIZES[size_name]
+    volume: int = int(options.get('volume', 2))
+    results: dict = {}
+    for name, cls in BACKENDS:
+        print(f'Benchmarking {name}...')
+        results[name] = (
+            bench_async(cls, sizes, volume)
+            if issubclass(cls, AsyncCmdline)
+            else bench_sync(cls, sizes, volume)
+        )
+        print(
+            f'  write={results[name]["write"]["commands_per_s"]:>12,.0f} cmd/s',
+            f'read={results[name]["read"]["lines_per_s"]:>12,.0f} lines/s',
+            f'latency p50={results[name]["latency"]["operation_consumed"]["p50_ms"]:.3f} ms',
+            f'p99={results[name]["latency"]["operation_consumed"]["p99_ms"]:.3f} ms',
+            sep='  '
+        )
+    results['ONA_lib'] = bench_ona_library(
+        options.get('ona-lib', join(ROOT_PATH, 'PyNEI', ONALibrary.DEFAULT_LIB_NAME)), sizes)
+    report: dict = rounded({
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'size': size_name,
+            'sizes': sizes,
+            'volume': volume,
+        },
+        'results': results,
+    })
+    commit: str = report['meta']['commit'] or 'local'
+    output_path: str = options.get('output', join(RESULTS_PATH, f'bench_cin-{commit}-{size_name}.json'))
+    os.makedirs(dirname(abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write('\n')
+    print(f'Results are written to {output_path}.')
+    if old_path := options.get('compare'):
+        compare(old_path, report)
+
+
+if __name__ == '__main__':
+    main(dict(
+        (arg[2:].split('=', 1) + [''])[:2]  # 「--name」视作「--name=」
+        for arg in ARGV[1:]
+        if arg.startswith('--')
+    ))
@@ -0,0 +1,110 @@
+"""微基准：输出行分类器 vs 原先的字符串切分
+
+在各CIN的代表性输出样本（benchmark/data）上，比较
+- legacy: 原`catch_operation_name`的切分写法（只取操作名）
+- classifier: 各CIN的`LINE_CLASSIFIER.operation_name`（读线程的热路径：前缀检查+查找操作名，同样只取操作名）
+- +args: 各CIN的`LINE_CLASSIFIER.classify`（另外提取参数，仅在需要时调用）
+
+分别统计「非操作行」「操作行」「混合」三种情形的吞吐量
+
+用法：python benchmark/bench_line_classifier.py [重复次数]
+"""
+
+from os.path import dirname, join
+from sys import path as PATH, argv as ARGV
+from timeit import repeat as timeit_repeat
+from statistics import median
+
+PATH.append(join(dirname(__file__), '..'))  # 使Python可以跨文件夹访问库
+
+from PyNEI.Program import OpenNARS, ONA, Python  # noqa: E402
+
+DATA_PATH: str = join(dirname(__file__), 'data')
+
+
+def legacy_opennars(line: str) -> str:
+    "原OpenNARS.catch_operation_name"
+    if line[0:3] == 'EXE':  # 若为操作前缀
+        subline = line.split(' ', 2)[2]  # 获取EXE后语句
+        return subline.split('(', 1)[0][1:]  # 避免'^^opera'
+
+
+def legacy_ona(line: str) -> str:
+    "原ONA.catch_operation_name"
+    if (line[0:1] == '^'):  # 避免在退出游戏时出错
+        return line.split(' ', 1)[0][1:]  # 避免'^^opera'
+
+
+def legacy_python(line: str) -> str:
+    "原Python.catch_operation_name"
+    if 'reject' in line.lower():
+        print(f'Reject: {line}')
+    if 'EXE' in line:  # 若为操作前缀
+        return line.split(' ', 2)[1][1:]
+
+
+def current_python(line: str, operation_name=Python.LINE_CLASSIFIER.operation_name) -> str | None:
+    "现Python.catch_operation_name（免去实例构造）：只在非操作行中查找「拒绝」信息"
+    if not (name := operation_name(line)) and 'reject' in line.lower():
+        print(f'Reject: {line}')
+    return name
+
+
+def load_lines(file_name: str) -> list[str]:
+    "读取输出样本（与read_line一致：去除首尾空白）"
+    with open(join(DATA_PATH, file_name), encoding='utf-8') as file:
+        return [line.strip() for line in file]
+
+
+def lines_per_second(parsers: list, lines: list[str], repeat: int, rounds: int = 15) -> list[float]:
+    """计时：各解析函数每秒可解析的行数
+    - 各函数逐轮交替计时（而非一个跑完再跑下一个），使机器负载的波动均匀地落在各函数上
+    - 取各轮的中位数，以减少噪声
+    """
+    if not lines:
+        return [0] * len(parsers)
+    times: list[list[float]] = [[] for _ in parsers]
+    for _ in range(rounds):
+        for parse, parse_times in zip(parsers, times):
+            parse_times.append(timeit_repeat(
+                lambda: [parse(line) for line in lines], number=repeat, repeat=1)[0])
+    return [len(lines) * repeat / median(parse_times) for parse_times in times]
+
+
+def bench(name: str, lines: list[str], legacy, operation_name, classify, is_operation, repeat: int) -> None:
+    "对同一批输出行，分别计时各实现，并核对提取的操作名一致"
+    assert [legacy(line) for line in lines] == [operation_name(line) for line in lines] == [
+        (op := classify(line)) and op[0] for line in lines
+    ], f'{name}: classifier disagrees with legacy parser'
+    groups: dict[str:list[str]] = {
+        'non-op': [line for line in lines if not is_operation(line)],
+        'op': [line for line in lines if is_operation(line)],
+        'mixed': lines,
+    }
+    for group, group_lines in groups.items():
+        t_legacy, t_classifier, t_args = lines_per_second(
+            [legacy, operation_name, classify], group_lines, repeat)
+        print(
+            f'{name:<9} {group:<7} n={len(group_lines):<3}',
+            f'legacy={t_legacy:>12,.0f} lines/s',
+            f'classifier={t_classifier:>12,.0f} lines/s',
+            f'ratio={t_classifier / t_legacy:.2f}x',
+            f'+args={t_args:>12,.0f} lines/s',
+            sep='  '
+        )
+
+
+def main(repeat: int = 20000) -> None:
+    bench('opennars', load_lines('opennars_output.txt'),
+          legacy_opennars, OpenNARS.LINE_CLASSIFIER.operation_name, OpenNARS.LINE_CLASSIFIER.classify,
+          OpenNARS.LINE_CLASSIFIER.is_candidate, repeat)
+    bench('ONA', load_lines('ona_output.txt'),
+          legacy_ona, ONA.LINE_CLASSIFIER.operation_name, ONA.LINE_CLASSIFIER.classify,
+          ONA.LINE_CLASSIFIER.is_candidate, repeat)
+    bench('python', load_lines('python_output.txt'),
+          legacy_python, current_python, Python.LINE_CLASSIFIER.classify,
+          Python.LINE_CLASSIFIER.is_candidate, repeat)
+
+
+if __name__ == '__main__':
+    main(int(ARGV[1]) if len(ARGV) > 1 else 20000)
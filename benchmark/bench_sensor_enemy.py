@@ -0,0 +1,117 @@
+"""微基准：敌机感知与碰撞检测 vs 敌机数量
+
+在不同的敌机数量下，比较
+- loop: 原先的逐精灵遍历（`sensor_enemy`作用于普通精灵组、`pygame.sprite.groupcollide`/`spritecollide`）
+- vectorized: 基于`EnemyGroup`结构数组的向量化比较（此处总是向量化，以找出`EnemyGroup.MIN_VECTORIZED_*`各项的合适取值）
+
+分别统计「对敌感知」「子弹碰撞」「战机碰撞」三项的单次耗时，并核对两种实现的结果一致
+
+用法：python benchmark/bench_sensor_enemy.py [敌机数量...]
+"""
+
+import os
+from os.path import dirname, join, abspath
+from sys import path as PATH, argv as ARGV
+from random import Random
+from timeit import repeat as timeit_repeat
+
+ROOT_PATH: str = abspath(join(dirname(__file__), '..'))
+PATH.append(ROOT_PATH)  # 使Python可以跨文件夹访问库
+PATH.append(join(ROOT_PATH, 'game'))
+os.chdir(ROOT_PATH)  # 素材路径相对于项目根目录
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+from game_sprites import SCREEN_RECT, Enemy, EnemyGroup, Hero, Bullet, np  # noqa: E402
+from plane_game import NARSPlanePlayer  # noqa: E402
+
+NUM_BULLETS: int = 5
+"场上的子弹数"
+
+
+def make_scene(num_enemies: int, seed: int = 0):
+    "随机布置敌机与子弹：返回（普通精灵组, 敌机组, 战机, 子弹组）"
+    rng: Random = Random(seed)
+    enemies: list[Enemy] = []
+    for _ in range(num_enemies):
+        enemy: Enemy = Enemy(rng=rng)
+        enemy.rect.y = rng.randint(-enemy.rect.height, SCREEN_RECT.height)
+        enemies.append(enemy)
+    hero: Hero = Hero()
+    bullets = pygame.sprite.Group()
+    for _ in range(NUM_BULLETS):
+        bullet: Bullet = Bullet()
+        bullet.rect.centerx = rng.randint(0, SCREEN_RECT.width)
+        bullet.rect.bottom = rng.randint(0, SCREEN_RECT.height)
+        bullets.add(bullet)
+    return pygame.sprite.Group(*enemies), EnemyGroup(*enemies), hero, bullets
+
+
+def seconds_per_call(func, number: int, rounds: int = 5) -> float:
+    "计时：单次调用的耗时（取多轮中最快的一轮，以减少噪声）"
+    return min(timeit_repeat(func, number=number, repeat=rounds)) / number
+
+
+def bench(num_enemies: int) -> None:
+    "对同一场景，分别计时两种实现，并核对结果一致"
+    plain_group, enemy_group, hero, bullets = make_scene(num_enemies)
+    enemy_group.set_min_vectorized(0)  # 总是向量化
+    circle = pygame.sprite.collide_circle_ratio(0.7)
+
+    def sense_loop():
+        return NARSPlanePlayer.sensor_enemy(hero=hero, enemy_group=plain_group)
+
+    def sense_vectorized():
+        return NARSPlanePlayer.sensor_enemy(hero=hero, enemy_group=enemy_group)
+
+    def bullets_loop():  # 不销毁精灵，以便重复计时
+        return pygame.sprite.groupcollide(bullets, plain_group, False, False)
+
+    def bullets_vectorized():
+        return {
+            bullet: collided
+            for bullet in bullets.sprites()
+            if (collided := enemy_group.colliding_rect(bullet.rect))
+        }
+
+    def hero_loop():
+        return pygame.sprite.spritecollide(hero, plain_group, False, collided=circle)
+
+    def hero_vectorized():
+        return enemy_group.colliding_circle(hero, 0.7)
+
+    cases: list[tuple[str, object, object]] = [
+        ('sense', sense_loop, sense_vectorized),
+        ('bullets', bullets_loop, bullets_vectorized),
+        ('hero', hero_loop, hero_vectorized),
+    ]
+    number: int = max(10, 20000 // (num_enemies + 1))
+    for name, loop, vectorized in cases:
+        expected, actual = loop(), vectorized()
+        if isinstance(expected, dict):  # 子弹→敌机列表：忽略敌机的顺序
+            expected = {k: set(v) for k, v in expected.items()}
+            actual = {k: set(v) for k, v in actual.items()}
+        else:
+            expected, actual = set(expected), set(actual)
+        assert expected == actual, f'{name}@{num_enemies}: vectorized result disagrees with loop'
+        t_loop: float = seconds_per_call(loop, number)
+        t_vectorized: float = seconds_per_call(vectorized, number)
+        print(
+            f'enemies={num_enemies:<6} {name:<8}',
+            f'loop={t_loop * 1e6:>10,.1f} us',
+            f'vectorized={t_vectorized * 1e6:>10,.1f} us',
+            f'ratio={t_loop / t_vectorized:.2f}x',
+            sep='  '
+        )
+
+
+def main(enemy_counts: list[int]) -> None:
+    if np is None:
+        print('NumPy is not installed: nothing to compare.')
+        return
+    for num_enemies in enemy_counts:
+        bench(num_enemies)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in ARGV[1:]] or [1, 10, 100, 1000, 5000])
@@ -24,9 +24,10 @@ if __name__ == '__main__':
 
     from sys import path as PATH, argv as ARGV
     from os import getcwd  # 获取当前路径
+    from os.path import join as join_path  # 拼接路径
 
     IS_ROOT_GAME: str = 'game' in getcwd()  # 由于VSCode调试路径为项目根目录，故需要识别当前路径
-    CIN_ROOT_PATH: str = '..\PyNEI' if IS_ROOT_GAME else '.\PyNEI'  # 调用的CIN路径还要动态决定……
+    CIN_ROOT_PATH: str = join_path('..' if IS_ROOT_GAME else '.', 'PyNEI')  # 调用的CIN路径还要动态决定……
 
     while 1:
         main()
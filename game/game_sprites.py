@@ -1,7 +1,15 @@
-from os import getcwd
+from os import getcwd, listdir
+from os.path import join, normpath, splitext
+from time import perf_counter
 import pygame
 import random
 
+# 🆕敌机位置的向量化（可选）：没有NumPy时退回逐个遍历
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # the size of game window, Rect(left, top, width, height). left = x, top = y
 SCREEN_RECT = pygame.Rect(0, 0, 480, 700)
 
@@ -11,10 +19,75 @@ ASSETS_PATH = "%s/assets/NARS-FighterPlane" % (
     "." if "game" in getcwd() else "./game")
 
 
+class ImageCache:
+    """🆕进程内共享的图像缓存：每张图片只从磁盘解码一次，所有精灵共用同一个Surface
+    - 已有显示窗口时，加载后即convert_alpha()，转为与屏幕一致的像素格式，绘制更快
+    - 可在启动时预加载整个目录，并报告加载耗时与内存占用
+    ⚠️共用的Surface不可被单个精灵修改（需要时请先copy）
+    """
+
+    IMAGE_EXTENSIONS: tuple[str, ...] = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+    def __init__(self):
+        self._images: dict[str:pygame.Surface] = {}
+        self.load_time: float = 0
+        "解码与转换所花的总时间（秒）"
+        self.num_hits: int = 0
+        "命中缓存（免于解码）的次数"
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def load(self, image_name: str) -> pygame.Surface:
+        "获取图片：首次从磁盘加载（并尽可能convert_alpha），之后直接返回缓存"
+        key: str = normpath(image_name)
+        if (image := self._images.get(key)) is not None:
+            self.num_hits += 1
+            return image
+        start: float = perf_counter()
+        image = pygame.image.load(key)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            image = image.convert_alpha()  # 需要先有显示窗口（无界面模式下保持原格式）
+        self.load_time += perf_counter() - start
+        self._images[key] = image
+        return image
+
+    def preload(self, directory: str) -> int:
+        "预加载目录下的所有图片（返回：新加载的图片数）"
+        num_before: int = len(self)
+        for file_name in sorted(listdir(directory)):
+            if splitext(file_name)[1].lower() in ImageCache.IMAGE_EXTENSIONS:
+                self.load(join(directory, file_name))
+        return len(self) - num_before
+
+    @property
+    def memory_bytes(self) -> int:
+        "缓存的像素数据所占内存（字节）"
+        return sum(
+            image.get_pitch() * image.get_height()
+            for image in self._images.values()
+        )
+
+    def report(self) -> str:
+        "一行文字报告：图片数、加载耗时、内存占用、命中次数"
+        return (
+            f'{len(self)} images loaded in {self.load_time * 1000:.1f}ms, '
+            f'{self.memory_bytes / 1024:.1f}KiB, {self.num_hits} cache hits')
+
+    def clear(self) -> None:
+        "清空缓存（如：创建显示窗口后，需要重新convert_alpha）"
+        self._images.clear()
+        self.load_time = 0
+        self.num_hits = 0
+
+
+IMAGE_CACHE = ImageCache()  # 进程内唯一的图像缓存
+
+
 class GameSprite(pygame.sprite.Sprite):
     def __init__(self, image_name, speed=1):
         super().__init__()
-        self.image = pygame.image.load(image_name)
+        self.image = IMAGE_CACHE.load(image_name)  # shared surface: do not draw on it
         self.rect = self.image.get_rect()
         self.speed = speed
 
@@ -35,23 +108,148 @@ class Background(GameSprite):
 
 
 class Enemy(GameSprite):
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
         super().__init__(f"{ASSETS_PATH}/images/enemy1.png")
-        self.speed = random.randint(2, 3)
+        rng = rng or random  # a seeded random.Random makes enemy waves reproducible
+        self.speed = rng.randint(2, 3)
         self.rect.bottom = 0
         max_x = SCREEN_RECT.width - self.rect.width
-        self.rect.x = random.randint(0, max_x)  # the initial x position
+        self.rect.x = rng.randint(0, max_x)  # the initial x position
+
+        self.positions = None  # set by EnemyGroup: the structure-of-arrays holding this enemy
+        self.slot = -1  # index of this enemy in the arrays above
 
     def update(self):
         super().update()
         if self.rect.y >= SCREEN_RECT.height:  # check the bottom boundary
             self.kill()
+        elif self.positions is not None:
+            self.positions.sync(self)  # keep the arrays in step with the rect
 
     def __del__(self):
         # print("enemy died... %s" % self.rect)
         pass
 
 
+class EnemyGroup(pygame.sprite.Group):
+    """🆕敌机组：在精灵组之外，以「结构数组」（NumPy）保存所有敌机的矩形
+    - 敌机加入/离开时分配/回收槽位（离开时把最后一架敌机挪进空位，保证前count项都是存活的敌机）
+    - Enemy.update移动后同步自身的位置
+    - 感知与碰撞检测可对全部敌机做向量化比较，不必逐个遍历精灵
+    - 敌机较少时NumPy调用的固定开销反而更大（见benchmark/bench_sensor_enemy.py）：此时仍逐个遍历
+        - 各项比较的「收支平衡点」不同，故分别设阈值
+        - 游戏中每秒生成一架敌机、每架约存活5秒，通常只有几架：总是逐个遍历，数组只随之记录位置
+    - 没有NumPy时退化为普通的精灵组（相应方法逐个遍历）
+    """
+
+    MIN_VECTORIZED_SENSE: int = 100
+    "敌机数达到此值，对敌感知才使用向量化比较（基准测试中约100架时持平）"
+    MIN_VECTORIZED_RECT: int = 500
+    "敌机数达到此值，矩形碰撞（子弹）才使用向量化比较（每颗子弹都要调用一次，约200~500架时才持平）"
+    MIN_VECTORIZED_CIRCLE: int = 50
+    "敌机数达到此值，圆形碰撞（战机）才使用向量化比较（约50架时持平）"
+
+    def __init__(self, *sprites, capacity: int = 64):
+        self.count: int = 0
+        "存活的敌机数（数组的前count项有效）"
+        self.min_vectorized_sense: int = EnemyGroup.MIN_VECTORIZED_SENSE
+        "对敌感知使用向量化比较的最少敌机数（0⇔总是使用）"
+        self.min_vectorized_rect: int = EnemyGroup.MIN_VECTORIZED_RECT
+        "矩形碰撞使用向量化比较的最少敌机数（0⇔总是使用）"
+        self.min_vectorized_circle: int = EnemyGroup.MIN_VECTORIZED_CIRCLE
+        "圆形碰撞使用向量化比较的最少敌机数（0⇔总是使用）"
+        self._sprites_by_slot: list[Enemy] = []
+        if np is not None:
+            self.left = np.zeros(capacity, dtype=np.int32)
+            self.right = np.zeros(capacity, dtype=np.int32)
+            self.top = np.zeros(capacity, dtype=np.int32)
+            self.bottom = np.zeros(capacity, dtype=np.int32)
+        super().__init__(*sprites)
+
+    def _vectorized(self, min_count: int) -> bool:
+        "（内部）是否使用向量化比较（有NumPy且敌机足够多）"
+        return np is not None and self.count >= min_count
+
+    @property
+    def vectorized_sense(self) -> bool:
+        "对敌感知当前是否使用向量化比较"
+        return self._vectorized(self.min_vectorized_sense)
+
+    def set_min_vectorized(self, min_count: int) -> None:
+        "把各项比较的阈值统一设为min_count（0⇔总是向量化）"
+        self.min_vectorized_sense = self.min_vectorized_rect = self.min_vectorized_circle = min_count
+
+    def _grow(self) -> None:
+        "容量翻倍"
+        for name in ('left', 'right', 'top', 'bottom'):
+            old = getattr(self, name)
+            new = np.zeros(len(old) * 2, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def sync(self, sprite: Enemy) -> None:
+        "把敌机的当前矩形写入数组"
+        slot, rect = sprite.slot, sprite.rect
+        self.left[slot] = rect.left
+        self.right[slot] = rect.right
+        self.top[slot] = rect.top
+        self.bottom[slot] = rect.bottom
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if np is None:
+            return
+        if self.count == len(self.left):
+            self._grow()
+        sprite.positions, sprite.slot = self, self.count
+        self._sprites_by_slot.append(sprite)
+        self.count += 1
+        self.sync(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if np is None or sprite.positions is not self:
+            return
+        # 把最后一架敌机挪进空出的槽位
+        slot, last = sprite.slot, self.count - 1
+        moved: Enemy = self._sprites_by_slot.pop()
+        if moved is not sprite:
+            self._sprites_by_slot[slot] = moved
+            moved.slot = slot
+            self.sync(moved)
+        self.count = last
+        sprite.positions, sprite.slot = None, -1
+
+    def colliding_rect(self, rect: pygame.Rect) -> list[Enemy]:
+        "与矩形重叠的敌机（同pygame.sprite.collide_rect）"
+        if not self._vectorized(self.min_vectorized_rect):
+            return [enemy for enemy in self.sprites() if rect.colliderect(enemy.rect)]
+        n = self.count
+        hit = (
+            (self.left[:n] < rect.right) & (rect.left < self.right[:n])
+            & (self.top[:n] < rect.bottom) & (rect.top < self.bottom[:n])
+        )
+        return [self._sprites_by_slot[i] for i in np.flatnonzero(hit)]
+
+    def colliding_circle(self, sprite: pygame.sprite.Sprite, ratio: float) -> list[Enemy]:
+        "与精灵按比例圆形相交的敌机（同pygame.sprite.collide_circle_ratio(ratio)）"
+        if not self._vectorized(self.min_vectorized_circle):
+            collided = pygame.sprite.collide_circle_ratio(ratio)
+            return [enemy for enemy in self.sprites() if collided(sprite, enemy)]
+        n = self.count
+        left, top = self.left[:n], self.top[:n]
+        width, height = self.right[:n] - left, self.bottom[:n] - top
+        rect = sprite.rect
+        dx = left + width // 2 - rect.centerx
+        dy = top + height // 2 - rect.centery
+        radius = (
+            0.5 * (rect.width ** 2 + rect.height ** 2) ** 0.5
+            + 0.5 * np.sqrt(width.astype(np.float64) ** 2 + height ** 2)
+        ) * ratio
+        hit = dx.astype(np.float64) ** 2 + dy.astype(np.float64) ** 2 <= radius ** 2
+        return [self._sprites_by_slot[i] for i in np.flatnonzero(hit)]
+
+
 class Hero(GameSprite):
     def __init__(self):
         super().__init__(f"{ASSETS_PATH}/images/me1.png", 0)
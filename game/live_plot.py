@@ -0,0 +1,153 @@
+"""常驻的实时数据图表
+
+原先每按一次P键，就启动一个新进程、把整个数据集复制过去、再从头启动一次matplotlib
+此处改为：
+- 游戏进程与绘图进程共享一块内存（multiprocessing.shared_memory），其中是一个定长的环形缓冲区
+- 游戏每记录一行数据，只需把这一行复制进缓冲区（无序列化、无进程间通信）
+- 绘图进程常驻，定时读取新增的行，增量更新曲线
+
+类の概览
+- SharedRingBuffer: 共享内存上的单写多读环形缓冲区（每行若干float64）
+- LivePlot: 游戏侧的句柄：创建缓冲区、启动绘图进程、写入数据
+"""
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedRingBuffer:
+    """共享内存上的单写多读环形缓冲区
+    - 布局：8字节的「已写入行数」（int64）+ capacity×num_columns个float64
+    - 写入方先写行、再增加计数；读取方复制完后再核对计数，丢弃复制期间可能被覆盖的行
+    """
+
+    HEADER_SIZE: int = 8
+    "头部大小（字节）：已写入的行数"
+
+    def __init__(self, num_columns: int, capacity: int = 4096, name: str = None) -> None:
+        "name为None时创建新的共享内存，否则连接到已有的共享内存"
+        self.num_columns: int = num_columns
+        "每行的列数"
+        self.capacity: int = capacity
+        "可保留的行数（更早的行会被覆盖）"
+        self.is_owner: bool = name is None
+        "是否为创建者（负责释放共享内存）"
+        self.shm: shared_memory.SharedMemory = (
+            shared_memory.SharedMemory(
+                create=True, size=SharedRingBuffer.HEADER_SIZE + capacity * num_columns * 8)
+            if name is None
+            else shared_memory.SharedMemory(name=name)
+        )
+        self._count: np.ndarray = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self._rows: np.ndarray = np.ndarray(
+            (capacity, num_columns), dtype=np.float64,
+            buffer=self.shm.buf, offset=SharedRingBuffer.HEADER_SIZE)
+        if self.is_owner:
+            self._count[0] = 0
+
+    @property
+    def name(self) -> str:
+        "共享内存名（供其它进程连接）"
+        return self.shm.name
+
+    @property
+    def count(self) -> int:
+        "已写入的总行数"
+        return int(self._count[0])
+
+    def push(self, values) -> None:
+        "（写入方）写入一行"
+        count: int = int(self._count[0])
+        self._rows[count % self.capacity] = values
+        self._count[0] = count + 1  # 写完整行后才使其可见
+
+    def read_since(self, start: int) -> tuple[int, np.ndarray]:
+        "（读取方）读取第start行之后新写入的行：返回（实际起始行号, 行）——太旧的行已被覆盖，会被跳过"
+        end: int = self.count
+        start = max(start, end - self.capacity)
+        indices: np.ndarray = np.arange(start, end) % self.capacity
+        rows: np.ndarray = self._rows[indices]  # 花式索引：复制
+        # 复制期间写入方可能已覆盖（或正在覆盖）最早的几行
+        if (lost := self.count + 1 - self.capacity - start) > 0:
+            rows, start = rows[lost:], start + lost
+        return start, rows
+
+    def close(self) -> None:
+        "断开共享内存（创建者还会释放它）"
+        del self._count, self._rows  # 先释放对缓冲区的引用
+        self.shm.close()
+        if self.is_owner:
+            self.shm.unlink()
+
+
+def plot_server(name: str, columns: tuple[str, ...], capacity: int, interval_s: float = 0.5) -> None:
+    """（绘图进程）连接环形缓冲区，定时增量更新图表，直到窗口被关闭
+    第一列作为横轴（时间），其余各列各占一幅子图
+    """
+    import matplotlib.pyplot as plt
+    from math import ceil
+
+    buffer: SharedRingBuffer = SharedRingBuffer(len(columns), capacity, name=name)
+    num_plots: int = len(columns) - 1
+    shape_rows: int = max(1, int(num_plots**0.5))
+    fig, axes = plt.subplots(shape_rows, ceil(num_plots / shape_rows), squeeze=False)
+    fig.suptitle('Game Datas (live)')
+    lines: list = []
+    for ax, column in zip(axes.flatten(), columns[1:]):
+        lines.append(ax.plot([], [])[0])
+        ax.set_title(column)
+        ax.set_xlabel(columns[0])
+    plt.tight_layout()
+    # 本地保存已读到的所有数据（超出环形缓冲区的历史也保留）
+    history: np.ndarray = np.empty((0, len(columns)))
+    next_row: int = 0
+    plt.show(block=False)
+    while plt.fignum_exists(fig.number):
+        start, rows = buffer.read_since(next_row)
+        if len(rows):
+            next_row = start + len(rows)
+            history = np.concatenate((history, rows))
+            for i, (ax, line) in enumerate(zip(axes.flatten(), lines), 1):
+                line.set_data(history[:, 0], history[:, i])
+                ax.relim()
+                ax.autoscale_view()
+            fig.canvas.draw_idle()
+        plt.pause(interval_s)
+    buffer.close()
+
+
+class LivePlot:
+    """游戏侧的实时图表句柄
+    - 创建共享的环形缓冲区，启动常驻的绘图进程
+    - push只是把一行写进共享内存
+    """
+
+    def __init__(self, columns: tuple[str, ...], capacity: int = 4096, interval_s: float = 0.5) -> None:
+        self.columns: tuple[str, ...] = tuple(columns)
+        "列名（第一列为横轴）"
+        self.buffer: SharedRingBuffer = SharedRingBuffer(len(self.columns), capacity)
+        "共享的环形缓冲区"
+        self.process: mp.Process = mp.Process(
+            target=plot_server,
+            args=(self.buffer.name, self.columns, capacity, interval_s),
+            daemon=True,
+        )
+        self.process.start()
+
+    @property
+    def is_alive(self) -> bool:
+        "绘图进程是否仍在运行（窗口被关闭后即退出）"
+        return self.process.is_alive()
+
+    def push(self, row: dict) -> None:
+        "写入一行（须包含所有列）"
+        self.buffer.push([row[name] for name in self.columns])
+
+    def close(self) -> None:
+        "关闭图表进程并释放共享内存"
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.buffer.close()
@@ -7,12 +7,16 @@
 #!/usr/bin/python3
 # *-* encoding:utf8 *_*
 
-from os import getcwd  # 获取当前路径
+from os import getcwd, environ  # 获取当前路径；设置SDL驱动（无界面模式）
+from time import perf_counter, strftime  # 无界面模式：统计模拟速度；导出文件名
+from os.path import join as join_path  # 拼接路径
+from random import Random  # 可复现的随机数（敌机、babble）
 from game_sprites import *
+from scheduler import TickScheduler
 from sys import path as PATH, argv as ARGV
 
 IS_ROOT_GAME: str = 'game' in getcwd()  # 由于VSCode调试路径为项目根目录，故需要识别当前路径
-CIN_ROOT_PATH: str = '..\PyNEI' if IS_ROOT_GAME else '.\PyNEI'  # 调用的CIN路径还要动态决定……
+CIN_ROOT_PATH: str = join_path('..' if IS_ROOT_GAME else '.', 'PyNEI')  # 调用的CIN路径还要动态决定……
 PATH.append('../' if IS_ROOT_GAME else './')  # 若为直接启动（含game目录），则变为上级路径
 # 📌一个「.」或「./」代表项目根目录：用于VSCode调试（默认路径变成项目根目录）
 # 📌两个「..」或「./../」代表上层目录：添加上级目录到「环境变量」中，使Python可以跨文件夹访问库
@@ -20,21 +24,18 @@ PATH.append('../' if IS_ROOT_GAME else './')  # 若为直接启动（含game目
 # ! ⚠️AutoPEP8总是把这import挪到「路径导入」代码之前，所以需要变成try语句
 try:
     from PyNEI.Agent import *  # 注意：相对导入只能在一个包的内部使用，不能跨越上级目录使用
+    from PyNEI.Tracing import TraceLog
 except BaseException as e:
     print(f'模块导入失败：{e}')
 
-# 注册游戏事件
-CREATE_ENEMY_EVENT = pygame.USEREVENT
-UPDATE_NARS_EVENT = pygame.USEREVENT + 1
-OPENNARS_BABBLE_EVENT = pygame.USEREVENT + 2
-INGAME_CLOCK_EVENT = pygame.USEREVENT + 3  # 游戏内时间计数（速度可调之后）
-
 # 尝试进行数据分析
 ENABLE_GAME_DATA_RECORD: bool = False
 try:
     import matplotlib.pyplot as plt
     import pandas as pd
     import multiprocessing as mp
+    from recorder import MetricsRecorder, MetricsExporter
+    from live_plot import LivePlot
     ENABLE_GAME_DATA_RECORD = True
 except:
     pass
@@ -107,12 +108,13 @@ class NARSPlanePlayer(NARSAgent):
         ADJECTIVE_MOVING_RIGHT)
     SNESE_STILL: NARSPerception = NARSPerception.new_self(ADJECTIVE_STILL)
 
-    def __init__(self, nars_type: NARSType = None):
+    def __init__(self, nars_type: NARSType = None, seed: int = None):
         super().__init__(
             rootPath=CIN_ROOT_PATH,
             nars_type=nars_type,
             mainGoal=NARSPlanePlayer.GOAL_GOOD,
-            mainGoal_negative=NARSPlanePlayer.GOAL_BAD
+            mainGoal_negative=NARSPlanePlayer.GOAL_BAD,
+            seed=seed,
         )  # 目标：「good」
         # 添加感知器
         self.add_sensor(NARSSensor(NARSPlanePlayer.sensor_edge))  # 边界感知
@@ -140,7 +142,7 @@ class NARSPlanePlayer(NARSAgent):
 
         # 代码功能分离：把剩下的代码看做是某种「冲突」
         # NARS gives <(*,{SELF}) --> ^left>. :|:
-        if operation == NARSPlanePlayer.OPERATION_LEFT:
+        if operation == NARSPlanePlayer.OPERATION_LEFT:  # 操作通常已驻留：__eq__先比较身份
             self[NARSPlanePlayer.OPERATION_RIGHT] = False
             # print('move left')
         # NARS gives <(*,{SELF}) --> ^right>. :|:
@@ -208,6 +210,21 @@ class NARSPlanePlayer(NARSAgent):
 
         # 敌机（总）方位
 
+        # 🆕向量化：敌机组以结构数组保存了所有敌机的位置，一次比较即可得到全部标志
+        if getattr(enemy_group, 'vectorized_sense', False):
+            n: int = enemy_group.count
+            centerx: int = hero.rect.centerx
+            left, right = enemy_group.left[:n], enemy_group.right[:n]
+            if (right < centerx).any():
+                result.append(NARSPlanePlayer.SNESE_ENEMY_LEFT)
+            if (centerx < left).any():
+                result.append(NARSPlanePlayer.SNESE_ENEMY_RIGHT)
+            if ((left <= centerx) & (centerx <= right)).any():
+                result.append(NARSPlanePlayer.SNESE_ENEMY_AHEAD)
+            if (enemy_group.bottom[:n] < hero.rect.top).any():
+                result.append(NARSPlanePlayer.SNESE_ENEMY_NEARBY)
+            return result
+
         # 💭似乎「对每一个敌机进行一次感知」的「基于单个个体的感知」比原来「基于是否有敌机的感知」更能让NARS获得「敌机（大概）在何处」的信息
         enemy_left = False
         enemy_right = False
@@ -254,6 +271,7 @@ class NARSPlanePlayer(NARSAgent):
         if self[NARSPlanePlayer.OPERATION_FIRE]:
             hero.fire()
             self[NARSPlanePlayer.OPERATION_FIRE] = False
+        self.mark_operations_consumed()
 
     def praise(self):
         "对接游戏：奖励自己"
@@ -268,9 +286,33 @@ class NARSPlanePlayer(NARSAgent):
 class PlaneGame:
     "NARS-FighterPlane 游戏本体"
 
+    BASE_FPS: int = 60
+    "游戏速度为1时的帧率：每帧即一个tick，亦即「1/60游戏内秒」"
+
+    # 时序事件的间隔（tick） #
+    INGAME_CLOCK_EVENT_TICKS: int = 60  # 「游戏内读秒」时钟
+    CREATE_ENEMY_EVENT_TICKS: int = 60
+    UPDATE_NARS_EVENT_TICKS: int = 12
+    OPENNARS_BABBLE_EVENT_TICKS: int = 15
+
+    DATA_COLUMNS: tuple[str, ...] = (
+        'ingame_time',
+        'performance',
+        'sense rate',
+        'activation rate',
+        'cycles per tick',
+    )
+    "记录的游戏数据（列名）"
+
+    DATA_EXPORT_PATH: str = 'game_datas-%Y%m%d-%H%M%S.csv'
+    "游戏数据的默认导出路径（strftime格式：每次运行一个新文件；扩展名决定格式，见MetricsExporter）"
+
+    HEADLESS_MAX_PENDING_INPUTS: int = 64
+    "无界面模式：CIN积压的命令超过此数时，等待其消化后再更新NARS"
+
     @property
     def game_speed(self) -> float:
-        "独立出「游戏速度」变量，使其可以和fps一并绑定"
+        "独立出「游戏速度」变量，使其可以和fps一并绑定（时序事件按tick派发，只有渲染的快慢随之改变）"
         return self._game_speed
 
     @game_speed.setter
@@ -278,23 +320,37 @@ class PlaneGame:
         if value <= 0:  # 防止速度下降到非正数
             return
         self._game_speed: float = value
-        self.fps: int = int(60 * self._game_speed)
+        self.fps: int = int(PlaneGame.BASE_FPS * self._game_speed)
         print(f'game speed = {self.game_speed:.2f}')
-        self.__set_timer()  # 覆盖之前的定时器
 
-    def __init__(self, nars_type: NARSType, game_speed: float = 1.0, enable_punish: bool = False):
+    def __init__(self, nars_type: NARSType, game_speed: float = 1.0, enable_punish: bool = False, headless: bool = False, seed: int = None, data_record_interval_s: float = 1.0):
         "初始化游戏本体"
         print("Game initialization...")
+        self.headless: bool = headless
+        "无界面模式：不创建窗口、不渲染文字、不限帧率，按固定步长尽快模拟"
+        if headless:  # 无需窗口：使用SDL的空驱动
+            environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            environ.setdefault('SDL_AUDIODRIVER', 'dummy')
         pygame.init()
         self.nars_type = nars_type
         # create a display surface, SCREEN_RECT.size=(480,700)
-        self.screen = pygame.display.set_mode(SCREEN_RECT.size)
+        self.screen = None if headless else pygame.display.set_mode(SCREEN_RECT.size)
         self.clock = pygame.time.Clock()  # create a game clock
         # display text like scores, times, etc.
-        self.font = pygame.font.SysFont('consolas', 18, True)
+        self.font = None if headless else pygame.font.SysFont('consolas', 18, True)
+        # 🆕预加载所有图片（窗口已创建，可以convert_alpha）：之后的精灵直接共用缓存
+        IMAGE_CACHE.preload(f'{ASSETS_PATH}/images')
+        print(f'Images: {IMAGE_CACHE.report()}')
+        self.seed: int = seed
+        "随机种子（None⇔不固定）：相同的种子下，敌机的生成与NARS的babble都可复现"
+        self.random: Random = Random(seed)
+        "敌机生成所用的随机数生成器（与babble的相互独立，互不扰乱）"
+        self.data_record_interval_s: float = data_record_interval_s
+        "每隔多少游戏内秒记录一次游戏数据（原先是每帧一次）"
         self.__create_sprites()  # sprites initialization
         self.__create_NARS(self.nars_type)
-        # 原「__set_timer」被移动到setter内，以便统一修改
+        self.scheduler: TickScheduler = self.__create_scheduler()
+        "时序事件调度器：每帧步进一个tick"
         # don't set too large, self.game_speed = 1.0 is the default speed.
         self.game_speed = game_speed
         self.auto_speed_delta: float = 0  # 🆕自动加速的加速步进大小
@@ -305,27 +361,78 @@ class PlaneGame:
         self.enable_punish: bool = enable_punish
 
         self.num_nars_operate: int = 0
+        self.simulation_speed: float = 0
+        "（无界面模式）模拟速度：每现实秒模拟的游戏内秒数"
 
-        # speed melt down mechanism to prevent game stuck
-        self.last_display_update_time: int = 0
-        self.speed_melt_down: float = 0  # 游戏卡死时暂存的当前速度
-        self.num_melt_down_before_restore: int = 0  # 游戏速度在恢复前熔断的次数
-
-        # 把数据存在游戏里
+        # 把数据存在游戏里：列式记录，需要时再转换为DataFrame
         if ENABLE_GAME_DATA_RECORD:
-            self.gameDatas: pd.DataFrame = pd.DataFrame(
-                [],
-                columns=[
-                    'ingame_time',
-                    'performance',
-                    'sense rate',
-                    'activation rate',
-                ]
-            )
+            self.gameDatas: MetricsRecorder = MetricsRecorder(
+                columns=PlaneGame.DATA_COLUMNS)
+        self.data_exporter: MetricsExporter = None
+        "流式导出器：开始导出后，每条新记录都会被后台线程追加到文件中"
+        self.live_plot: LivePlot = None
+        "常驻的实时图表：开启后，每条新记录都会被写入共享内存"
+        self.trace_log: TraceLog = None
+        "端到端延迟追踪记录（None⇔不追踪）"
+        self.trace_path: str = None
+        "游戏结束时导出追踪记录的路径"
+
+    def enable_tracing(self, path: str = None) -> TraceLog:
+        "开启端到端延迟追踪（感知入队→……→操作被执行）：游戏结束时打印报告，并导出到path（若有）"
+        if self.trace_log is None:
+            self.trace_log = TraceLog()
+            self.nars.brain.enable_tracing(self.trace_log)
+        self.trace_path = path
+        return self.trace_log
+
+    def stop_tracing(self) -> None:
+        "结束追踪：打印各阶段的延迟报告，并导出追踪记录"
+        if self.trace_log is None:
+            return
+        print(f'Latency traces:\n{self.trace_log.report()}')
+        if self.trace_path:
+            num_traces: int = self.trace_log.export(self.trace_path)
+            print(f'{num_traces} traces are exported to {self.trace_path}.')
+        self.trace_log = None
+
+    def show_live_plot(self) -> None:
+        "打开实时图表（已记录的数据会先被补上）；已打开则不重复启动"
+        if self.live_plot is not None:
+            if self.live_plot.is_alive:
+                print('The live plot is already running.')
+                return
+            self.live_plot.close()  # 窗口已被关闭：释放共享内存后重开
+        self.live_plot = LivePlot(PlaneGame.DATA_COLUMNS)
+        for i in range(max(0, len(self.gameDatas) - self.live_plot.buffer.capacity), len(self.gameDatas)):
+            self.live_plot.buffer.push([self.gameDatas[name][i] for name in PlaneGame.DATA_COLUMNS])
+
+    def close_live_plot(self) -> None:
+        "关闭实时图表"
+        if self.live_plot is not None:
+            self.live_plot.close()
+            self.live_plot = None
+
+    def export_datas(self, path: str = None) -> None:
+        "开始流式导出游戏数据（已记录的数据会先被补上）"
+        if self.data_exporter is not None:
+            print(f'Game datas are already being exported to {self.data_exporter.path} '
+                  f'({self.data_exporter.num_rows_written} rows written).')
+            return
+        path = path or strftime(PlaneGame.DATA_EXPORT_PATH)
+        self.data_exporter = MetricsExporter(path, PlaneGame.DATA_COLUMNS)
+        self.data_exporter.extend(self.gameDatas)
+        print(f'Game datas are being exported to {path}.')
+
+    def stop_export(self) -> None:
+        "停止流式导出：写入剩余的数据并关闭文件"
+        if self.data_exporter is not None:
+            self.data_exporter.close()
+            print(f'{self.data_exporter.num_rows_written} rows of game datas are exported to {self.data_exporter.path}.')
+            self.data_exporter = None
 
     def collectDatas(self) -> None:
         "（同步）获取游戏运行的各项数据"
-        self.gameDatas.loc[len(self.gameDatas)] = {
+        row: dict = {
             'ingame_time': self.speeding_delta_time_s,  # 游戏内时间
             'performance': self.performance,  # 表现
             'sense rate': (  # 每（游戏内）秒送入NARS程序的感知语句数
@@ -338,37 +445,42 @@ class PlaneGame:
                 if self.speeding_delta_time_s  # 避免除以零
                 else 0
             ),
+            'cycles per tick': self.nars.cycles_per_tick,  # 每tick步进的推理周期数（可自适应）
         }
-
-    def __set_timer(self):
-        "设置定时器（用于后面的时序事件）"
-        INGAME_CLOCK_EVENT_TIMER = 1000  # 设置「游戏内读秒」时钟
-        CREATE_ENEMY_EVENT_TIMER = 1000
-        UPDATE_NARS_EVENT_TIMER = 200
-        OPENNARS_BABBLE_EVENT_TIMER = 250
-        timer_ingame_clock = int(INGAME_CLOCK_EVENT_TIMER / self.game_speed)
-        timer_enemy = int(CREATE_ENEMY_EVENT_TIMER / self.game_speed)
-        timer_update_NARS = int(UPDATE_NARS_EVENT_TIMER / self.game_speed)
-        timer_babble = int(OPENNARS_BABBLE_EVENT_TIMER / self.game_speed)
-        pygame.time.set_timer(INGAME_CLOCK_EVENT, timer_ingame_clock)
+        self.gameDatas.append(row)
+        self.data_exporter is not None and self.data_exporter.append(row)  # 只入队，不做IO
+        self.live_plot is not None and self.live_plot.push(row)  # 只复制进共享内存
+
+    def __create_scheduler(self) -> TickScheduler:
+        "注册时序事件（按tick派发，同一tick上按注册顺序触发）"
+        scheduler: TickScheduler = TickScheduler(ticks_per_second=PlaneGame.BASE_FPS)
+        scheduler.every('ingame_clock', PlaneGame.INGAME_CLOCK_EVENT_TICKS,
+                        self.__tick_ingame_clock)
         # the frequency of creating an enemy
-        pygame.time.set_timer(CREATE_ENEMY_EVENT, timer_enemy)
+        scheduler.every('create_enemy', PlaneGame.CREATE_ENEMY_EVENT_TICKS,
+                        self.__create_enemy)
         # the activity of NARS
-        pygame.time.set_timer(UPDATE_NARS_EVENT, timer_update_NARS)
-        pygame.time.set_timer(OPENNARS_BABBLE_EVENT, timer_babble)
+        scheduler.every('update_NARS', PlaneGame.UPDATE_NARS_EVENT_TICKS,
+                        self.__update_NARS)
+        scheduler.every('babble', PlaneGame.OPENNARS_BABBLE_EVENT_TICKS,
+                        self.__babble)
+        # 记录游戏数据（按游戏内时间采样）
+        scheduler.every_seconds('record_datas', self.data_record_interval_s,
+                                self.__record_datas)
+        return scheduler
 
     def __create_sprites(self):
         "创造图形界面"
         bg1 = Background()
         bg2 = Background(True)
         self.background_group = pygame.sprite.Group(bg1, bg2)
-        self.enemy_group = pygame.sprite.Group()
+        self.enemy_group = EnemyGroup()  # 🆕同时以结构数组保存敌机位置
         self.hero = Hero()
         self.hero_group = pygame.sprite.Group(self.hero)
 
     def __create_NARS(self, type: NARSType):
         "创造NARS（接口）"
-        self.nars: NARSPlanePlayer = NARSPlanePlayer(type)
+        self.nars: NARSPlanePlayer = NARSPlanePlayer(type, seed=self.seed)
         # 既然在这里就凭借「NARS的程序实现」类型区分「是否babble」，那也不妨把babble看做一个「通用行为」
         self.remaining_babble_times: int = (
             200 if self.nars.need_babble
@@ -381,83 +493,78 @@ class PlaneGame:
         self.start_time = pygame.time.get_ticks()
         while True:
             self.__event_handler()
-            self.__check_collide()
+            self.__step()
             self.__update_sprites()
             pygame.display.update()
             self.clock.tick(self.fps)
 
+    def start_headless(self, duration_s: float = None, report_interval_s: float = 10):
+        """无界面地运行游戏：固定步长，尽快模拟
+        - 每步即一个tick（1/BASE_FPS游戏内秒），与窗口模式的逻辑完全相同，只是不绘制
+        - 不渲染文字、不限帧率；仅在CIN积压过多时等待其消化
+        - 定期报告「每现实秒模拟的游戏内秒数」
+
+        duration_s: 模拟的游戏内秒数（None⇔直到Ctrl+C）
+        返回：整体的模拟速度（游戏内秒/现实秒）
+        """
+        print("Game start (headless)...")
+        self.start_time = pygame.time.get_ticks()
+        scheduler: TickScheduler = self.scheduler
+        start_tick: int = scheduler.tick
+        max_tick: int = (
+            None if duration_s is None
+            else start_tick + int(duration_s * scheduler.ticks_per_second))
+        wall_start: float = perf_counter()
+        last_report_time: float = wall_start
+        last_report_tick: int = start_tick
+        try:
+            while max_tick is None or scheduler.tick < max_tick:
+                self.__step()
+                # 定期报告模拟速度
+                if (now := perf_counter()) - last_report_time >= report_interval_s:
+                    print(
+                        f'simulated {scheduler.time_s:.1f}s in {now - wall_start:.1f}s: '
+                        f'{(scheduler.tick - last_report_tick) / scheduler.ticks_per_second / (now - last_report_time):.2f} sim-s/s')
+                    last_report_time, last_report_tick = now, scheduler.tick
+        except KeyboardInterrupt:
+            pass
+        wall_time: float = perf_counter() - wall_start
+        simulated_time: float = (scheduler.tick - start_tick) / scheduler.ticks_per_second
+        self.simulation_speed = (
+            simulated_time / wall_time
+            if wall_time > 0 else 0)
+        print(
+            f'Headless game over: simulated {simulated_time:.1f}s in {wall_time:.1f}s '
+            f'({self.simulation_speed:.2f} sim-s/s), score={self.score}, performance={self.performance:.3f}')
+        self.nars.disconnect_brain()
+        self.stop_export()
+        self.close_live_plot()
+        self.stop_tracing()
+        return self.simulation_speed
+
+    def __step(self) -> None:
+        "游戏逻辑步进一个tick（窗口与无界面模式共用）：时序事件（含数据记录）→NARS操作→碰撞→移动"
+        self.scheduler.step()
+        # NARS 执行操作（时序上依赖游戏，而非NARS程序）
+        self.nars.handle_operations(self.hero)  # 解耦：封装在「NARSPlanePlayer」中
+        self.__check_collide()
+        self.__step_sprites()
+
+    def __wait_CIN(self) -> None:
+        "（无界面模式）CIN积压过多时等待其消化：模拟速度以CIN的处理能力为上限（在命令队列上休眠，而非轮询）"
+        brain: NARSProgram = self.nars.brain
+        brain and brain.wait_for_cached_inputs(PlaneGame.HEADLESS_MAX_PENDING_INPUTS)
+
     def __event_handler(self):
-        "处理事件"
-        global ENABLE_GAME_DATA_RECORD
-        dt: int = self.speeding_delta_time_s - self.last_display_update_time
-        # 熔断恢复
-        if dt <= 0 and self.speed_melt_down > 0:  # 卡顿后恢复
-            # 恢复易卡事件
-            pygame.event.set_allowed(CREATE_ENEMY_EVENT)
-            pygame.event.set_allowed(UPDATE_NARS_EVENT)
-            # 恢复速度
-            self.game_speed = self.speed_melt_down - 0.1 * \
-                self.num_melt_down_before_restore  # 在减速中恢复稳态
-            print(f'Game stuck restored with speed={self.game_speed}!')
-            # 实在没办法时，清理所有敌机
-            if self.game_speed <= 0.1:
-                self.remove_all_enemy()
-            # 重置熔断数据
-            self.speed_melt_down = 0
-            self.num_melt_down_before_restore = 0
-        # 开始处理事件
+        "处理（窗口）事件：时序事件已交由调度器按tick派发，此处只剩退出与按键"
         for event in pygame.event.get():
             # 游戏退出
             if event.type == pygame.QUIT:
                 self.nars.disconnect_brain()  # 重定位：从「程序终止」到「断开连接」
+                self.stop_export()
+                self.close_live_plot()
+                self.stop_tracing()
                 PlaneGame.__game_over()
-            # 时钟步进（游戏内时间）
-            elif event.type == INGAME_CLOCK_EVENT:
-                # 自动加速
-                if self.auto_speed_delta:
-                    print(
-                        f'auto speed up {self.game_speed} --[+{self.auto_speed_delta}]-> {self.game_speed+self.auto_speed_delta}')
-                    self.game_speed += self.auto_speed_delta
-                # 避免游戏过卡：游戏速率熔断机制
-                dt: int = self.speeding_delta_time_s - self.last_display_update_time
-                if dt > 0:  # 过度迟滞
-                    print(
-                        f'Game stuck detected with dt={dt} at speed={self.game_speed}!')
-                    # 屏蔽易卡事件
-                    pygame.event.set_blocked(CREATE_ENEMY_EVENT)
-                    pygame.event.set_blocked(UPDATE_NARS_EVENT)
-                    # 存储速度
-                    if self.speed_melt_down == 0:  # 只存储一次
-                        self.speed_melt_down = self.game_speed  # 熔断-暂存速度
-                    # 强制降低游戏速度
-                    self.game_speed = 0.1
-                    self.num_melt_down_before_restore += 1  # 增加熔断次数
-                    # 停止自动加速
-                    if self.auto_speed_delta:
-                        self.auto_speed_delta = 0
-                        print('Automatic acceleration stop.')
-                # 时间计数
-                self.speeding_delta_time_s += 1
-            # 周期性创建敌机
-            elif event.type == CREATE_ENEMY_EVENT:
-                enemy = Enemy()
-                self.enemy_group.add(enemy)
-            # NARS 状态更新
-            elif event.type == UPDATE_NARS_EVENT:
-                # use objects' positions to update NARS's sensors
-                self.nars.update(hero=self.hero, enemy_group=self.enemy_group)
-                pass
-            # NARS babble
-            elif event.type == OPENNARS_BABBLE_EVENT:
-                if self.remaining_babble_times <= 0:
-                    self.remaining_babble_times = 0  # 重置时间
-                    pygame.event.set_blocked(OPENNARS_BABBLE_EVENT)
-                else:
-                    # 在指定范围内babble
-                    self.nars.babble(2, NARSPlanePlayer.BABBLE_OPERATION_LIST)
-                    self.remaining_babble_times -= 1
-                    print('The remaining babble times: ' +
-                          str(self.remaining_babble_times))
             # 键盘按键
             elif (is_up := event.type == pygame.KEYUP) or event.type == pygame.KEYDOWN:
                 self.__handle_keys(
@@ -465,11 +572,42 @@ class PlaneGame:
                     key_mods=pygame.key.get_mods(),  # 键盘按键模式检测
                     isUp=is_up
                 )
-        # NARS 执行操作（时序上依赖游戏，而非NARS程序）
-        self.nars.handle_operations(self.hero)  # 解耦：封装在「NARSPlanePlayer」中
-        # 记录游戏数据
+
+    def __tick_ingame_clock(self) -> None:
+        "时钟步进（游戏内时间）"
+        # 自动加速（只影响渲染的快慢）
+        if self.auto_speed_delta:
+            print(
+                f'auto speed up {self.game_speed} --[+{self.auto_speed_delta}]-> {self.game_speed+self.auto_speed_delta}')
+            self.game_speed += self.auto_speed_delta
+        # 时间计数
+        self.speeding_delta_time_s += 1
+
+    def __record_datas(self) -> None:
+        "记录游戏数据（可用D键暂停/恢复）"
         ENABLE_GAME_DATA_RECORD and self.collectDatas()
 
+    def __create_enemy(self) -> None:
+        "周期性创建敌机"
+        self.enemy_group.add(Enemy(rng=self.random))
+
+    def __update_NARS(self) -> None:
+        "NARS 状态更新"
+        self.headless and self.__wait_CIN()
+        # use objects' positions to update NARS's sensors
+        self.nars.update(hero=self.hero, enemy_group=self.enemy_group)
+
+    def __babble(self) -> None:
+        "NARS babble（次数用尽后不再触发）"
+        if self.remaining_babble_times <= 0:
+            self.remaining_babble_times = 0  # 重置时间
+            return
+        # 在指定范围内babble
+        self.nars.babble(2, NARSPlanePlayer.BABBLE_OPERATION_LIST)
+        self.remaining_babble_times -= 1
+        self.headless or print(  # 无界面模式下不打印：每次babble都打印会淹没报告
+            'The remaining babble times: ' + str(self.remaining_babble_times))
+
     def __handle_keys(self, key: int, key_mods: int, isUp: bool) -> None:
         "捕捉键盘事件"
         global ENABLE_GAME_DATA_RECORD
@@ -505,10 +643,12 @@ class PlaneGame:
             self.remove_all_enemy()
         # P：展示游戏数据
         elif key == pygame.K_p and ENABLE_GAME_DATA_RECORD:
-            if key_mods & pygame.KMOD_ALT:
-                mp.Process(target=saveDatas, args=(self.gameDatas,)).start()
-            else:
+            if key_mods & pygame.KMOD_ALT:  # 流式导出（后台线程追加写入，不再整体重写）
+                self.export_datas()
+            elif key_mods & pygame.KMOD_SHIFT:  # 完整历史的静态图表（复制整个数据集）
                 mp.Process(target=plotDatas, args=(self.gameDatas,)).start()
+            else:  # 常驻的实时图表
+                self.show_live_plot()
         # 左右移动/停止（传入NARS构成BABBLE）
         elif key == pygame.K_LEFT:
             self.nars.force_unconscious_operation(
@@ -558,8 +698,6 @@ class PlaneGame:
                 )  # 可以用Shift指定加减
                 if self.remaining_babble_times <= 0:
                     self.remaining_babble_times = 0  # 莫溢出
-                else:  # 重新开始监听事件
-                    pygame.event.set_allowed(OPENNARS_BABBLE_EVENT)
         # E：开启/关闭NARS的感知/操作
         elif key == pygame.K_e:
             if key_mods & pygame.KMOD_SHIFT:  # 操作
@@ -583,17 +721,25 @@ class PlaneGame:
     def __check_collide(self):
         "检查碰撞"
         # Several collisions may happen at the same time
-        collisions = pygame.sprite.groupcollide(self.hero.bullets, self.enemy_group, True,
-                                                True)  # collided=pygame.sprite.collide_circle_ratio(0.8)
-        if collisions:
-            # len(collisions) denotes how many collisions happened
-            self.score += len(collisions)
+        # 🆕每颗子弹与全部敌机做一次向量化比较（同groupcollide(bullets, enemy_group, True, True)）
+        num_hits: int = 0
+        for bullet in self.hero.bullets.sprites():
+            if collided_enemies := self.enemy_group.colliding_rect(bullet.rect):
+                for enemy in collided_enemies:
+                    enemy.kill()
+                bullet.kill()
+                num_hits += 1
+        if num_hits:
+            # num_hits denotes how many collisions happened
+            self.score += num_hits
             self.nars.praise()
             print("good")
             print('score: ' + str(self.score))
 
-        collisions = pygame.sprite.spritecollide(self.hero, self.enemy_group, True,
-                                                 collided=pygame.sprite.collide_circle_ratio(0.7))
+        # 同spritecollide(hero, enemy_group, True, collided=collide_circle_ratio(0.7))
+        collisions = self.enemy_group.colliding_circle(self.hero, 0.7)
+        for enemy in collisions:
+            enemy.kill()
         if collisions and self.enable_punish:
             self.score -= len(collisions)
             self.nars.punish()
@@ -601,18 +747,20 @@ class PlaneGame:
             pass
 
     def __update_sprites(self):
-        "更新图形"
-        self.last_display_update_time = self.speeding_delta_time_s
-        self.background_group.update()
+        "更新图形：绘制（游戏逻辑已在__step中更新）"
+        self.background_group.update()  # 背景滚动仅用于显示
         self.background_group.draw(self.screen)
-        self.enemy_group.update()
         self.enemy_group.draw(self.screen)
-        self.hero_group.update()
         self.hero_group.draw(self.screen)
-        self.hero.bullets.update()
         self.hero.bullets.draw(self.screen)
         self.__display_text()
 
+    def __step_sprites(self):
+        "更新游戏逻辑（移动、出界），不绘制"
+        self.enemy_group.update()
+        self.hero_group.update()
+        self.hero.bullets.update()
+
     def remove_all_enemy(self) -> None:
         "🆕移除所有敌机"
         for enemy in self.enemy_group:
@@ -693,8 +841,10 @@ if ENABLE_GAME_DATA_RECORD:
 
     from math import ceil
 
-    def plotDatas(datas: pd.DataFrame):
+    def plotDatas(datas: MetricsRecorder | pd.DataFrame):
         "展示游戏数据图表"
+        if isinstance(datas, MetricsRecorder):  # 到这里才转换为DataFrame
+            datas = datas.to_dataframe()
 
         # 处理「时间」
         timeSeries = datas['ingame_time']
@@ -728,21 +878,33 @@ if ENABLE_GAME_DATA_RECORD:
         plt.tight_layout()
         plt.show()
 
-    DATA_FILE_NAME = 'game_datas.xlsx'
-
-    def saveDatas(datas: pd.DataFrame):
-        "存储游戏数据到excel文件"
-        datas.to_excel(DATA_FILE_NAME)
-        print(f'Game datas are exported to {DATA_FILE_NAME}.')
-
 
 if __name__ == '__main__':
     # game = PlaneGame('opennars')  # input 'ONA' or 'opennars'
+    # 无界面模式：`--headless`（可附`--duration=游戏内秒数`）；随机种子：`--seed=整数`
+    # 从头开始流式导出游戏数据：`--export=路径`（.csv/.arrow）
+    # 端到端延迟追踪：`--trace`（只打印报告）或`--trace=路径`（另导出追踪记录，.csv或JSON Lines）
+    # 这些选项不参与下面的位置参数
+    options: list[str] = [arg for arg in ARGV[1:] if arg.startswith('--')]
+    ARGV = [arg for arg in ARGV if not arg.startswith('--')]
+    headless: bool = '--headless' in options
+
+    def option_value(name: str, convert):
+        "获取「--name=value」形式的选项值（没有则为None）"
+        return next((
+            convert(option.split('=', 1)[1])
+            for option in options
+            if option.startswith(f'--{name}=')
+        ), None)
+    duration_s: float = option_value('duration', float)
+    seed: int = option_value('seed', int)
+    export_path: str = option_value('export', str)
+    trace_path: str = option_value('trace', str)
     # 可选参数
     nars_type: NARSType = (
         NARSType.from_str(ARGV[1]) if len(ARGV) > 1
         else NARSType.from_str(type)
-        if (type := input("Please input the type of NARS(opennars(default)/ONA/python): "))
+        if (type := input("Please input the type of NARS(opennars(default)/ONA/ONA_lib/python): "))
         else NARSType.OPENNARS
     )
     game_speed: float = float(
@@ -759,5 +921,14 @@ if __name__ == '__main__':
         nars_type=nars_type,
         game_speed=game_speed,
         enable_punish=enable_punish,
+        headless=headless,
+        seed=seed,
     )
-    game.start_game()
+    if export_path and ENABLE_GAME_DATA_RECORD:
+        game.export_datas(export_path)
+    if trace_path or '--trace' in options:
+        game.enable_tracing(trace_path)
+    if headless:
+        game.start_headless(duration_s=duration_s)
+    else:
+        game.start_game()
@@ -0,0 +1,292 @@
+"""游戏数据的列式记录器
+
+原先每帧都向pandas.DataFrame追加一行（`.loc[len(df)] = {...}`）：每次追加都要重新分配，
+运行越久越慢，长时间训练时足以拖垮帧率
+
+此处改为：
+- 每列一个预分配的NumPy数组，写满时容量翻倍（均摊O(1)）
+- 由调用方决定采样频率（如每游戏内秒一次，而非每帧）
+- 只在需要时（绘图、导出）才转换为DataFrame
+
+导出同理：不再把整个DataFrame交给子进程、每次重写整个Excel文件，
+而是由后台线程把新记录的行定期追加到文件末尾（可随时`tail -f`，崩溃时至多丢失最近一次写入间隔内的数据）
+
+类の概览
+- MetricsRecorder: 预分配、可增长的列式记录器
+- MetricsExporter: 后台线程、只追加的流式导出器（CSV/Arrow IPC）
+"""
+
+import os  # 用于落盘（fsync）与判断文件状态
+import csv  # CSV格式
+import threading  # 后台写线程
+from io import StringIO  # 读取CSV时截去不完整的行
+from collections import deque  # 待写的行
+
+import numpy as np
+
+try:  # Arrow IPC格式（可选）
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+class MetricsRecorder:
+    """预分配、可增长的列式记录器
+    - 所有列均以float64存储
+    - 序列化（如传给子进程）时只包含已记录的部分
+    """
+
+    def __init__(self, columns: list[str], capacity: int = 1024) -> None:
+        if capacity <= 0:
+            raise ValueError(f'The capacity must be positive, got {capacity}')
+        self.columns: tuple[str, ...] = tuple(columns)
+        "列名（亦即每行的键）"
+        self._data: dict[str:np.ndarray] = {
+            name: np.empty(capacity, dtype=np.float64)
+            for name in self.columns
+        }
+        self._length: int = 0
+
+    def __len__(self) -> int:
+        "已记录的行数"
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        "当前容量（行）"
+        return len(self._data[self.columns[0]]) if self.columns else 0
+
+    def _grow(self) -> None:
+        "容量翻倍"
+        for name, column in self._data.items():
+            new: np.ndarray = np.empty(len(column) * 2, dtype=column.dtype)
+            new[:self._length] = column[:self._length]
+            self._data[name] = new
+
+    def append(self, row: dict) -> None:
+        "追加一行（须包含所有列）"
+        if self._length == self.capacity:
+            self._grow()
+        i: int = self._length
+        for name, column in self._data.items():
+            column[i] = row[name]
+        self._length = i + 1
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        "获取一列已记录的数据（视图，不复制）"
+        return self._data[name][:self._length]
+
+    def last(self) -> dict | None:
+        "最后一行（尚无记录则为None）"
+        if not self._length:
+            return None
+        return {
+            name: float(column[self._length - 1])
+            for name, column in self._data.items()
+        }
+
+    def clear(self) -> None:
+        "清空记录（保留容量）"
+        self._length = 0
+
+    def to_dataframe(self):
+        "转换为pandas.DataFrame（复制已记录的部分）"
+        import pandas as pd
+        return pd.DataFrame({
+            name: self[name].copy()
+            for name in self.columns
+        })
+
+    # 序列化：只保留已记录的部分 #
+
+    def __getstate__(self) -> dict:
+        return {
+            'columns': self.columns,
+            'data': {name: self[name].copy() for name in self.columns},
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.columns = state['columns']
+        self._data = state['data']
+        self._length = len(self._data[self.columns[0]]) if self.columns else 0
+        if self._length == 0:  # 保证之后仍可追加
+            self._data = {name: np.empty(1, dtype=np.float64) for name in self.columns}
+
+
+class MetricsExporter:
+    """后台线程、只追加的流式导出器
+    - append只把行放入队列（不做任何IO）；后台线程每隔flush_interval_s把积攒的行写入文件，并flush+fsync
+    - 崩溃时至多丢失最近flush_interval_s内的数据
+    - 格式（按扩展名推断）：
+        - csv: 逐行文本；默认新建（覆盖）文件，resume时续写已存在且表头一致的文件；可直接`tail -f`
+        - arrow: Arrow IPC流（需要pyarrow），每次写入一个记录批；文件会被覆盖
+            - 未正常关闭的流同样可读（读到最后一个完整的批为止），见read
+    - 所有数值均以float写出（与记录器的float64一致），无论来自append还是extend
+    - Parquet的元数据写在文件末尾（关闭时才写出），既不能续写也不能边写边读，故不支持
+    """
+
+    FORMATS: tuple[str, ...] = ('csv', 'arrow')
+    "支持的格式"
+
+    def __init__(self, path: str, columns: list[str], format: str = None, flush_interval_s: float = 1.0, resume: bool = False) -> None:
+        self.path: str = path
+        "导出文件路径"
+        self.columns: tuple[str, ...] = tuple(columns)
+        "列名"
+        self.format: str = (format or MetricsExporter.infer_format(path)).lower()
+        "文件格式"
+        if self.format not in MetricsExporter.FORMATS:
+            raise ValueError(f'Unknown format {self.format!r}, expected one of {MetricsExporter.FORMATS}')
+        if self.format == 'arrow' and pa is None:
+            raise ImportError('pyarrow is required to export in the Arrow IPC format')
+        self.flush_interval_s: float = flush_interval_s
+        "写入间隔（秒）"
+        self.resume: bool = resume
+        "（仅CSV）是否续写已存在的文件（否则新建），以免不同的运行混在同一个文件中"
+        if resume and self.format != 'csv':
+            raise ValueError(f'Only the csv format can be resumed, got {self.format!r}')
+        self._rows: deque[tuple] = deque()
+        self._condition: threading.Condition = threading.Condition()
+        self._closed: bool = False
+        # 统计 #
+        self.num_rows_written: int = 0
+        "已写入（并落盘）的行数"
+        self.num_flushes: int = 0
+        "写入文件的次数"
+        # 打开文件，启动写线程
+        self._file = None
+        self._writer = None
+        self._open()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._write_loop, daemon=True, name='MetricsExporter')
+        self._thread.start()
+
+    @staticmethod
+    def infer_format(path: str) -> str:
+        "根据扩展名推断格式"
+        extension: str = os.path.splitext(path)[1].lower()
+        return 'arrow' if extension in ('.arrow', '.arrows', '.ipc') else 'csv'
+
+    def _open(self) -> None:
+        "（内部）打开文件，写出表头/结构"
+        if self.format == 'csv':
+            is_new: bool = (
+                not self.resume
+                or not os.path.exists(self.path)
+                or os.path.getsize(self.path) == 0)
+            if not is_new:  # 续写：表头须一致
+                with open(self.path, newline='', encoding='utf-8') as file:
+                    header: list[str] = next(csv.reader(file), [])
+                if tuple(header) != self.columns:
+                    raise ValueError(f'{self.path} has columns {header}, cannot append {list(self.columns)}')
+                MetricsExporter._truncate_partial_line(self.path)  # 上次崩溃时可能留下半行
+            self._file = open(self.path, 'w' if is_new else 'a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file, lineterminator='\n')
+            if is_new:
+                self._writer.writerow(self.columns)
+        else:
+            self._file = open(self.path, 'wb')
+            self._writer = pa.ipc.new_stream(self._file, pa.schema(
+                [(name, pa.float64()) for name in self.columns]))
+        self._sync()
+
+    @staticmethod
+    def _truncate_partial_line(path: str) -> None:
+        "（内部）截去文件末尾不完整的行"
+        with open(path, 'r+b') as file:
+            file.seek(0, os.SEEK_END)
+            size: int = file.tell()
+            position: int = size
+            while position > 0:  # 从末尾向前找最后一个换行符
+                step: int = min(4096, position)
+                file.seek(position - step)
+                if (index := file.read(step).rfind(b'\n')) >= 0:
+                    position = position - step + index + 1
+                    break
+                position -= step
+            if position < size:
+                file.truncate(position)
+
+    def _sync(self) -> None:
+        "（内部）把已写的内容落盘"
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, row: dict) -> None:
+        "追加一行（须包含所有列；不阻塞）"
+        if self._closed:
+            raise ValueError('The exporter has been closed!')
+        self._rows.append(tuple(float(row[name]) for name in self.columns))
+
+    def extend(self, recorder: MetricsRecorder) -> None:
+        "追加记录器中已有的所有行（如：中途开始导出时补上之前的数据）"
+        columns: list[np.ndarray] = [recorder[name] for name in self.columns]
+        self._rows.extend(zip(*(column.tolist() for column in columns)))
+
+    @property
+    def num_pending_rows(self) -> int:
+        "尚未写入的行数"
+        return len(self._rows)
+
+    def _write_loop(self) -> None:
+        "（后台线程）定期写入积攒的行"
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed, self.flush_interval_s)
+                closed: bool = self._closed
+            self._write_pending()
+            if closed:
+                break
+
+    def _write_pending(self) -> None:
+        "（内部）写入当前积攒的所有行"
+        rows: list[tuple] = []
+        while self._rows:
+            rows.append(self._rows.popleft())
+        if not rows:
+            return
+        if self.format == 'csv':
+            self._writer.writerows(rows)
+        else:
+            self._writer.write_batch(pa.record_batch(
+                [pa.array(column, type=pa.float64()) for column in zip(*rows)],
+                names=list(self.columns)))
+        self._sync()
+        self.num_rows_written += len(rows)
+        self.num_flushes += 1
+
+    def close(self) -> None:
+        "写入剩余的行并关闭文件"
+        if self._closed:
+            return
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        if self.format == 'arrow':
+            self._writer.close()  # 写出流的结束标记
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @staticmethod
+    def read(path: str, format: str = None):
+        "读取（可能仍在写入、或未正常关闭的）导出文件为DataFrame：忽略末尾不完整的部分"
+        import pandas as pd
+        if (format or MetricsExporter.infer_format(path)).lower() == 'csv':
+            with open(path, encoding='utf-8') as file:
+                text: str = file.read()
+            return pd.read_csv(StringIO(text[:text.rfind('\n') + 1]))  # 只取完整的行
+        batches: list = []
+        with open(path, 'rb') as file:
+            reader = pa.ipc.open_stream(file)
+            try:
+                for batch in reader:
+                    batches.append(batch)
+            except (pa.ArrowInvalid, OSError):  # 最后一个批不完整
+                pass
+            return pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
@@ -0,0 +1,98 @@
+"""离散时间（tick）调度器
+
+原先游戏的时序事件（生成敌机、更新NARS、babble、游戏内时钟）由`pygame.time.set_timer`按现实时间派发：
+游戏一卡，事件就在队列中堆积，只能靠「速度熔断」屏蔽事件来自救
+
+此处改为按「模拟tick」派发：每帧步进一次，事件间隔以tick计，
+无论渲染快慢（乃至无界面），同一tick上触发的事件及其顺序都完全相同
+
+类の概览
+- ScheduledEvent: 一个周期性事件
+- TickScheduler: 按tick派发周期性事件的调度器
+"""
+
+
+class ScheduledEvent:
+    "一个周期性事件：每interval个tick调用一次callback"
+
+    def __init__(self, name: str, interval: int, callback, offset: int = 0) -> None:
+        if interval <= 0:
+            raise ValueError(f'The interval of event {name!r} must be positive, got {interval}')
+        self.name: str = name
+        "事件名（用于调试与统计）"
+        self.interval: int = interval
+        "触发间隔（tick）"
+        self.callback = callback
+        "触发时调用的无参函数"
+        self.offset: int = offset
+        "相位：在tick≡offset (mod interval)时触发"
+        self.enabled: bool = True
+        "是否启用（禁用时不触发，但不影响相位）"
+        self.num_fired: int = 0
+        "已触发的次数"
+
+    def __repr__(self) -> str:
+        return f'ScheduledEvent({self.name!r}, interval={self.interval}, offset={self.offset})'
+
+    def is_due(self, tick: int) -> bool:
+        "在此tick是否应触发"
+        return self.enabled and (tick - self.offset) % self.interval == 0
+
+
+class TickScheduler:
+    """按tick派发周期性事件的调度器
+    - 每次step，tick加一，并按注册顺序触发所有到期的事件
+    - 与现实时间无关：给定相同的事件与相同的随机种子，运行结果可复现
+    """
+
+    def __init__(self, ticks_per_second: int = 60) -> None:
+        self.ticks_per_second: int = ticks_per_second
+        "每（模拟）秒的tick数"
+        self.tick: int = 0
+        "已步进的tick数"
+        self._events: list[ScheduledEvent] = []
+
+    def every(self, name: str, interval: int, callback, offset: int = 0) -> ScheduledEvent:
+        "注册周期性事件：每interval个tick触发一次"
+        event: ScheduledEvent = ScheduledEvent(name, interval, callback, offset)
+        self._events.append(event)
+        return event
+
+    def every_seconds(self, name: str, interval_s: float, callback, offset: int = 0) -> ScheduledEvent:
+        "注册周期性事件：间隔以（模拟）秒计，换算为tick（至少为1）"
+        return self.every(
+            name, max(1, round(interval_s * self.ticks_per_second)), callback, offset)
+
+    def __getitem__(self, name: str) -> ScheduledEvent:
+        "按名称获取事件"
+        for event in self._events:
+            if event.name == name:
+                return event
+        raise KeyError(name)
+
+    @property
+    def events(self) -> list[ScheduledEvent]:
+        "所有事件（按注册顺序，即同一tick上的触发顺序）"
+        return list(self._events)
+
+    def step(self) -> int:
+        "步进一个tick，触发其上到期的事件（返回：触发的事件数）"
+        self.tick += 1
+        num_fired: int = 0
+        for event in self._events:
+            if event.is_due(self.tick):
+                event.callback()
+                event.num_fired += 1
+                num_fired += 1
+        return num_fired
+
+    @property
+    def time_s(self) -> float:
+        "已经过的模拟时间（秒）"
+        return self.tick / self.ticks_per_second
+
+    def reset(self) -> None:
+        "回到第0个tick（事件保留，触发计数清零）"
+        self.tick = 0
+        for event in self._events:
+            event.num_fired = 0
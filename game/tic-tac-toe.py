@@ -7,10 +7,11 @@ import sys
 from itertools import product
 from sys import path as PATH, argv as ARGV
 from os import getcwd  # 获取当前路径
+from os.path import join as join_path  # 拼接路径
 
 IS_ROOT_GAME: str = 'game' in getcwd()  # 由于VSCode调试路径为项目根目录，故需要识别当前路径
-# 调用的CIN路径还要动态决定（Windows cmd使用反斜杠做路径分割）……
-CIN_ROOT_PATH: str = r'..\PyNEI' if IS_ROOT_GAME else r'.\PyNEI'
+# 调用的CIN路径还要动态决定（使用当前系统的路径分隔符）……
+CIN_ROOT_PATH: str = join_path('..' if IS_ROOT_GAME else '.', 'PyNEI')
 
 PATH.append('../' if IS_ROOT_GAME else './')  # 若为直接启动（含game目录），则变为上级路径
 # 📌一个「.」或「./」代表项目根目录：用于VSCode调试（默认路径变成项目根目录）
@@ -19,9 +20,13 @@ PATH.append('../' if IS_ROOT_GAME else './')  # 若为直接启动（含game目
 # ! ⚠️AutoPEP8总是把这import挪到「路径导入」代码之前，所以需要变成try语句
 try:
     from PyNEI.Agent import NARSAgent, NARSType, NARSOperation, NARSPerception, NARSSensor
+    from PyNEI.Pool import NARSProgramPool
 except BaseException as e:
     print(f'模块导入失败：{e}')
 
+# 预启动的CIN程序池：重新装载AI、预训练后删除AI时，无需重新启动CIN
+NARS_POOL: NARSProgramPool = NARSProgramPool(rootPath=CIN_ROOT_PATH, size=1)
+
 # 设置游戏板和棋子的属性
 BOARD_SIZE = 3  # 棋盘大小
 marker: list[list[None | str]] = None  # 记录棋盘状态
@@ -102,6 +107,7 @@ class NARSPlayer(NARSAgent):
         super().__init__(
             rootPath=CIN_ROOT_PATH,
             nars_type=nars_type,
+            pool=NARS_POOL,  # 从程序池租借大脑
             mainGoal=NARSPlayer.GOAL_GOOD,
             mainGoal_negative=NARSPlayer.GOAL_BAD  # NARSPlayer.GOAL_BAD
         )  # 目标：「good」
@@ -116,7 +122,7 @@ class NARSPlayer(NARSAgent):
     def handle_program_operation(self, operation: NARSOperation):
         "操作名的「别名分发」"
 
-        if self.type == NARSType.ONA:
+        if self.type in (NARSType.ONA, NARSType.ONA_LIB):  # 进程内ONA同样使用ONA的内置操作
             if operation.name in NARSPlayer.ONA_OP_LIST:
                 operation = NARSPlayer.OPERATION_SET[
                     NARSPlayer.ONA_OP_LIST.index(
@@ -216,10 +222,11 @@ def installNARSes(narses):
             narses[key] = getPlayer(f'type of player {key}: ')
 
 
-def terminateNARSes(narses):
-    for nars in narses:
+def terminateNARSes(narses=players):
+    for nars in narses.values():
         if isinstance(nars, NARSPlayer):
             nars.disconnect_brain()
+    NARS_POOL.close()  # 终止池中所有空闲的CIN
 
 
 installNARSes(players)
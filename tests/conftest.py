@@ -0,0 +1,6 @@
+"""测试公共设置：使测试可以导入项目根目录下的PyNEI"""
+
+from os.path import dirname, join, abspath
+from sys import path as PATH
+
+PATH.insert(0, abspath(join(dirname(__file__), '..')))
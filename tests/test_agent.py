@@ -0,0 +1,15 @@
+"""智能体（NARSAgent）的回归测试"""
+
+from PyNEI.Agent import NARSAgent
+from PyNEI.Elements import NARSPerception
+
+
+def test_delta_perceptions_accepts_generators():
+    "感知钩子返回生成器时，增量编码也应正常工作（生成器只能遍历一次）"
+    agent = NARSAgent(perception_delta=True)
+    sensor = object()
+    left, right = NARSPerception.new_self('left'), NARSPerception.new_self('right')
+    assert agent._delta_perceptions(sensor, (p for p in (left, right))) == [left, right]
+    assert agent._delta_perceptions(sensor, (p for p in (left, right))) == []
+    assert agent._delta_perceptions(sensor, (p for p in (right,))) == []
+    assert agent._delta_perceptions(sensor, (p for p in (left,))) == [left]
@@ -0,0 +1,28 @@
+"""命令队列（CommandQueue）的回归测试"""
+
+import threading
+
+from PyNEI.Buffer import CommandQueue, OverflowPolicy
+
+
+def test_essential_commands_are_never_coalesced_or_dropped():
+    "关键命令（推理步进）在各溢出策略下都不会被合并或丢弃"
+    for policy in (OverflowPolicy.COALESCE, OverflowPolicy.DROP_OLDEST, OverflowPolicy.DROP_NEWEST):
+        queue = CommandQueue(capacity=2, policy=policy)
+        assert queue.put('5', essential=True)
+        assert queue.put('5', essential=True)
+        for sentence in ('a', 'b', 'c'):
+            queue.put(sentence)
+        assert queue.get_batch(10).count('5') == 2
+
+
+def test_wait_for_length_wakes_when_drained():
+    "写线程取走命令后，等待方应被唤醒（而非轮询）"
+    queue = CommandQueue()
+    for sentence in ('a', 'b', 'c'):
+        queue.put(sentence)
+    assert not queue.wait_for_length(1, timeout=0.01)
+    consumer = threading.Thread(target=queue.get_batch, args=(2,))
+    consumer.start()
+    assert queue.wait_for_length(1, timeout=5)
+    consumer.join()
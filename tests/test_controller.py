@@ -0,0 +1,35 @@
+"""推理周期控制器（InferenceCycleController）的回归测试"""
+
+from types import SimpleNamespace
+
+from PyNEI.Controller import InferenceCycleController
+
+
+class FakeClock:
+    "可手动推进的时钟"
+
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_first_tick_does_not_decrease_cycles():
+    "首个tick尚无写出速率：即便有待写命令，也不应减少周期数"
+    clock = FakeClock()
+    controller = InferenceCycleController(initial_cycles=8, clock=clock)
+    program = SimpleNamespace(num_pending_inputs=3, num_inputs_written=0, num_lines_read=0)
+    assert controller.next_cycles(program) == 8
+    assert controller.estimated_latency == 0
+
+
+def test_drain_rate_is_seeded_with_first_sample():
+    "写出速率以首个实测样本为初值，而非从0开始平滑"
+    clock = FakeClock()
+    controller = InferenceCycleController(clock=clock)
+    controller.measure(queue_depth=0, num_written=0, num_read=0)
+    clock.now = 0.1
+    controller.measure(queue_depth=10, num_written=100, num_read=0)
+    assert controller.drain_rate == 1000
+    assert controller.estimated_latency == 0.01
@@ -0,0 +1,25 @@
+"""NARS元素（操作、感知）的回归测试"""
+
+import threading
+
+from PyNEI.Elements import NARSOperation
+
+NUM_THREADS: int = 8
+"同时构造操作的线程数"
+
+
+def test_concurrent_construction_interns_one_operation():
+    "多个线程同时构造同名操作，得到的应是同一个对象"
+    barrier = threading.Barrier(NUM_THREADS)
+    operations: list[NARSOperation] = []
+
+    def construct():
+        barrier.wait()
+        operations.append(NARSOperation('concurrently_constructed'))
+
+    threads = [threading.Thread(target=construct) for _ in range(NUM_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(operation is operations[0] for operation in operations)
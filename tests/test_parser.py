@@ -0,0 +1,37 @@
+"""输出行分类器（LineClassifier）的回归测试"""
+
+from PyNEI.Program import OpenNARS, ONA, Python
+
+
+def test_operation_name_and_classify_agree():
+    "operation_name（热路径，只取操作名）与classify（另取参数）识别出的操作名一致"
+    cases = [
+        (OpenNARS, 'EXE: $0.26;0.17;0.94$ ^right([{SELF}])=null', ('right', ('{SELF}',))),
+        (OpenNARS, 'OUT: <{enemy} --> [x1]>. :|: %1.00;0.45%', None),
+        (ONA, '^left executed with args ({SELF})', ('left', ('{SELF}',))),
+        (ONA, 'Derived: <({enemy} * left) --> ^left>. Priority=0.245320', None),
+        (Python, 'EXE: ^left based on desirability: 0.9', ('left', ())),
+        (Python, 'INPUT TASK: (({SELF}) --> [good])! :|:', None),
+    ]
+    for cls, line, expected in cases:
+        assert cls.LINE_CLASSIFIER.classify(line) == expected
+        assert cls.LINE_CLASSIFIER.operation_name(line) == (expected and expected[0])
+
+
+def test_python_reports_reject_case_insensitively(capsys):
+    "NARS-Python的「拒绝」信息不论大小写都应被识别，操作行则不会被误报"
+    class UnlaunchedPython(Python):
+        "不启动进程：只测试输出解析"
+
+        def __init__(self) -> None:
+            self.line_classifier = Python.LINE_CLASSIFIER
+
+        def __del__(self) -> None:
+            pass
+
+    program = UnlaunchedPython()
+    for line in ('Reject: goal', 'REJECT: goal', 'ReJect: goal'):
+        assert program.catch_operation_name(line) is None
+        assert capsys.readouterr().out == f'Reject: {line}\n'
+    assert program.catch_operation_name('EXE: ^left based on desirability: 0.9') == 'left'
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,24 @@
+"""资源配置（CINProfile）的回归测试"""
+
+from PyNEI.Profile import CINProfile
+from PyNEI.Program import OpenNARS, ONA, Python
+
+
+def test_over_keeps_class_defaults_for_unspecified_fields():
+    "未指定的项沿用程序类的默认配置：NARS-Python不应收到「*volume」，OpenNARS保留堆大小"
+    mine = CINProfile(name='mine')
+    assert mine.over(Python.DEFAULT_PROFILE).commands() == []
+    assert mine.over(ONA.DEFAULT_PROFILE).commands() == ['*volume=0']
+    merged = mine.over(OpenNARS.DEFAULT_PROFILE)
+    assert merged.name == 'mine'
+    assert merged.heap_size == '1024m'
+    assert merged.max_inference_cycle_frequency == 100
+
+
+def test_over_prefers_specified_fields():
+    "指定的项（含0这样的「假」值）覆盖程序类的默认配置"
+    mine = CINProfile(name='mine', volume=5, inference_cycle_frequency=0, max_inference_cycle_frequency=20)
+    merged = mine.over(OpenNARS.DEFAULT_PROFILE)
+    assert merged.commands() == ['*volume=5']
+    assert merged.inference_cycle_frequency == 0
+    assert merged.max_inference_cycle_frequency == 20
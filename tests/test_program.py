@@ -0,0 +1,44 @@
+"""NARSProgram（线程版Cmdline）的回归测试：以MockCIN代替真实CIN"""
+
+import time
+
+from PyNEI.Program import NARSProgram, NARSType, ONA
+from PyNEI.MockCIN import mock_class
+
+THREAD_EXIT_TIMEOUT_S: float = 5
+"等待线程退出的超时（秒）"
+
+
+def test_terminate_stops_idle_writer_thread():
+    "终止一个空闲（命令队列为空）的程序后，写线程应退出，而非永远阻塞在队列上"
+    program = mock_class(ONA)('mock')
+    program.launch()
+    writer = program.write_line_thread
+    assert writer.is_alive()
+    program.terminate()
+    writer.join(THREAD_EXIT_TIMEOUT_S)
+    assert not writer.is_alive()
+
+
+def test_from_type_constructs_ona_library_lazily():
+    "进程内ONA在fromType中按需导入：构造（不启动）即可得到其类型，无需共享库存在"
+    program = NARSProgram.fromType(NARSType.ONA_LIB, 'nonexistent')
+    assert type(program).__name__ == 'ONALibrary'
+    assert program.type == NARSType.ONA_LIB
+
+
+def test_reset_disconnects_hooks():
+    "重置（归还程序池）后，上一个使用者的输出钩子与操作钩子都应断开"
+    program = mock_class(ONA)('mock')
+    program.launch()
+    try:
+        program.out_hook = print
+        program.operation_hook = print
+        assert program.reset()
+        assert program.out_hook is None
+        assert program.operation_hook is None
+        deadline: float = time.monotonic() + THREAD_EXIT_TIMEOUT_S
+        while program.num_pending_inputs and time.monotonic() < deadline:  # 等重置命令写完，再终止
+            time.sleep(0.01)
+    finally:
+        program.terminate()